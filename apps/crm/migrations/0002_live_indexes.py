@@ -0,0 +1,28 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+def live_index(name):
+    return models.Index(
+        fields=['tenant', 'created_at', 'id'],
+        condition=models.Q(is_deleted=False),
+        name=name,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0001_initial'),
+    ]
+
+    # Activity and Note get theirs once their is_deleted column is migrated
+    operations = [
+        migrations.AddIndex(model_name='lead', index=live_index('crm_lead_live')),
+        migrations.AddIndex(model_name='account', index=live_index('crm_account_live')),
+        migrations.AddIndex(model_name='contact', index=live_index('crm_contact_live')),
+        migrations.AddIndex(model_name='opportunity', index=live_index('crm_opportunity_live')),
+        migrations.AddIndex(model_name='campaign', index=live_index('crm_campaign_live')),
+        migrations.AddIndex(model_name='campaignmember', index=live_index('crm_campaignmember_live')),
+    ]
@@ -0,0 +1,54 @@
+# Generated manually
+
+import apps.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0002_live_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lead',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='account',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='contact',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='opportunity',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='activity',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='note',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='campaign',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='campaignmember',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -68,7 +68,7 @@ class Lead(TenantAwareModel):
     converted_to_contact = models.BooleanField(default=False)
     converted_date = models.DateTimeField(null=True, blank=True)
 
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         db_table = 'crm_leads'
         ordering = ['-created_at']
 
@@ -106,7 +106,7 @@ class Contact(TenantAwareModel):
         related_name='assigned_contacts'
     )
 
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         db_table = 'crm_contacts'
         ordering = ['last_name', 'first_name']
 
@@ -155,7 +155,7 @@ class Account(TenantAwareModel):
     )
     parent_account = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True)
 
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         db_table = 'crm_accounts'
         ordering = ['name']
 
@@ -185,7 +185,7 @@ class Opportunity(TenantAwareModel):
     competitor = models.CharField(max_length=200, blank=True)
     next_step = models.CharField(max_length=200, blank=True)
 
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         db_table = 'crm_opportunities'
         ordering = ['-expected_close_date']
 
@@ -228,7 +228,7 @@ class Activity(TenantAwareModel):
         related_name='created_activities'
     )
 
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         db_table = 'crm_activities'
         ordering = ['-start_date']
 
@@ -253,7 +253,7 @@ class Note(TenantAwareModel):
     )
     is_private = models.BooleanField(default=False)
 
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         db_table = 'crm_notes'
         ordering = ['-created_at']
 
@@ -287,7 +287,7 @@ class Campaign(TenantAwareModel):
         related_name='assigned_campaigns'
     )
     
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         db_table = 'crm_campaigns'
         ordering = ['-created_at']
 
@@ -312,7 +312,7 @@ class CampaignMember(TenantAwareModel):
     )
     response_date = models.DateTimeField(null=True, blank=True)
 
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         db_table = 'crm_campaign_members'
         unique_together = ['campaign', 'lead', 'contact']
 
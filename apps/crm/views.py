@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Sum, Count
 from django.utils import timezone
+from apps.core.pagination import KeysetPagination
 from .models import (
     Lead, Contact, Account, Opportunity, Activity, Note,
     Campaign, CampaignMember
@@ -18,6 +19,7 @@ from .serializers import (
 class LeadViewSet(viewsets.ModelViewSet):
     serializer_class = LeadSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'source', 'assigned_to', 'converted_to_contact']
     search_fields = ['first_name', 'last_name', 'email', 'company', 'description']
@@ -82,6 +84,7 @@ class LeadViewSet(viewsets.ModelViewSet):
 class ContactViewSet(viewsets.ModelViewSet):
     serializer_class = ContactSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['account', 'department', 'is_primary', 'is_decision_maker', 'assigned_to']
     search_fields = ['first_name', 'last_name', 'email', 'position', 'notes']
@@ -105,6 +108,7 @@ class ContactViewSet(viewsets.ModelViewSet):
 class AccountViewSet(viewsets.ModelViewSet):
     serializer_class = AccountSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['account_type', 'industry', 'rating', 'assigned_to', 'parent_account']
     search_fields = ['name', 'website', 'description', 'email']
@@ -142,6 +146,7 @@ class AccountViewSet(viewsets.ModelViewSet):
 class OpportunityViewSet(viewsets.ModelViewSet):
     serializer_class = OpportunitySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['stage', 'account', 'contact', 'lead_source', 'assigned_to']
     search_fields = ['name', 'description', 'competitor', 'next_step']
@@ -167,6 +172,7 @@ class OpportunityViewSet(viewsets.ModelViewSet):
 class ActivityViewSet(viewsets.ModelViewSet):
     serializer_class = ActivitySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['activity_type', 'status', 'assigned_to', 'lead', 'contact', 'account', 'opportunity']
     search_fields = ['title', 'description', 'location']
@@ -188,6 +194,7 @@ class ActivityViewSet(viewsets.ModelViewSet):
 class NoteViewSet(viewsets.ModelViewSet):
     serializer_class = NoteSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_private', 'lead', 'contact', 'account', 'opportunity']
     search_fields = ['title', 'content']
@@ -213,6 +220,7 @@ class NoteViewSet(viewsets.ModelViewSet):
 class CampaignViewSet(viewsets.ModelViewSet):
     serializer_class = CampaignSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'assigned_to']
     search_fields = ['name', 'description']
@@ -262,6 +270,7 @@ class CampaignViewSet(viewsets.ModelViewSet):
 class CampaignMemberViewSet(viewsets.ModelViewSet):
     serializer_class = CampaignMemberSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['campaign', 'status']
     search_fields = ['campaign__name']
@@ -0,0 +1,105 @@
+"""
+Aged receivables (open invoices) and payables (open bills).
+
+Buckets are days past due on the as-of date. Each report is one conditional
+aggregate query (a filtered SUM per bucket), plus one grouped query per
+customer / vendor when asked for. Results are kept in the Django cache,
+which the worker processes share (see CACHES), under a per-tenant version
+that is bumped whenever one of the tenant's invoices or bills changes
+(see signals.py).
+"""
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from apps.sales.models import Invoice
+from .models import Bill
+
+# (bucket, from days past due, to days past due); None = open-ended
+AGING_BUCKETS = (
+    ('current', None, 0),
+    ('1_30', 1, 30),
+    ('31_60', 31, 60),
+    ('61_90', 61, 90),
+    ('91_120', 91, 120),
+    ('over_120', 121, None),
+)
+
+# report -> (model, statuses still owed, counterparty field)
+AGING_REPORTS = {
+    'receivables': (Invoice, ('sent', 'overdue'), 'customer'),
+    'payables': (Bill, ('open', 'overdue'), 'vendor'),
+}
+
+def _ttl():
+    return getattr(settings, 'AGING_CACHE_TTL', 300)
+
+def _version_key(tenant_id):
+    return f'aging:{tenant_id}:version'
+
+def _version(tenant_id):
+    # Started from the clock, so a version key lost to eviction never brings old results back
+    return cache.get_or_set(_version_key(tenant_id), time.time_ns, None)
+
+def invalidate_aging_cache(tenant_id):
+    """Drop a tenant's cached aging reports, in every process sharing the cache"""
+    try:
+        cache.incr(_version_key(tenant_id))
+    except ValueError:
+        cache.set(_version_key(tenant_id), time.time_ns(), None)
+
+def _bucket_filter(as_of, days_from, days_to):
+    condition = Q()
+    if days_from is not None:
+        condition &= Q(due_date__lte=as_of - timedelta(days=days_from))
+    if days_to is not None:
+        condition &= Q(due_date__gte=as_of - timedelta(days=days_to))
+    return condition
+
+def _bucket_sums(as_of):
+    zero = Value(0, output_field=DecimalField(max_digits=14, decimal_places=2))
+    sums = {
+        name: Coalesce(Sum('total_amount', filter=_bucket_filter(as_of, days_from, days_to)), zero)
+        for name, days_from, days_to in AGING_BUCKETS
+    }
+    sums['total'] = Coalesce(Sum('total_amount'), zero)
+    sums['documents'] = Count('id')
+    return sums
+
+def _compute(tenant_id, report, as_of, by_party, branch):
+    model, statuses, party = AGING_REPORTS[report]
+    documents = model.objects.filter(tenant_id=tenant_id, is_deleted=False, status__in=statuses)
+    if branch:
+        documents = documents.filter(branch_id=branch)
+
+    result = {
+        'as_of': as_of,
+        'buckets': [name for name, days_from, days_to in AGING_BUCKETS],
+        'totals': documents.aggregate(**_bucket_sums(as_of)),
+    }
+    if by_party:
+        result[f'{party}s'] = list(
+            documents.values(f'{party}_id', name=F(f'{party}__name'))
+            .annotate(**_bucket_sums(as_of))
+            .order_by('-total')
+        )
+    return result
+
+def aging_report(tenant_id, report, as_of=None, by_party=False, branch=None):
+    """
+    Aging of 'receivables' or 'payables' on as_of (default today):
+    {'as_of', 'buckets', 'totals': {bucket: amount, ..., 'total', 'documents'}}
+    and, with by_party, a 'customers' / 'vendors' list with the same figures each.
+    """
+    if report not in AGING_REPORTS:
+        raise ValueError(f"Unknown aging report '{report}'")
+    as_of = as_of or timezone.localdate()
+    key = f'aging:{tenant_id}:{_version(tenant_id)}:{report}:{as_of}:{int(bool(by_party))}:{branch or ""}'
+    result = cache.get(key)
+    if result is None:
+        result = _compute(tenant_id, report, as_of, by_party, branch)
+        cache.set(key, result, _ttl())
+    return result
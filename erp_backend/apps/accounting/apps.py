@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class AccountingConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.accounting'
+    verbose_name = 'Accounting'
+
+    def ready(self):
+        from . import signals  # noqa: F401
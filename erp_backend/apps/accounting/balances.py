@@ -0,0 +1,231 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils.dateparse import parse_date
+from .models import AccountBalance, LedgerLine
+
+AMOUNT = DecimalField(max_digits=14, decimal_places=2)
+ZERO = Value(Decimal('0'), output_field=AMOUNT)
+
+def period_start(day):
+    """The AccountBalance period a date falls in (first day of its month)"""
+    return day.replace(day=1)
+
+def next_period(day):
+    return (period_start(day) + timedelta(days=32)).replace(day=1)
+
+def balance_filters(params):
+    """
+    Read the optional balance filters from query params:
+    as_of (entries up to and including that date), date_from / date_to
+    (a period) and branch. Raises ValueError on a malformed date.
+    """
+    filters = {}
+    for name in ('as_of', 'date_from', 'date_to'):
+        raw = params.get(name)
+        if raw:
+            try:
+                value = parse_date(raw)
+            except ValueError:
+                value = None
+            if value is None:
+                raise ValueError(f'{name} must be a date (YYYY-MM-DD)')
+            filters[name] = value
+    if params.get('branch'):
+        filters['branch'] = params['branch']
+    return filters
+
+def _split_range(start, end):
+    """
+    Split [start, end] (either may be None) into whole months, read from
+    AccountBalance, and the partial months at either edge, read from lines.
+    Returns (periods, tail): a Q over AccountBalance and a Q over LedgerLine,
+    each None when that part of the range is empty.
+    """
+    period_from = start if start is None or start.day == 1 else next_period(start)
+    period_to = None
+    if end is not None:
+        period_to = next_period(end) if next_period(end) - timedelta(days=1) == end else period_start(end)
+
+    if period_from is not None and period_to is not None and period_from >= period_to:
+        # Inside a single month: lines only
+        return None, Q(entry__date__gte=start, entry__date__lte=end)
+
+    periods = Q()
+    if period_from is not None:
+        periods &= Q(period__gte=period_from)
+    if period_to is not None:
+        periods &= Q(period__lt=period_to)
+
+    edges = []
+    if start is not None and start < period_from:
+        edges.append(Q(entry__date__gte=start, entry__date__lt=period_from))
+    if end is not None and period_to <= end:
+        edges.append(Q(entry__date__gte=period_to, entry__date__lte=end))
+    tail = None
+    for edge in edges:
+        tail = edge if tail is None else tail | edge
+    return periods, tail
+
+def _sum(queryset, field):
+    return Coalesce(Subquery(
+        queryset.order_by().values('account').annotate(total=Sum(field)).values('total'),
+        output_field=AMOUNT
+    ), ZERO)
+
+def with_balances(accounts, as_of=None, date_from=None, date_to=None, branch=None):
+    """
+    Annotate an Account queryset with total_debit, total_credit and
+    balance (debit - credit). Whole months come from the AccountBalance
+    snapshots, only the partial months at the edges of the range are summed
+    from ledger lines, all in one query. Filters as in balance_filters().
+    """
+    ends = [day for day in (as_of, date_to) if day]
+    end = min(ends) if ends else None
+    if date_from and end and date_from > end:
+        return accounts.annotate(total_debit=ZERO, total_credit=ZERO, balance=ZERO)
+
+    periods, tail = _split_range(date_from, end)
+    snapshots = AccountBalance.objects.filter(account=OuterRef('pk'), is_deleted=False)
+    lines = LedgerLine.objects.filter(account=OuterRef('pk'), is_deleted=False, entry__is_deleted=False)
+    if branch:
+        snapshots = snapshots.filter(branch_id=branch)
+        lines = lines.filter(entry__branch_id=branch)
+
+    total_debit = total_credit = ZERO
+    if periods is not None:
+        total_debit = _sum(snapshots.filter(periods), 'debit')
+        total_credit = _sum(snapshots.filter(periods), 'credit')
+    if tail is not None:
+        total_debit = total_debit + _sum(lines.filter(tail), 'debit')
+        total_credit = total_credit + _sum(lines.filter(tail), 'credit')
+
+    return accounts.annotate(
+        total_debit=total_debit,
+        total_credit=total_credit,
+    ).annotate(balance=F('total_debit') - F('total_credit'))
+
+def _lock_order(key):
+    account_id, branch_id, period = key
+    return (str(account_id), str(branch_id), period)
+
+def apply_balance_deltas(tenant_id, deltas):
+    """
+    Add to the AccountBalance rows.
+    deltas: {(account_id, branch_id, period): (debit, credit)}
+
+    Each change is an `UPDATE ... SET debit = debit + x`, in a fixed key
+    order, so concurrent postings neither lose updates nor deadlock.
+    Missing rows are created.
+    """
+    deltas = {key: change for key, change in deltas.items() if any(change)}
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        for account_id, branch_id, period in sorted(deltas, key=_lock_order):
+            debit, credit = deltas[(account_id, branch_id, period)]
+            rows = AccountBalance.objects.filter(account_id=account_id, branch_id=branch_id, period=period)
+            if rows.update(debit=F('debit') + debit, credit=F('credit') + credit):
+                continue
+            try:
+                with transaction.atomic():
+                    AccountBalance.objects.create(
+                        tenant_id=tenant_id,
+                        account_id=account_id,
+                        branch_id=branch_id,
+                        period=period,
+                        debit=debit,
+                        credit=credit
+                    )
+            except IntegrityError:
+                # Another posting created it first
+                rows.update(debit=F('debit') + debit, credit=F('credit') + credit)
+
+def add_line_deltas(deltas, entry, lines, sign=1):
+    """
+    Add an entry's lines to a deltas dict for apply_balance_deltas().
+    lines: dicts with account_id, debit and credit, or LedgerLine instances.
+    """
+    period = period_start(entry.date)
+    for line in lines:
+        if isinstance(line, dict):
+            account_id, debit, credit = line['account_id'], line.get('debit', 0), line.get('credit', 0)
+        else:
+            account_id, debit, credit = line.account_id, line.debit, line.credit
+        key = (account_id, entry.branch_id, period)
+        old_debit, old_credit = deltas.get(key, (Decimal(0), Decimal(0)))
+        deltas[key] = (
+            old_debit + sign * Decimal(str(debit or 0)),
+            old_credit + sign * Decimal(str(credit or 0))
+        )
+    return deltas
+
+def reverse_entry_balances(entry):
+    """Take a journal entry that is being deleted out of the snapshots"""
+    lines = entry.lines.filter(is_deleted=False)
+    apply_balance_deltas(entry.tenant_id, add_line_deltas({}, entry, lines, sign=-1))
+
+def expected_balances(tenant_id=None):
+    """{(account_id, branch_id, period): (tenant_id, debit, credit)} summed from the raw ledger lines"""
+    lines = LedgerLine.objects.filter(is_deleted=False, entry__is_deleted=False)
+    if tenant_id:
+        lines = lines.filter(tenant_id=tenant_id)
+    rows = (
+        lines.annotate(period=TruncMonth('entry__date'))
+        .values('tenant_id', 'account_id', 'entry__branch_id', 'period')
+        .annotate(debit=Sum('debit'), credit=Sum('credit'))
+        .order_by()
+    )
+    return {
+        (row['account_id'], row['entry__branch_id'], row['period']): (row['tenant_id'], row['debit'], row['credit'])
+        for row in rows
+    }
+
+def verify_balances(tenant_id=None):
+    """
+    Compare the snapshots with the raw ledger lines.
+    Returns [(account_id, branch_id, period, expected (debit, credit), stored (debit, credit))].
+    """
+    expected = expected_balances(tenant_id)
+    snapshots = AccountBalance.objects.filter(is_deleted=False)
+    if tenant_id:
+        snapshots = snapshots.filter(tenant_id=tenant_id)
+    stored = {
+        (row.account_id, row.branch_id, row.period): (row.debit, row.credit)
+        for row in snapshots
+    }
+
+    mismatches = []
+    for key in expected.keys() | stored.keys():
+        want = expected[key][1:] if key in expected else (Decimal(0), Decimal(0))
+        have = stored.get(key, (Decimal(0), Decimal(0)))
+        if want != have:
+            mismatches.append((*key, want, have))
+    return mismatches
+
+def rebuild_balances(tenant_id=None):
+    """
+    Replace the snapshots with totals summed from the raw ledger lines.
+    Postings that commit while this runs can be lost, run it when the ledger is quiet.
+    Returns the number of rows written.
+    """
+    with transaction.atomic():
+        snapshots = AccountBalance.objects.all()
+        if tenant_id:
+            snapshots = snapshots.filter(tenant_id=tenant_id)
+        snapshots.delete()
+        rows = AccountBalance.objects.bulk_create([
+            AccountBalance(
+                tenant_id=row_tenant_id,
+                account_id=account_id,
+                branch_id=branch_id,
+                period=period,
+                debit=debit,
+                credit=credit
+            )
+            for (account_id, branch_id, period), (row_tenant_id, debit, credit) in expected_balances(tenant_id).items()
+        ], batch_size=1000)
+    return len(rows)
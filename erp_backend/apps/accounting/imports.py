@@ -0,0 +1,194 @@
+"""
+Bulk import of journal entries (opening balances, historical ledgers).
+
+Two input formats:
+
+JSON lines, one entry per line:
+    {"date": "2025-01-31", "description": "...", "reference": "...", "branch": "HQ",
+     "lines": [{"account": "1000", "debit": "100.00", "credit": "0", "description": "..."}, ...]}
+
+CSV, one ledger line per row, rows of the same entry next to each other:
+    entry,date,description,reference,branch,account,debit,credit,line_description
+
+"branch" is a branch code or id, "account" an account code ("account_id" is
+accepted too). Each entry is validated before it is written. Valid entries
+are written in chunks, one transaction per chunk, and problems are reported
+per entry with its row number instead of failing the whole file.
+"""
+import csv
+import json
+import uuid
+from decimal import Decimal, InvalidOperation
+from django.db import DatabaseError
+from django.utils.dateparse import parse_date
+from apps.tenants.models import Branch
+from .balances import period_start
+from .logic import check_balanced, create_journal_entries_bulk
+from .models import ClosedPeriod
+from .periods import PeriodClosed
+from .posting_rules import account_codes
+
+IMPORT_CHUNK_SIZE = 500
+
+def read_jsonl(stream):
+    """Yield (row number, entry dict) from a JSON lines text stream"""
+    for number, raw in enumerate(stream, start=1):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            yield number, json.loads(raw)
+        except ValueError as e:
+            yield number, {'_error': f'Invalid JSON: {e}'}
+
+def read_csv(stream):
+    """Yield (row number of the entry's first line, entry dict) from a CSV text stream"""
+    reader = csv.DictReader(stream)
+    missing = [column for column in ('date', 'account', 'debit', 'credit') if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+
+    current_key, current = None, None
+    for row in reader:
+        # Row 1 is the header
+        number = reader.line_num
+        key = row.get('entry') or (row['date'], row.get('reference', ''), row.get('description', ''))
+        if key != current_key:
+            if current is not None:
+                yield current
+            current_key = key
+            current = (number, {
+                'date': row['date'],
+                'description': row.get('description', ''),
+                'reference': row.get('reference', ''),
+                'branch': row.get('branch', ''),
+                'lines': [],
+            })
+        current[1]['lines'].append({
+            'account': row['account'],
+            'debit': row['debit'],
+            'credit': row['credit'],
+            'description': row.get('line_description', ''),
+        })
+    if current is not None:
+        yield current
+
+def _amount(value):
+    amount = Decimal(str(value or 0).strip() or 0)
+    if amount < 0 or not amount.is_finite():
+        raise ValueError(f'Invalid amount {value}')
+    return amount
+
+class EntryValidator:
+    """Turns raw entry dicts into specs for create_journal_entries_bulk()"""
+
+    def __init__(self, tenant_id, default_branch_id=None):
+        self.tenant_id = tenant_id
+        self.codes = account_codes(tenant_id)
+        self.account_ids = {str(account_id) for account_id in self.codes.values()}
+        self.branches = {}
+        for branch_id, code in Branch.objects.filter(tenant_id=tenant_id).values_list('id', 'code'):
+            self.branches[code] = branch_id
+            self.branches[str(branch_id)] = branch_id
+        self.default_branch_id = None
+        if default_branch_id:
+            self.default_branch_id = self.branches.get(str(default_branch_id))
+            if self.default_branch_id is None:
+                raise ValueError(f"Unknown branch '{default_branch_id}'")
+        # Entries in a closed month are reported on their own instead of failing their chunk
+        self.closed_periods = set(ClosedPeriod.objects.filter(
+            tenant_id=tenant_id, is_deleted=False
+        ).values_list('branch_id', 'period'))
+
+    def _account_id(self, line):
+        if line.get('account_id'):
+            if str(line['account_id']) not in self.account_ids:
+                raise ValueError(f"Unknown account id {line['account_id']}")
+            return uuid.UUID(str(line['account_id']))
+        code = str(line.get('account') or '').strip()
+        if code not in self.codes:
+            raise ValueError(f"Unknown account code '{code}'")
+        return self.codes[code]
+
+    def spec(self, raw):
+        """Validated spec for one entry; raises ValueError describing the first problem"""
+        if not isinstance(raw, dict):
+            raise ValueError('Expected an object per entry')
+        if '_error' in raw:
+            raise ValueError(raw['_error'])
+        day = parse_date(str(raw.get('date') or ''))
+        if day is None:
+            raise ValueError(f"Invalid date '{raw.get('date')}'")
+
+        branch_key = str(raw.get('branch') or '').strip()
+        branch_id = self.branches.get(branch_key) if branch_key else self.default_branch_id
+        if branch_id is None:
+            raise ValueError(f"Unknown branch '{branch_key}'" if branch_key else 'branch is required')
+        if (branch_id, period_start(day)) in self.closed_periods:
+            raise PeriodClosed(f"Period {day:%Y-%m} is closed for branch {branch_key or branch_id}")
+
+        raw_lines = raw.get('lines') or []
+        if len(raw_lines) < 2:
+            raise ValueError('An entry needs at least two lines')
+        lines = []
+        for line in raw_lines:
+            if not isinstance(line, dict):
+                raise ValueError('Expected an object per line')
+            try:
+                debit, credit = _amount(line.get('debit')), _amount(line.get('credit'))
+            except (InvalidOperation, ValueError):
+                raise ValueError(f"Invalid amount in line {line}")
+            lines.append({
+                'account_id': self._account_id(line),
+                'debit': debit,
+                'credit': credit,
+                'description': str(line.get('description') or '')[:255],
+            })
+        check_balanced(lines)
+
+        return {
+            'tenant_id': self.tenant_id,
+            'branch_id': branch_id,
+            'date': day,
+            'description': str(raw.get('description') or ''),
+            'reference': str(raw.get('reference') or '')[:100],
+            'source_type': 'import',
+            'lines': lines,
+        }
+
+def import_journal_entries(tenant_id, rows, default_branch_id=None, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False):
+    """
+    rows: iterable of (row number, raw entry dict), e.g. from read_csv() or read_jsonl().
+    Invalid entries are skipped and reported; valid ones are written in chunks
+    of chunk_size, each chunk in its own transaction.
+    Returns {'created': count, 'errors': [{'row': n, 'error': message}]}.
+    """
+    validator = EntryValidator(tenant_id, default_branch_id)
+    created = 0
+    errors = []
+    chunk = []
+
+    def flush():
+        nonlocal created
+        if not dry_run:
+            try:
+                create_journal_entries_bulk([spec for number, spec in chunk])
+            except (DatabaseError, ValueError) as e:
+                errors.extend({'row': number, 'error': f'Not written, chunk failed: {e}'} for number, spec in chunk)
+                chunk.clear()
+                return
+        created += len(chunk)
+        chunk.clear()
+
+    for number, raw in rows:
+        try:
+            chunk.append((number, validator.spec(raw)))
+        except ValueError as e:
+            errors.append({'row': number, 'error': str(e)})
+            continue
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+
+    return {'created': created, 'errors': errors}
@@ -1,77 +1,116 @@
+from decimal import Decimal
 from django.db import transaction
-from .models import Account, JournalEntry, LedgerLine
+from .balances import add_line_deltas, apply_balance_deltas
+from .models import GLOutbox, JournalEntry, LedgerLine
+from .periods import check_periods_open
+from .posting_rules import posting_accounts
+
+def check_balanced(lines):
+    """Raise ValueError unless the lines' debits equal their credits"""
+    total_debit = sum(Decimal(str(line.get('debit', 0))) for line in lines)
+    total_credit = sum(Decimal(str(line.get('credit', 0))) for line in lines)
+    if abs(total_debit - total_credit) > Decimal('0.001'):
+        raise ValueError(f"Debits ({total_debit}) and credits ({total_credit}) must be equal")
 
 def create_journal_entry(tenant, branch, date, description, lines, source_type=None, source_id=None, reference=''):
     """
     lines: list of dicts {'account_id': id, 'debit': amount, 'credit': amount, 'description': str}
+    The lines are checked to balance before anything is written.
     """
+    return create_journal_entries_bulk([{
+        'tenant_id': tenant.pk,
+        'branch_id': branch.pk,
+        'date': date,
+        'description': description,
+        'lines': lines,
+        'source_type': source_type,
+        'source_id': source_id,
+        'reference': reference,
+    }])[0]
+
+def create_journal_entries_bulk(entries):
+    """
+    Create many journal entries with two INSERTs.
+    entries: list of dicts with the keys tenant_id, branch_id, date, description,
+    lines, and optionally source_type, source_id, reference. Passing 'entry'
+    (an existing JournalEntry) instead appends the lines to that entry.
+    Every entry is checked to balance, and to fall in an open period (see
+    apps.accounting.periods), before anything is written.
+    """
+    for spec in entries:
+        check_balanced(spec['lines'])
+
     with transaction.atomic():
-        entry = JournalEntry.objects.create(
-            tenant=tenant,
-            branch=branch,
-            date=date,
-            description=description,
-            source_type=source_type,
-            source_id=source_id,
-            reference=reference
-        )
-        
-        total_debit = 0
-        total_credit = 0
-
-        for line in lines:
-            debit = line.get('debit', 0)
-            credit = line.get('credit', 0)
-            total_debit += debit
-            total_credit += credit
-
-            LedgerLine.objects.create(
-                tenant=tenant,
-                entry=entry,
+        check_periods_open([spec['entry'] if spec.get('entry') is not None else spec for spec in entries])
+        new_entries = []
+        for spec in entries:
+            if spec.get('entry') is None:
+                spec['entry'] = JournalEntry(
+                    tenant_id=spec['tenant_id'],
+                    branch_id=spec['branch_id'],
+                    date=spec['date'],
+                    description=spec['description'],
+                    source_type=spec.get('source_type') or '',
+                    source_id=spec.get('source_id'),
+                    reference=spec.get('reference', '')
+                )
+                new_entries.append(spec['entry'])
+        JournalEntry.objects.bulk_create(new_entries)
+
+        LedgerLine.objects.bulk_create([
+            LedgerLine(
+                tenant_id=spec['entry'].tenant_id,
+                entry=spec['entry'],
                 account_id=line['account_id'],
-                debit=debit,
-                credit=credit,
+                debit=line.get('debit', 0),
+                credit=line.get('credit', 0),
                 description=line.get('description', '')
             )
-        
-        # Basic validation: debits must equal credits
-        if abs(total_debit - total_credit) > 0.001:
-            raise ValueError(f"Debits ({total_debit}) and credits ({total_credit}) must be equal")
-            
-        return entry
+            for spec in entries
+            for line in spec['lines']
+        ])
 
-def post_sale_to_gl(sale):
+        # One UPDATE per (account, branch, month) touched, however many entries
+        deltas = {}
+        for spec in entries:
+            add_line_deltas(deltas.setdefault(spec['entry'].tenant_id, {}), spec['entry'], spec['lines'])
+        for tenant_id, tenant_deltas in deltas.items():
+            apply_balance_deltas(tenant_id, tenant_deltas)
+
+    return [spec['entry'] for spec in entries]
+
+def sale_lines(accounts, total, subtotal, tax, description):
     """
-    Automatically creates a journal entry for a POS sale.
     Dr. Cash/Bank (Total)
     Cr. Sales Revenue (Subtotal)
     Cr. Sales Tax Payable (Tax)
+    accounts: {'cash': id, 'revenue': id, 'tax_payable': id}
+    """
+    lines = [
+        {'account_id': accounts['cash'], 'debit': total, 'credit': 0, 'description': description},
+        {'account_id': accounts['revenue'], 'debit': 0, 'credit': subtotal, 'description': "Sales Revenue"},
+    ]
+
+    if tax > 0:
+        lines.append({'account_id': accounts['tax_payable'], 'debit': 0, 'credit': tax, 'description': "Sales Tax"})
+
+    return lines
+
+def post_sale_to_gl(sale):
+    """
+    Automatically creates a journal entry for a POS sale.
+    POS flows queue sales with enqueue_sale_postings() instead, see apps.accounting.outbox.
     """
     tenant = sale.tenant
     branch = sale.branch
-    
-    # Standard COA Codes (should be configurable in tenant settings)
-    accounts = {
-        'cash': '1000',
-        'revenue': '4000',
-        'tax_payable': '2200'
-    }
 
     try:
-        cash_acc = Account.objects.get(tenant=tenant, code=accounts['cash'])
-        rev_acc = Account.objects.get(tenant=tenant, code=accounts['revenue'])
-        tax_acc = Account.objects.get(tenant=tenant, code=accounts['tax_payable'])
-    except Account.DoesNotExist:
+        accounts = posting_accounts(sale.tenant_id, 'sale')
+    except ValueError:
         # Fallback or error handling
         return
 
-    lines = [
-        {'account_id': cash_acc.id, 'debit': sale.total_amount, 'credit': 0, 'description': f"Receipt {sale.receipt_number}"},
-        {'account_id': rev_acc.id, 'debit': 0, 'credit': sale.subtotal, 'description': "Sales Revenue"},
-    ]
-
-    if sale.tax_amount > 0:
-        lines.append({'account_id': tax_acc.id, 'debit': 0, 'credit': sale.tax_amount, 'description': "Sales Tax"})
+    lines = sale_lines(accounts, sale.total_amount, sale.subtotal, sale.tax_amount, f"Receipt {sale.receipt_number}")
 
     create_journal_entry(
         tenant, branch, sale.created_at.date(),
@@ -82,6 +121,27 @@ def post_sale_to_gl(sale):
         reference=sale.receipt_number
     )
 
+def enqueue_sale_postings(sales):
+    """
+    Queue POS sales for GL posting. Call inside the transaction that writes
+    the sales so a sale and its outbox row commit (or roll back) together.
+    Sales already queued are ignored.
+    """
+    GLOutbox.objects.bulk_create([
+        GLOutbox(
+            tenant_id=sale.tenant_id,
+            source_type='pos_sale',
+            source_id=sale.id,
+            branch_id=sale.branch_id,
+            date=sale.created_at.date(),
+            reference=sale.receipt_number or '',
+            total_amount=sale.total_amount,
+            subtotal=sale.subtotal,
+            tax_amount=sale.tax_amount or 0
+        )
+        for sale in sales
+    ], ignore_conflicts=True)
+
 def post_invoice_to_gl(invoice):
     """
     Dr. Accounts Receivable
@@ -89,22 +149,19 @@ def post_invoice_to_gl(invoice):
     Cr. Tax Payable
     """
     tenant = invoice.tenant
-    accounts = {'ar': '1200', 'revenue': '4000', 'tax': '2200'}
-    
+
     try:
-        ar_acc = Account.objects.get(tenant=tenant, code=accounts['ar'])
-        rev_acc = Account.objects.get(tenant=tenant, code=accounts['revenue'])
-        tax_acc = Account.objects.get(tenant=tenant, code=accounts['tax'])
-    except Account.DoesNotExist:
+        accounts = posting_accounts(invoice.tenant_id, 'invoice')
+    except ValueError:
         return
 
     lines = [
-        {'account_id': ar_acc.id, 'debit': invoice.total_amount, 'credit': 0},
-        {'account_id': rev_acc.id, 'debit': 0, 'credit': invoice.subtotal},
+        {'account_id': accounts['ar'], 'debit': invoice.total_amount, 'credit': 0},
+        {'account_id': accounts['revenue'], 'debit': 0, 'credit': invoice.subtotal},
     ]
 
     if invoice.tax_total > 0:
-        lines.append({'account_id': tax_acc.id, 'debit': 0, 'credit': invoice.tax_total})
+        lines.append({'account_id': accounts['tax'], 'debit': 0, 'credit': invoice.tax_total})
 
     create_journal_entry(
         tenant, invoice.branch, invoice.date,
@@ -122,22 +179,19 @@ def post_bill_to_gl(bill):
     Cr. Accounts Payable
     """
     tenant = bill.tenant
-    accounts = {'ap': '2000', 'expense': '5000', 'input_tax': '1300'}
-    
+
     try:
-        ap_acc = Account.objects.get(tenant=tenant, code=accounts['ap'])
-        exp_acc = Account.objects.get(tenant=tenant, code=accounts['expense'])
-        tax_acc = Account.objects.get(tenant=tenant, code=accounts['input_tax'])
-    except Account.DoesNotExist:
+        accounts = posting_accounts(bill.tenant_id, 'bill')
+    except ValueError:
         return
 
     lines = [
-        {'account_id': exp_acc.id, 'debit': bill.subtotal, 'credit': 0},
-        {'account_id': ap_acc.id, 'debit': 0, 'credit': bill.total_amount},
+        {'account_id': accounts['expense'], 'debit': bill.subtotal, 'credit': 0},
+        {'account_id': accounts['ap'], 'debit': 0, 'credit': bill.total_amount},
     ]
 
     if bill.tax_amount > 0:
-        lines.append({'account_id': tax_acc.id, 'debit': bill.tax_amount, 'credit': 0})
+        lines.append({'account_id': accounts['input_tax'], 'debit': bill.tax_amount, 'credit': 0})
 
     create_journal_entry(
         tenant, bill.branch, bill.date,
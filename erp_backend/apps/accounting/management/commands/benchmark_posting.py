@@ -0,0 +1,58 @@
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.tenants.models import Tenant, Branch
+from apps.sales.models import Sale
+from apps.accounting.logic import post_sale_to_gl
+from apps.accounting.models import Account
+from apps.accounting.posting_rules import DEFAULT_POSTING_RULES, invalidate_account_cache
+
+class Command(BaseCommand):
+    help = (
+        "Post sales to the GL with a cold and a warm account cache and compare queries per posting. "
+        "Creates a throwaway tenant and deletes it afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sales', type=int, default=200)
+
+    def _run(self, tenant, sales, cold):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            for sale in sales:
+                if cold:
+                    invalidate_account_cache(tenant.id)
+                post_sale_to_gl(sale)
+            elapsed = time.perf_counter() - started
+        return len(ctx.captured_queries), elapsed
+
+    def handle(self, *args, **options):
+        count = options['sales']
+        tenant = Tenant.objects.create(name='Posting benchmark', subdomain=f'posting-bench-{uuid.uuid4().hex[:8]}')
+        try:
+            branch = Branch.objects.create(tenant=tenant, name='Bench', code='BENCH', address='', phone='')
+            codes = {code for rules in DEFAULT_POSTING_RULES.values() for code in rules.values()}
+            Account.objects.bulk_create([
+                Account(tenant=tenant, code=code, name=f'Bench {code}', account_type='asset')
+                for code in sorted(codes)
+            ])
+            Sale.objects.bulk_create([
+                Sale(
+                    tenant=tenant, branch=branch, receipt_number=f'BENCH-{uuid.uuid4().hex[:12]}',
+                    subtotal=100, tax_amount=10, total_amount=110, paid_amount=110
+                )
+                for _ in range(count * 2)
+            ])
+            sales = list(Sale.objects.filter(tenant=tenant).select_related('tenant', 'branch'))
+
+            for label, batch, cold in (('cold cache', sales[:count], True), ('warm cache', sales[count:], False)):
+                queries, elapsed = self._run(tenant, batch, cold)
+                self.stdout.write(
+                    f"{label}: {count} postings, {queries} queries ({queries / count:.1f}/posting), "
+                    f"{elapsed:.2f}s ({count / elapsed:.0f} postings/s)"
+                )
+        finally:
+            invalidate_account_cache(tenant.id)
+            tenant.delete()
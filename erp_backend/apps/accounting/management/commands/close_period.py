@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from apps.accounting.periods import close_period
+from apps.tenants.models import Branch
+
+class Command(BaseCommand):
+    help = (
+        "Close a month for one branch (or every branch of the tenant): lock it against "
+        "postings and write its closing balances. --archive also moves its detailed "
+        "ledger lines to the archive table, leaving one summary line per account."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', required=True)
+        parser.add_argument('--period', required=True, help='YYYY-MM')
+        parser.add_argument('--branch', help='Branch code; default: every branch')
+        parser.add_argument('--archive', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            month = parse_date(f"{options['period']}-01")
+        except ValueError:
+            month = None
+        if month is None:
+            raise CommandError('--period must be YYYY-MM')
+        branches = Branch.objects.filter(tenant_id=options['tenant'])
+        if options['branch']:
+            branches = branches.filter(code=options['branch'])
+        if not branches:
+            raise CommandError('No such branch')
+
+        for branch in branches:
+            try:
+                close_period(options['tenant'], branch.id, month, archive=options['archive'])
+            except ValueError as e:
+                self.stderr.write(f"{branch.code}: {e}")
+                continue
+            self.stdout.write(self.style.SUCCESS(f"{branch.code}: closed {month:%Y-%m}"))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.accounting.imports import IMPORT_CHUNK_SIZE, import_journal_entries, read_csv, read_jsonl
+
+class Command(BaseCommand):
+    help = (
+        "Import journal entries (opening balances, historical ledgers) from a CSV or "
+        "JSON lines file. See apps.accounting.imports for the formats. Bad entries are "
+        "reported by row and skipped, the rest are written in chunked transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--tenant', required=True)
+        parser.add_argument('--branch', help='Branch code or id for entries that name none')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Default: from the file extension')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help='Entries per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, write nothing')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+        with open(path, newline='', encoding='utf-8-sig') as stream:
+            try:
+                result = import_journal_entries(
+                    options['tenant'],
+                    read_csv(stream) if fmt == 'csv' else read_jsonl(stream),
+                    default_branch_id=options['branch'],
+                    chunk_size=options['chunk_size'],
+                    dry_run=options['dry_run']
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stderr.write(f"row {error['row']}: {error['error']}")
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(f"{verb} {result['created']} entries, {len(result['errors'])} rejected")
+        if result['errors']:
+            raise CommandError('Some entries were not imported')
+        self.stdout.write(self.style.SUCCESS('OK'))
@@ -0,0 +1,21 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.accounting.outbox import drain_gl_outbox
+
+class Command(BaseCommand):
+    help = "Post queued POS sales from the GL outbox to the general ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Only post this tenant\'s outbox')
+        parser.add_argument('--batch-size', type=int, default=500, help='Outbox rows posted per transaction')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new rows')
+        parser.add_argument('--interval', type=float, default=10, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            count = drain_gl_outbox(options['tenant'], batch_size=options['batch_size'])
+            if count:
+                self.stdout.write(f"Posted {count} outbox row(s)")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
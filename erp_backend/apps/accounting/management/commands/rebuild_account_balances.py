@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.accounting.balances import rebuild_balances, verify_balances
+
+class Command(BaseCommand):
+    help = (
+        "Check the per-month account balance snapshots against the raw ledger lines, "
+        "and rebuild them from the lines. Rebuild while nothing is being posted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Only this tenant\'s balances')
+        parser.add_argument('--verify', action='store_true', help='Only report mismatches, change nothing')
+
+    def handle(self, *args, **options):
+        tenant_id = options['tenant']
+        if options['verify']:
+            mismatches = verify_balances(tenant_id)
+            for account_id, branch_id, period, expected, stored in mismatches[:50]:
+                self.stdout.write(
+                    f"account={account_id} branch={branch_id} period={period:%Y-%m} "
+                    f"lines debit/credit={expected[0]}/{expected[1]} snapshot={stored[0]}/{stored[1]}"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} balance snapshot(s) differ from the ledger")
+            self.stdout.write(self.style.SUCCESS('OK: snapshots match the ledger'))
+            return
+
+        count = rebuild_balances(tenant_id)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} balance snapshot(s)"))
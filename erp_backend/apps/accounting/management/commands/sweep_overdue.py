@@ -0,0 +1,33 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from apps.accounting.overdue import sweep_overdue
+
+class Command(BaseCommand):
+    help = (
+        "Mark open invoices and bills past their due date as overdue (and overdue "
+        "ones with a later due date as open again), for every tenant or one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Only sweep this tenant')
+        parser.add_argument('--date', help='Sweep as of this day (YYYY-MM-DD); default: today')
+        parser.add_argument('--loop', action='store_true', help='Keep sweeping')
+        parser.add_argument('--interval', type=float, default=3600, help='Seconds between sweeps with --loop')
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            today = parse_date(options['date'])
+            if today is None:
+                raise CommandError('--date must be YYYY-MM-DD')
+
+        while True:
+            totals = sweep_overdue(options['tenant'], today)
+            self.stdout.write(self.style.SUCCESS(
+                f"{totals['invoices']} invoice(s) and {totals['bills']} bill(s) changed "
+                f"across {totals['tenants']} tenant(s) in {totals['seconds']}s"
+            ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,63 @@
+# Generated manually
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0001_initial'),
+        ('users', '0001_initial'),
+        ('accounting', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostingProfile',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('sale_aggregation', models.CharField(choices=[('none', 'One journal entry per sale'), ('daily', 'One journal entry per branch per day')], default='none', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='postingprofile_created', to='users.user')),
+                ('updated_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='postingprofile_updated', to='users.user')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant')),
+            ],
+            options={
+                'unique_together': {('tenant',)},
+            },
+        ),
+        migrations.CreateModel(
+            name='GLOutbox',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('source_type', models.CharField(max_length=50)),
+                ('source_id', models.UUIDField()),
+                ('date', models.DateField()),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('tax_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('posted', 'Posted'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('posted_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='gloutbox_created', to='users.user')),
+                ('updated_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='gloutbox_updated', to='users.user')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.branch')),
+                ('entry', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbox_items', to='accounting.journalentry')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant')),
+            ],
+            options={
+                'unique_together': {('source_type', 'source_id')},
+            },
+        ),
+    ]
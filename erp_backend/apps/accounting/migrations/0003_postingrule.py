@@ -0,0 +1,35 @@
+# Generated manually
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0001_initial'),
+        ('users', '0001_initial'),
+        ('accounting', '0002_postingprofile_gloutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostingRule',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('document', models.CharField(choices=[('sale', 'POS Sale'), ('invoice', 'Invoice'), ('bill', 'Bill')], max_length=20)),
+                ('role', models.CharField(max_length=30)),
+                ('account_code', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='postingrule_created', to='users.user')),
+                ('updated_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='postingrule_updated', to='users.user')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant')),
+            ],
+            options={
+                'unique_together': {('tenant', 'document', 'role')},
+            },
+        ),
+    ]
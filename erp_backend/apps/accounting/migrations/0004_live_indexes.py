@@ -0,0 +1,41 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+def live_index(name):
+    return models.Index(
+        fields=['tenant', 'created_at', 'id'],
+        condition=models.Q(is_deleted=False),
+        name=name,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0003_postingrule'),
+    ]
+
+    # Only models and columns present in the migration state so far.
+    # Tax, Vendor, Bill and JournalEntry.source_* get theirs with their own migrations.
+    operations = [
+        migrations.AddIndex(model_name='account', index=live_index('accounting_account_live')),
+        migrations.AddIndex(model_name='journalentry', index=live_index('accounting_journalentry_live')),
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(condition=models.Q(is_deleted=False), fields=['tenant', 'date'], name='journalentry_date_live'),
+        ),
+        migrations.AddIndex(model_name='ledgerline', index=live_index('accounting_ledgerline_live')),
+        migrations.AddIndex(
+            model_name='ledgerline',
+            index=models.Index(condition=models.Q(is_deleted=False), fields=['account', 'entry'], name='ledgerline_account_live'),
+        ),
+        migrations.AddIndex(model_name='postingrule', index=live_index('accounting_postingrule_live')),
+        migrations.AddIndex(model_name='postingprofile', index=live_index('accounting_postingprofile_live')),
+        migrations.AddIndex(model_name='gloutbox', index=live_index('accounting_gloutbox_live')),
+        migrations.AddIndex(
+            model_name='gloutbox',
+            index=models.Index(condition=models.Q(status='pending'), fields=['next_attempt_at', 'created_at'], name='gloutbox_due'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated manually
+
+import apps.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0004_live_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='account',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='journalentry',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='ledgerline',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='postingprofile',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='gloutbox',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='postingrule',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
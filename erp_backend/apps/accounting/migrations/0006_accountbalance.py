@@ -0,0 +1,67 @@
+# Generated manually
+
+import apps.core.models
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+
+def build_snapshots(apps, schema_editor):
+    LedgerLine = apps.get_model('accounting', 'LedgerLine')
+    AccountBalance = apps.get_model('accounting', 'AccountBalance')
+    rows = (
+        LedgerLine.objects.filter(is_deleted=False, entry__is_deleted=False)
+        .annotate(period=TruncMonth('entry__date'))
+        .values('tenant_id', 'account_id', 'entry__branch_id', 'period')
+        .annotate(debit=Sum('debit'), credit=Sum('credit'))
+        .order_by()
+    )
+    AccountBalance.objects.bulk_create([
+        AccountBalance(
+            tenant_id=row['tenant_id'],
+            account_id=row['account_id'],
+            branch_id=row['entry__branch_id'],
+            period=row['period'],
+            debit=row['debit'],
+            credit=row['credit']
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0002_uuid7_ids'),
+        ('users', '0002_uuid7_ids'),
+        ('accounting', '0005_uuid7_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountBalance',
+            fields=[
+                ('id', models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('period', models.DateField()),
+                ('debit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('credit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='accountbalance_created', to='users.user')),
+                ('updated_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='accountbalance_updated', to='users.user')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant')),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='period_balances', to='accounting.account')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.branch')),
+            ],
+            options={
+                'unique_together': {('account', 'branch', 'period')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='accountbalance',
+            index=models.Index(condition=models.Q(is_deleted=False), fields=['tenant', 'created_at', 'id'], name='accounting_accountbalance_live'),
+        ),
+        migrations.RunPython(build_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+def build_paths(apps, schema_editor):
+    Account = apps.get_model('accounting', 'Account')
+    parents = dict(Account.objects.values_list('id', 'parent_id'))
+    paths = {}
+    for account_id in parents:
+        chain = []
+        node = account_id
+        while node is not None and node not in paths and node not in chain:
+            chain.append(node)
+            node = parents.get(node)
+        prefix = paths.get(node, '')
+        for node in reversed(chain):
+            prefix = paths[node] = f'{prefix}{node.hex}/'
+    Account.objects.bulk_update(
+        [Account(id=account_id, path=path) for account_id, path in paths.items()],
+        ['path'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0006_accountbalance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=1024),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+    ]
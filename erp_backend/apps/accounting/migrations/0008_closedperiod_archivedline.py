@@ -0,0 +1,66 @@
+# Generated manually
+
+import apps.core.models
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def live_index(name):
+    return models.Index(
+        fields=['tenant', 'created_at', 'id'],
+        condition=models.Q(is_deleted=False),
+        name=name,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0002_uuid7_ids'),
+        ('users', '0002_uuid7_ids'),
+        ('accounting', '0007_account_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClosedPeriod',
+            fields=[
+                ('id', models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('period', models.DateField()),
+                ('closed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_archived', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='closedperiod_created', to='users.user')),
+                ('updated_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='closedperiod_updated', to='users.user')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.branch')),
+                ('summary_entry', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounting.journalentry')),
+            ],
+            options={
+                'unique_together': {('tenant', 'branch', 'period')},
+            },
+        ),
+        migrations.AddIndex(model_name='closedperiod', index=live_index('accounting_closedperiod_live')),
+        migrations.CreateModel(
+            name='ArchivedLine',
+            fields=[
+                ('id', models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('debit', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('credit', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archivedline_created', to='users.user')),
+                ('updated_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archivedline_updated', to='users.user')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant')),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_lines', to='accounting.journalentry')),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounting.account')),
+            ],
+        ),
+        migrations.AddIndex(model_name='archivedline', index=live_index('accounting_archivedline_live')),
+    ]
@@ -0,0 +1,67 @@
+# Generated manually
+
+import apps.core.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def live_index(name):
+    return models.Index(
+        fields=['tenant', 'created_at', 'id'],
+        condition=models.Q(is_deleted=False),
+        name=name,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0002_uuid7_ids'),
+        ('users', '0002_uuid7_ids'),
+        ('accounting', '0008_closedperiod_archivedline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankStatement',
+            fields=[
+                ('id', models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('matched_count', models.IntegerField(default=0)),
+                ('suggested_count', models.IntegerField(default=0)),
+                ('unmatched_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bankstatement_created', to='users.user')),
+                ('updated_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bankstatement_updated', to='users.user')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant')),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bank_statements', to='accounting.account')),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='tenants.branch')),
+            ],
+        ),
+        migrations.AddIndex(model_name='bankstatement', index=live_index('accounting_bankstatement_live')),
+        migrations.CreateModel(
+            name='StatementLine',
+            fields=[
+                ('id', models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('matched', 'Matched'), ('suggested', 'Suggested'), ('unmatched', 'Unmatched')], default='unmatched', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statementline_created', to='users.user')),
+                ('updated_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statementline_updated', to='users.user')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant')),
+                ('statement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='accounting.bankstatement')),
+                ('ledger_line', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statement_lines', to='accounting.ledgerline')),
+            ],
+        ),
+        migrations.AddIndex(model_name='statementline', index=live_index('accounting_statementline_live')),
+        migrations.AddIndex(model_name='statementline', index=models.Index(fields=['statement', 'status'], name='statementline_status')),
+    ]
@@ -0,0 +1,19 @@
+# Generated manually
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0009_bankstatement_statementline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statementline',
+            name='archived_line',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statement_lines', to='accounting.archivedline'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated manually
+
+import apps.core.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def live_index(name):
+    return models.Index(
+        fields=['tenant', 'created_at', 'id'],
+        condition=models.Q(is_deleted=False),
+        name=name,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0002_uuid7_ids'),
+        ('users', '0002_uuid7_ids'),
+        ('accounting', '0010_statementline_archived_line'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Vendor',
+            fields=[
+                ('id', models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('email', models.EmailField(blank=True, max_length=254)),
+                ('phone', models.CharField(blank=True, max_length=20)),
+                ('address', models.TextField(blank=True)),
+                ('tax_number', models.CharField(blank=True, max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='vendor_created', to='users.user')),
+                ('updated_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='vendor_updated', to='users.user')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant')),
+            ],
+        ),
+        migrations.AddIndex(model_name='vendor', index=live_index('accounting_vendor_live')),
+        migrations.CreateModel(
+            name='Bill',
+            fields=[
+                ('id', models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('bill_number', models.CharField(max_length=50)),
+                ('date', models.DateField()),
+                ('due_date', models.DateField()),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('tax_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('open', 'Open'), ('paid', 'Paid'), ('overdue', 'Overdue'), ('cancelled', 'Cancelled')], default='draft', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bill_created', to='users.user')),
+                ('updated_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bill_updated', to='users.user')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant')),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bills', to='accounting.vendor')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tenants.branch')),
+            ],
+        ),
+        migrations.AddIndex(model_name='bill', index=live_index('accounting_bill_live')),
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(condition=models.Q(is_deleted=False, status__in=['open', 'overdue']), fields=['tenant', 'due_date'], name='bill_open_due'),
+        ),
+    ]
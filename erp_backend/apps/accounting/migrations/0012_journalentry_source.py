@@ -0,0 +1,27 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0011_vendor_bill'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journalentry',
+            name='source_type',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='journalentry',
+            name='source_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(fields=['source_type', 'source_id'], name='journalentry_source'),
+        ),
+    ]
@@ -1,4 +1,8 @@
-from django.db import models
+import uuid
+from django.db import models, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+from django.utils import timezone
 from apps.core.models import TenantAwareModel
 
 class Account(TenantAwareModel):
@@ -14,13 +18,38 @@ class Account(TenantAwareModel):
     name = models.CharField(max_length=100)
     account_type = models.CharField(max_length=20, choices=ACCOUNT_TYPES)
     parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='children')
+    # Materialized path: ids (hex) from the root down to this account, each followed by '/'.
+    # Descendants are path__startswith=path. Maintained by save().
+    path = models.CharField(max_length=1024, blank=True, editable=False, db_index=True)
 
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         unique_together = ('tenant', 'code')
 
     def __str__(self):
         return f"{self.code} - {self.name}"
 
+    def ancestor_ids(self):
+        """Ids of the accounts above this one, root first"""
+        return [uuid.UUID(part) for part in self.path.split('/')[:-2]]
+
+    def save(self, *args, **kwargs):
+        parent_path = ''
+        if self.parent_id:
+            parent_path = Account.objects.values_list('path', flat=True).get(pk=self.parent_id)
+            if self.parent_id == self.pk or self.pk.hex in parent_path.split('/'):
+                raise ValueError('An account cannot be moved under itself or one of its sub-accounts')
+        old_path, self.path = self.path, f'{parent_path}{self.pk.hex}/'
+        if kwargs.get('update_fields') is not None and 'parent' in kwargs['update_fields']:
+            kwargs['update_fields'] = [*kwargs['update_fields'], 'path']
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if old_path and old_path != self.path:
+                # Re-parented: rewrite the prefix of every descendant in one UPDATE
+                Account.objects.filter(tenant_id=self.tenant_id, path__startswith=old_path).exclude(pk=self.pk).update(
+                    path=Concat(Value(self.path), Substr('path', len(old_path) + 1))
+                )
+
 class Tax(TenantAwareModel):
     name = models.CharField(max_length=50)
     rate = models.DecimalField(max_digits=5, decimal_places=2) # e.g. 15.00 for 15%
@@ -47,6 +76,23 @@ class JournalEntry(TenantAwareModel):
     source_type = models.CharField(max_length=50, blank=True) # e.g., 'invoice', 'bill', 'pos_sale'
     source_id = models.UUIDField(null=True, blank=True)
 
+    class Meta(TenantAwareModel.Meta):
+        indexes = TenantAwareModel.Meta.indexes + [
+            # Reports by period
+            models.Index(fields=['tenant', 'date'], condition=models.Q(is_deleted=False), name='journalentry_date_live'),
+            # Finding the entry posted for a document
+            models.Index(fields=['source_type', 'source_id'], name='journalentry_source'),
+        ]
+
+    def delete(self, **kwargs):
+        from .balances import reverse_entry_balances
+        from .periods import check_periods_open
+        with transaction.atomic():
+            if not self.is_deleted:
+                check_periods_open([self])
+                reverse_entry_balances(self)
+            super().delete(**kwargs)
+
 class LedgerLine(TenantAwareModel):
     entry = models.ForeignKey(JournalEntry, on_delete=models.CASCADE, related_name='lines')
     account = models.ForeignKey(Account, on_delete=models.CASCADE)
@@ -54,6 +100,27 @@ class LedgerLine(TenantAwareModel):
     credit = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     description = models.CharField(max_length=255, blank=True)
 
+    class Meta(TenantAwareModel.Meta):
+        indexes = TenantAwareModel.Meta.indexes + [
+            # Account balances and ledgers
+            models.Index(fields=['account', 'entry'], condition=models.Q(is_deleted=False), name='ledgerline_account_live'),
+        ]
+
+class AccountBalance(TenantAwareModel):
+    """
+    Debit and credit totals of an account's ledger lines per branch and month.
+    Kept up to date in the transaction that posts (or deletes) journal entries,
+    see apps.accounting.balances.
+    """
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='period_balances')
+    branch = models.ForeignKey('tenants.Branch', on_delete=models.CASCADE)
+    period = models.DateField()  # First day of the month
+    debit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    credit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta(TenantAwareModel.Meta):
+        unique_together = ('account', 'branch', 'period')
+
 class Bill(TenantAwareModel):
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='bills')
     branch = models.ForeignKey('tenants.Branch', on_delete=models.CASCADE)
@@ -73,5 +140,138 @@ class Bill(TenantAwareModel):
     )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
 
+    class Meta(TenantAwareModel.Meta):
+        indexes = TenantAwareModel.Meta.indexes + [
+            # Aged payables: bills still owed, by due date
+            models.Index(fields=['tenant', 'due_date'], condition=models.Q(is_deleted=False, status__in=['open', 'overdue']), name='bill_open_due'),
+        ]
+
     def __str__(self):
         return f"Bill {self.bill_number} - {self.vendor.name}"
+
+class PostingRule(TenantAwareModel):
+    """
+    Account used for one role of an automatic posting, e.g. sale/cash -> 1000.
+    Roles without a rule use DEFAULT_POSTING_RULES in apps.accounting.posting_rules.
+    """
+    DOCUMENT_CHOICES = (
+        ('sale', 'POS Sale'),
+        ('invoice', 'Invoice'),
+        ('bill', 'Bill'),
+    )
+    document = models.CharField(max_length=20, choices=DOCUMENT_CHOICES)
+    role = models.CharField(max_length=30)  # e.g. 'cash', 'revenue', 'tax_payable'
+    account_code = models.CharField(max_length=20)
+
+    class Meta(TenantAwareModel.Meta):
+        unique_together = ('tenant', 'document', 'role')
+
+    def __str__(self):
+        return f"{self.document}/{self.role} -> {self.account_code}"
+
+class PostingProfile(TenantAwareModel):
+    """Per-tenant preferences for automatic GL postings"""
+    SALE_AGGREGATION_CHOICES = (
+        ('none', 'One journal entry per sale'),
+        ('daily', 'One journal entry per branch per day'),
+    )
+    sale_aggregation = models.CharField(max_length=20, choices=SALE_AGGREGATION_CHOICES, default='none')
+
+    class Meta(TenantAwareModel.Meta):
+        unique_together = ('tenant',)
+
+class GLOutbox(TenantAwareModel):
+    """
+    Pending GL posting for a POS sale.
+    Written in the same transaction as the sale and posted later in batches
+    by apps.accounting.outbox, so checkout does not wait on ledger writes.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('posted', 'Posted'),
+        ('failed', 'Failed'),
+    )
+    source_type = models.CharField(max_length=50)  # e.g. 'pos_sale'
+    source_id = models.UUIDField()
+    branch = models.ForeignKey('tenants.Branch', on_delete=models.CASCADE)
+    date = models.DateField()
+    reference = models.CharField(max_length=100, blank=True)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2)
+    tax_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    entry = models.ForeignKey(JournalEntry, on_delete=models.SET_NULL, null=True, blank=True, related_name='outbox_items')
+    posted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta(TenantAwareModel.Meta):
+        unique_together = ('source_type', 'source_id')
+        indexes = TenantAwareModel.Meta.indexes + [
+            # Rows the poster picks up next
+            models.Index(fields=['next_attempt_at', 'created_at'], condition=models.Q(status='pending'), name='gloutbox_due'),
+        ]
+
+class ClosedPeriod(TenantAwareModel):
+    """
+    A closed month for one branch. Nothing can be posted to (or deleted from)
+    a closed period, see apps.accounting.periods.
+    """
+    branch = models.ForeignKey('tenants.Branch', on_delete=models.CASCADE)
+    period = models.DateField()  # First day of the month
+    closed_at = models.DateTimeField(default=timezone.now)
+    # Detailed lines moved to ArchivedLine, one summary line per account left in LedgerLine
+    is_archived = models.BooleanField(default=False)
+    summary_entry = models.ForeignKey(JournalEntry, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    class Meta(TenantAwareModel.Meta):
+        unique_together = ('tenant', 'branch', 'period')
+
+    def __str__(self):
+        return f"{self.branch_id} {self.period:%Y-%m} (closed)"
+
+class ArchivedLine(TenantAwareModel):
+    """A LedgerLine of an archived period, same id as in the live table"""
+    entry = models.ForeignKey(JournalEntry, on_delete=models.CASCADE, related_name='archived_lines')
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='+')
+    debit = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    credit = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    description = models.CharField(max_length=255, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+class BankStatement(TenantAwareModel):
+    """An imported bank statement for a bank/cash account, see apps.accounting.reconciliation"""
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='bank_statements')
+    branch = models.ForeignKey('tenants.Branch', on_delete=models.CASCADE, null=True, blank=True)
+    name = models.CharField(max_length=255, blank=True)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    matched_count = models.IntegerField(default=0)
+    suggested_count = models.IntegerField(default=0)
+    unmatched_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name or 'Statement'} {self.start_date} - {self.end_date}"
+
+class StatementLine(TenantAwareModel):
+    STATUS_CHOICES = (
+        ('matched', 'Matched'),
+        ('suggested', 'Suggested'),
+        ('unmatched', 'Unmatched'),
+    )
+    statement = models.ForeignKey(BankStatement, on_delete=models.CASCADE, related_name='lines')
+    date = models.DateField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2)  # Positive = money in
+    reference = models.CharField(max_length=100, blank=True)
+    description = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='unmatched')
+    ledger_line = models.ForeignKey(LedgerLine, on_delete=models.SET_NULL, null=True, blank=True, related_name='statement_lines')
+    # The matched line once its period is archived (same id as ledger_line had), see periods.close_period
+    archived_line = models.ForeignKey(ArchivedLine, on_delete=models.SET_NULL, null=True, blank=True, related_name='statement_lines')
+
+    class Meta(TenantAwareModel.Meta):
+        indexes = TenantAwareModel.Meta.indexes + [
+            models.Index(fields=['statement', 'status'], name='statementline_status'),
+        ]
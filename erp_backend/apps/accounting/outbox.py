@@ -0,0 +1,178 @@
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from threading import Lock
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from apps.core.models import tenant_context
+from .logic import create_journal_entries_bulk, sale_lines
+from .models import GLOutbox, JournalEntry, PostingProfile
+from .periods import lock_branches
+from .posting_rules import posting_accounts
+
+logger = logging.getLogger(__name__)
+
+# Outbox rows posted per drain batch
+OUTBOX_BATCH_SIZE = 500
+
+# After this many failed attempts a row stays failed until retried by hand
+MAX_ATTEMPTS = 8
+
+def retry_delay(attempts):
+    """Exponential backoff: 1, 2, 4 ... minutes, capped at 4 hours"""
+    return timedelta(minutes=min(2 ** (attempts - 1), 240))
+
+def _entries_per_sale(rows, accounts):
+    return [
+        {
+            'tenant_id': row.tenant_id,
+            'branch_id': row.branch_id,
+            'date': row.date,
+            'description': f"POS Sale: {row.reference}",
+            'lines': sale_lines(accounts, row.total_amount, row.subtotal, row.tax_amount, f"Receipt {row.reference}"),
+            'source_type': row.source_type,
+            'source_id': row.source_id,
+            'reference': row.reference,
+            'rows': [row],
+        }
+        for row in rows
+    ]
+
+def _entries_per_day(tenant_id, rows, accounts):
+    """
+    One entry per (branch, day). Lines for a day that already has an entry are
+    appended to it, so repeated drains still leave a single entry per day.
+    The branches are locked first: concurrent drains holding other rows of
+    the same (branch, day) wait here instead of each creating an entry.
+    """
+    groups = defaultdict(list)
+    for row in rows:
+        groups[(row.branch_id, row.date)].append(row)
+    lock_branches({branch_id for branch_id, day in groups})
+
+    existing = {
+        (entry.branch_id, entry.date): entry
+        for entry in JournalEntry.objects.filter(
+            tenant_id=tenant_id,
+            source_type='pos_sales_daily',
+            branch_id__in={branch_id for branch_id, day in groups},
+            date__in={day for branch_id, day in groups},
+            is_deleted=False
+        )
+    }
+
+    entries = []
+    for (branch_id, day), day_rows in groups.items():
+        total = sum((row.total_amount for row in day_rows), Decimal(0))
+        subtotal = sum((row.subtotal for row in day_rows), Decimal(0))
+        tax = sum((row.tax_amount for row in day_rows), Decimal(0))
+        entries.append({
+            'entry': existing.get((branch_id, day)),
+            'tenant_id': tenant_id,
+            'branch_id': branch_id,
+            'date': day,
+            'description': f"POS Sales {day.isoformat()}",
+            'lines': sale_lines(accounts, total, subtotal, tax, f"{len(day_rows)} POS receipts"),
+            'source_type': 'pos_sales_daily',
+            'reference': f"POS-{day.isoformat()}",
+            'rows': day_rows,
+        })
+    return entries
+
+def _post_tenant_rows(tenant_id, rows):
+    accounts = posting_accounts(tenant_id, 'sale')
+    profile = PostingProfile.objects.filter(tenant_id=tenant_id).first()
+
+    if profile and profile.sale_aggregation == 'daily':
+        entries = _entries_per_day(tenant_id, rows, accounts)
+    else:
+        entries = _entries_per_sale(rows, accounts)
+
+    create_journal_entries_bulk(entries)
+
+    now = timezone.now()
+    for spec in entries:
+        for row in spec['rows']:
+            row.status = 'posted'
+            row.entry = spec['entry']
+            row.posted_at = now
+            row.last_error = ''
+    GLOutbox.objects.bulk_update(rows, ['status', 'entry', 'posted_at', 'last_error'])
+
+def _record_failure(rows, error):
+    now = timezone.now()
+    for row in rows:
+        row.attempts += 1
+        row.last_error = error
+        row.next_attempt_at = now + retry_delay(row.attempts)
+        row.status = 'failed' if row.attempts >= MAX_ATTEMPTS else 'pending'
+    GLOutbox.objects.bulk_update(rows, ['attempts', 'last_error', 'next_attempt_at', 'status'])
+
+def _drain_batch(tenant_id, batch_size):
+    posted = 0
+    with transaction.atomic():
+        rows = GLOutbox.objects.select_for_update(skip_locked=True).filter(
+            status='pending',
+            next_attempt_at__lte=timezone.now()
+        )
+        if tenant_id:
+            rows = rows.filter(tenant_id=tenant_id)
+        rows = list(rows.order_by('created_at')[:batch_size])
+
+        by_tenant = defaultdict(list)
+        for row in rows:
+            by_tenant[row.tenant_id].append(row)
+
+        for row_tenant_id, tenant_rows in by_tenant.items():
+            try:
+                with transaction.atomic(), tenant_context(row_tenant_id):
+                    _post_tenant_rows(row_tenant_id, tenant_rows)
+                posted += len(tenant_rows)
+            except Exception as e:
+                logger.exception('GL outbox posting failed for tenant %s', row_tenant_id)
+                _record_failure(tenant_rows, str(e))
+
+    return posted, len(rows)
+
+def drain_gl_outbox(tenant_id=None, batch_size=OUTBOX_BATCH_SIZE):
+    """
+    Post due outbox rows in batches until none are left. Returns how many
+    rows were posted. Rows are locked with SKIP LOCKED so several posters
+    can run at once. A tenant whose batch fails (e.g. missing accounts) is
+    retried later with backoff, and the error is kept on its rows.
+    """
+    total = 0
+    while True:
+        posted, fetched = _drain_batch(tenant_id, batch_size)
+        total += posted
+        if fetched < batch_size:
+            return total
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gl-outbox')
+_scheduled = set()
+_scheduled_lock = Lock()
+
+def _drain_in_worker(tenant_id):
+    with _scheduled_lock:
+        _scheduled.discard(tenant_id)
+    close_old_connections()
+    try:
+        drain_gl_outbox(tenant_id)
+    except Exception:
+        logger.exception('GL outbox drain failed for tenant %s', tenant_id)
+    finally:
+        close_old_connections()
+
+def schedule_gl_posting(tenant_id):
+    """
+    Drain a tenant's outbox in the background. Calls made while a drain for
+    the tenant is already waiting are folded into it. Use from
+    transaction.on_commit() so the worker sees the new rows.
+    """
+    with _scheduled_lock:
+        if tenant_id in _scheduled:
+            return
+        _scheduled.add(tenant_id)
+    _executor.submit(_drain_in_worker, tenant_id)
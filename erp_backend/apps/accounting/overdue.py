@@ -0,0 +1,92 @@
+"""
+Keeps Invoice.status and Bill.status 'overdue' in step with due dates.
+
+The sweep is a handful of set-based UPDATEs per tenant: open documents due
+before today become overdue, and overdue ones whose due date was moved to
+today or later go back to open. Only rows whose status changes are written,
+so a repeated sweep on the same day updates nothing. Both statuses count as
+owed in the aging reports, so their cached figures stay valid.
+"""
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from apps.sales.models import Invoice
+from apps.tenants.models import Tenant
+from .models import Bill
+
+logger = logging.getLogger(__name__)
+
+# model -> status of a document that is owed but not yet due
+OVERDUE_MODELS = {
+    'invoices': (Invoice, 'sent'),
+    'bills': (Bill, 'open'),
+}
+
+def sweep_tenant(tenant_id, today):
+    """Flip one tenant's documents; returns {'invoices': n, 'bills': n} of rows changed"""
+    now = timezone.now()
+    counts = {}
+    with transaction.atomic():
+        for name, (model, open_status) in OVERDUE_MODELS.items():
+            documents = model.objects.filter(tenant_id=tenant_id, is_deleted=False)
+            counts[name] = documents.filter(status=open_status, due_date__lt=today).update(
+                status='overdue', updated_at=now
+            ) + documents.filter(status='overdue', due_date__gte=today).update(
+                status=open_status, updated_at=now
+            )
+    return counts
+
+def sweep_overdue(tenant_id=None, today=None):
+    """
+    Sweep every tenant (or one), one transaction per tenant.
+    Returns {'tenants', 'invoices', 'bills', 'seconds'}.
+    """
+    today = today or timezone.localdate()
+    started = time.monotonic()
+    tenants = [tenant_id] if tenant_id else Tenant.objects.values_list('id', flat=True).iterator()
+    totals = {'tenants': 0, 'invoices': 0, 'bills': 0}
+    for tenant in tenants:
+        counts = sweep_tenant(tenant, today)
+        totals['tenants'] += 1
+        for name, changed in counts.items():
+            totals[name] += changed
+    totals['seconds'] = round(time.monotonic() - started, 3)
+    logger.info('Overdue sweep: %(invoices)s invoice(s), %(bills)s bill(s) changed '
+                'across %(tenants)s tenant(s) in %(seconds)ss', totals)
+    return totals
+
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+def _sweep_forever(interval):
+    while True:
+        close_old_connections()
+        try:
+            sweep_overdue()
+        except Exception:
+            logger.exception('Overdue sweep failed')
+        finally:
+            close_old_connections()
+        time.sleep(interval)
+
+def start_overdue_sweeper(interval=None):
+    """
+    Run the sweep in a background thread of this process every `interval`
+    seconds (OVERDUE_SWEEP_INTERVAL; 0 disables it). Safe to call more than
+    once. Started by the WSGI / ASGI entry points (config/wsgi.py, asgi.py);
+    deployments with cron or a worker can run `sweep_overdue` instead.
+    """
+    global _sweeper
+    interval = getattr(settings, 'OVERDUE_SWEEP_INTERVAL', 0) if interval is None else interval
+    if not interval:
+        return None
+    with _sweeper_lock:
+        if _sweeper is None:
+            _sweeper = threading.Thread(
+                target=_sweep_forever, args=(interval,), name='overdue-sweeper', daemon=True
+            )
+            _sweeper.start()
+    return _sweeper
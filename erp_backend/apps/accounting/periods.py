@@ -0,0 +1,142 @@
+import calendar
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+from apps.tenants.models import Branch
+from .balances import apply_balance_deltas, period_start
+from .models import AccountBalance, ClosedPeriod, ArchivedLine, JournalEntry, LedgerLine, StatementLine
+
+# Lines moved to the archive per INSERT/DELETE round
+ARCHIVE_CHUNK_SIZE = 5000
+
+class PeriodClosed(ValueError):
+    pass
+
+def lock_branches(branch_ids):
+    """Lock Branch rows, in id order, until the transaction ends"""
+    list(Branch.objects.select_for_update().filter(id__in=branch_ids).order_by('id').values_list('id', flat=True))
+
+def check_periods_open(entries):
+    """
+    Raise PeriodClosed if any entry falls in a closed (branch, month).
+    entries: JournalEntry instances or dicts with tenant_id, branch_id and date.
+    Call it inside the posting transaction: the entries' branches are locked,
+    as close_period does, so no period closes between the check and the writes.
+    """
+    keys = set()
+    for entry in entries:
+        if isinstance(entry, dict):
+            keys.add((entry['tenant_id'], entry['branch_id'], period_start(entry['date'])))
+        else:
+            keys.add((entry.tenant_id, entry.branch_id, period_start(entry.date)))
+    if not keys:
+        return
+
+    lock_branches({branch_id for tenant_id, branch_id, period in keys})
+    match = Q(pk__in=[])
+    for tenant_id, branch_id, period in keys:
+        match |= Q(tenant_id=tenant_id, branch_id=branch_id, period=period)
+    closed = ClosedPeriod.objects.filter(match, is_deleted=False).values_list('branch_id', 'period').first()
+    if closed:
+        raise PeriodClosed(f"Period {closed[1]:%Y-%m} is closed for branch {closed[0]}")
+
+def _period_lines(tenant_id, branch_id, period):
+    last_day = period.replace(day=calendar.monthrange(period.year, period.month)[1])
+    return LedgerLine.objects.filter(
+        tenant_id=tenant_id,
+        entry__branch_id=branch_id,
+        entry__date__gte=period,
+        entry__date__lte=last_day,
+    ), last_day
+
+def _write_closing_balances(tenant_id, branch_id, period):
+    """Recompute the period's AccountBalance rows from its lines, the figures the period closes with"""
+    lines, last_day = _period_lines(tenant_id, branch_id, period)
+    totals = list(
+        lines.filter(is_deleted=False, entry__is_deleted=False)
+        .values('account_id')
+        .annotate(debit=Sum('debit'), credit=Sum('credit'))
+        .order_by()
+    )
+    AccountBalance.objects.filter(tenant_id=tenant_id, branch_id=branch_id, period=period).delete()
+    apply_balance_deltas(tenant_id, {
+        (row['account_id'], branch_id, period): (row['debit'], row['credit'])
+        for row in totals
+    })
+    return totals
+
+def _archive_lines(tenant_id, branch_id, period, totals):
+    """
+    Move the period's detailed lines to ArchivedLine and leave one
+    summary line per account, so balances and snapshots stay the same.
+    Statement lines matched to an archived line point at its ArchivedLine.
+    """
+    lines, last_day = _period_lines(tenant_id, branch_id, period)
+    lines = lines.exclude(entry__source_type='period_summary').order_by('id')
+    fields = ('id', 'tenant_id', 'entry_id', 'account_id', 'debit', 'credit', 'description',
+              'created_by_id', 'updated_by_id', 'is_deleted')
+    now = timezone.now()
+    last_id = None
+    while True:
+        chunk = lines if last_id is None else lines.filter(id__gt=last_id)
+        rows = list(chunk.values(*fields)[:ARCHIVE_CHUNK_SIZE])
+        if not rows:
+            break
+        ids = [row['id'] for row in rows]
+        ArchivedLine.objects.bulk_create([ArchivedLine(archived_at=now, **row) for row in rows])
+        # Bank statement lines reconciled against these keep their match, on the archived copy
+        StatementLine.objects.filter(ledger_line_id__in=ids).update(archived_line_id=F('ledger_line_id'))
+        LedgerLine.objects.filter(id__in=ids).delete()
+        last_id = rows[-1]['id']
+
+    summary = JournalEntry.objects.create(
+        tenant_id=tenant_id,
+        branch_id=branch_id,
+        date=last_day,
+        description=f"Period summary {period:%Y-%m}",
+        reference=f"CLOSE-{period:%Y-%m}",
+        source_type='period_summary',
+    )
+    # Written directly: the amounts are already in the balance snapshots
+    LedgerLine.objects.bulk_create([
+        LedgerLine(
+            tenant_id=tenant_id,
+            entry=summary,
+            account_id=row['account_id'],
+            debit=row['debit'] or 0,
+            credit=row['credit'] or 0,
+            description=f"Total {period:%Y-%m}"
+        )
+        for row in totals
+    ])
+    return summary
+
+def close_period(tenant_id, branch_id, day, archive=False):
+    """
+    Close the month containing `day` for a branch: no more postings to it,
+    its AccountBalance rows rewritten from the lines as closing balances and,
+    with archive=True, its detailed lines moved out of the live ledger.
+    Returns the ClosedPeriod.
+    """
+    period = period_start(day)
+    with transaction.atomic():
+        # Postings to the branch wait until the period is closed, see check_periods_open
+        lock_branches([branch_id])
+        closed, created = ClosedPeriod.objects.select_for_update().get_or_create(
+            tenant_id=tenant_id, branch_id=branch_id, period=period
+        )
+        if not created and (closed.is_archived or not archive):
+            raise PeriodClosed(f"Period {period:%Y-%m} is already closed")
+
+        totals = _write_closing_balances(tenant_id, branch_id, period)
+        if archive:
+            closed.summary_entry = _archive_lines(tenant_id, branch_id, period, totals)
+            closed.is_archived = True
+            closed.save()
+    return closed
+
+def reopen_period(period):
+    """Allow postings again. Archived periods stay closed, their detail is gone from the live ledger."""
+    if period.is_archived:
+        raise ValueError(f"Period {period.period:%Y-%m} was archived and cannot be reopened")
+    ClosedPeriod.objects.filter(pk=period.pk).delete()
@@ -0,0 +1,75 @@
+import time
+from threading import Lock
+from django.conf import settings
+from .models import Account, PostingRule
+
+# Account codes used by automatic postings when a tenant has no PostingRule for a role
+DEFAULT_POSTING_RULES = {
+    'sale': {'cash': '1000', 'revenue': '4000', 'tax_payable': '2200'},
+    'invoice': {'ar': '1200', 'revenue': '4000', 'tax': '2200'},
+    'bill': {'ap': '2000', 'expense': '5000', 'input_tax': '1300'},
+}
+
+# tenant id -> (expires at, {account code: account id}, {(document, role): account code})
+_cache = {}
+_cache_lock = Lock()
+
+def _ttl():
+    return getattr(settings, 'ACCOUNT_CACHE_TTL', 300)
+
+def _load(tenant_id):
+    codes = dict(
+        Account.objects.filter(tenant_id=tenant_id, is_deleted=False).values_list('code', 'id')
+    )
+    rules = {
+        (document, role): code
+        for document, role, code in PostingRule.objects.filter(tenant_id=tenant_id, is_deleted=False)
+        .values_list('document', 'role', 'account_code')
+    }
+    return time.monotonic() + _ttl(), codes, rules
+
+def _tenant_entry(tenant_id):
+    key = str(tenant_id)
+    with _cache_lock:
+        entry = _cache.get(key)
+    if entry is None or entry[0] < time.monotonic():
+        entry = _load(tenant_id)
+        with _cache_lock:
+            _cache[key] = entry
+    return entry
+
+def invalidate_account_cache(tenant_id=None):
+    """Drop one tenant's cached accounts and rules, or everyone's"""
+    with _cache_lock:
+        if tenant_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(str(tenant_id), None)
+
+def account_id_for_code(tenant_id, code):
+    """Account id for a chart-of-accounts code, or None"""
+    return _tenant_entry(tenant_id)[1].get(code)
+
+def account_codes(tenant_id):
+    """{account code: account id} for the tenant's whole chart (cached, do not modify)"""
+    return _tenant_entry(tenant_id)[1]
+
+def posting_accounts(tenant_id, document):
+    """
+    {role: account id} for an automatic posting ('sale', 'invoice' or 'bill'),
+    using the tenant's PostingRules over DEFAULT_POSTING_RULES.
+    Served from a per-process cache, so a warm call runs no queries.
+    Raises ValueError if an account is missing from the chart of accounts.
+    """
+    expires_at, codes, rules = _tenant_entry(tenant_id)
+    accounts = {}
+    missing = []
+    for role, default_code in DEFAULT_POSTING_RULES[document].items():
+        code = rules.get((document, role), default_code)
+        if code in codes:
+            accounts[role] = codes[code]
+        else:
+            missing.append(code)
+    if missing:
+        raise ValueError(f"Missing accounts {', '.join(missing)} in chart of accounts")
+    return accounts
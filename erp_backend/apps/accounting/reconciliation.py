@@ -0,0 +1,227 @@
+"""
+Bank statement import and matching against the ledger lines of a bank account.
+
+Statement lines are matched in two passes over hash and sorted indexes of the
+account's ledger lines, never a nested loop over both sides:
+1. same amount and same reference within the date window -> matched
+2. same amount within the date window -> matched when the only candidate is on
+   the same day, otherwise suggested (closest date first)
+Anything left is unmatched. Each ledger line is used at most once.
+"""
+import csv
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils.dateparse import parse_date
+from .models import BankStatement, LedgerLine, StatementLine
+
+# Days either side of the statement date a ledger line may be dated
+DEFAULT_DATE_WINDOW = 3
+
+STATEMENT_BATCH_SIZE = 2000
+
+_OFX_TRANSACTION = re.compile(r'<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|(?=</BANKTRANLIST>))', re.S | re.I)
+_OFX_FIELD = re.compile(r'<(\w+)>([^<\r\n]*)')
+
+def _amount(value):
+    value = str(value or '').strip().replace(',', '')
+    if value.startswith('(') and value.endswith(')'):
+        value = '-' + value[1:-1]
+    return Decimal(value or 0)
+
+def _date(value):
+    """YYYY-MM-DD, OFX YYYYMMDD[HHMMSS...], DD/MM/YYYY or MM/DD/YYYY"""
+    value = str(value or '').strip()
+    if '-' in value:
+        parsed = parse_date(value[:10])
+        if parsed:
+            return parsed
+    elif '/' in value:
+        for fmt in ('%d/%m/%Y', '%m/%d/%Y'):
+            try:
+                return datetime.strptime(value, fmt).date()
+            except ValueError:
+                continue
+    elif value[:8].isdigit():
+        try:
+            return datetime.strptime(value[:8], '%Y%m%d').date()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date '{value}'")
+
+def parse_csv_statement(stream):
+    """
+    Statement lines from a CSV with a date column and either an amount column
+    (positive = money in) or debit/credit columns, plus optional reference and
+    description. Returns [{'date', 'amount', 'reference', 'description'}].
+    """
+    reader = csv.DictReader(stream)
+    columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+    if 'date' not in columns or not ('amount' in columns or {'debit', 'credit'} <= columns.keys()):
+        raise ValueError('CSV needs a date column and an amount (or debit and credit) column')
+
+    lines = []
+    for row in reader:
+        get = lambda name: row.get(columns.get(name, ''), '')
+        try:
+            if 'amount' in columns:
+                amount = _amount(get('amount'))
+            else:
+                # Bank's point of view: a debit is money leaving the account
+                amount = _amount(get('credit')) - _amount(get('debit'))
+            lines.append({
+                'date': _date(get('date')),
+                'amount': amount,
+                'reference': get('reference').strip(),
+                'description': get('description').strip(),
+            })
+        except (InvalidOperation, ValueError) as e:
+            raise ValueError(f"Line {reader.line_num}: {e}")
+    return lines
+
+def parse_ofx_statement(text):
+    """Statement lines from an OFX file (SGML or XML flavour)"""
+    lines = []
+    for block in _OFX_TRANSACTION.findall(text):
+        fields = {name.upper(): value.strip() for name, value in _OFX_FIELD.findall(block)}
+        try:
+            lines.append({
+                'date': _date(fields.get('DTPOSTED', '')),
+                'amount': _amount(fields.get('TRNAMT')),
+                'reference': fields.get('CHECKNUM') or fields.get('REFNUM') or fields.get('FITID', ''),
+                'description': ' '.join(filter(None, (fields.get('NAME'), fields.get('MEMO')))),
+            })
+        except (InvalidOperation, ValueError) as e:
+            raise ValueError(f"Transaction {fields.get('FITID', len(lines) + 1)}: {e}")
+    if not lines:
+        raise ValueError('No transactions found in the OFX file')
+    return lines
+
+def _normalize_reference(value):
+    return re.sub(r'[^0-9A-Z]', '', (value or '').upper())
+
+def _ledger_candidates(account_id, start, end, branch_id=None):
+    """Live, not yet reconciled lines of the account in [start, end], as (id, date, amount, reference)"""
+    reconciled = StatementLine.objects.filter(
+        ledger_line__account_id=account_id, status='matched', is_deleted=False
+    ).values('ledger_line_id')
+    lines = LedgerLine.objects.filter(
+        account_id=account_id,
+        is_deleted=False,
+        entry__is_deleted=False,
+        entry__date__gte=start,
+        entry__date__lte=end,
+    ).exclude(id__in=reconciled)
+    if branch_id:
+        lines = lines.filter(entry__branch_id=branch_id)
+    return lines.values_list(
+        'id', 'entry__date', F('debit') - F('credit'), 'entry__reference'
+    ).iterator(chunk_size=STATEMENT_BATCH_SIZE)
+
+def match_lines(statement_lines, candidates, window=DEFAULT_DATE_WINDOW):
+    """
+    Pair statement lines with ledger lines.
+    statement_lines: dicts with date, amount, reference.
+    candidates: iterable of (ledger line id, date, amount, reference).
+    Sets 'status' and 'ledger_line_id' on each statement line.
+    """
+    window = timedelta(days=window)
+    by_reference = defaultdict(list)
+    by_amount = defaultdict(list)
+    for line_id, day, amount, reference in candidates:
+        ref = _normalize_reference(reference)
+        if ref:
+            by_reference[(amount, ref)].append((day, line_id))
+        by_amount[amount].append((day, line_id))
+    for entries in by_amount.values():
+        entries.sort()
+    used = set()
+
+    for line in statement_lines:
+        line['status'], line['ledger_line_id'] = 'unmatched', None
+
+    # Pass 1: amount + reference
+    for line in statement_lines:
+        ref = _normalize_reference(line['reference'])
+        if not ref:
+            continue
+        for day, line_id in by_reference.get((line['amount'], ref), ()):
+            if line_id not in used and abs(day - line['date']) <= window:
+                line['status'], line['ledger_line_id'] = 'matched', line_id
+                used.add(line_id)
+                break
+
+    # Pass 2: amount + date window, binary search on the date-sorted candidates
+    for line in statement_lines:
+        if line['status'] == 'matched':
+            continue
+        entries = by_amount.get(line['amount'])
+        if not entries:
+            continue
+        start = bisect_left(entries, (line['date'] - window,))
+        nearby = []
+        for index in range(start, len(entries)):
+            day, line_id = entries[index]
+            if day > line['date'] + window:
+                break
+            if line_id not in used:
+                nearby.append((abs(day - line['date']), line_id))
+        if not nearby:
+            continue
+        nearby.sort()
+        distance, line_id = nearby[0]
+        line['status'] = 'matched' if len(nearby) == 1 and not distance else 'suggested'
+        line['ledger_line_id'] = line_id
+        used.add(line_id)
+    return statement_lines
+
+def import_statement(tenant_id, account_id, lines, name='', branch_id=None, window=DEFAULT_DATE_WINDOW):
+    """Store a parsed statement and match it against the account's ledger lines. Returns the BankStatement."""
+    if not lines:
+        raise ValueError('The statement has no lines')
+    start = min(line['date'] for line in lines) - timedelta(days=window)
+    end = max(line['date'] for line in lines) + timedelta(days=window)
+    match_lines(lines, _ledger_candidates(account_id, start, end, branch_id), window)
+
+    counts = defaultdict(int)
+    for line in lines:
+        counts[line['status']] += 1
+
+    with transaction.atomic():
+        statement = BankStatement.objects.create(
+            tenant_id=tenant_id,
+            account_id=account_id,
+            branch_id=branch_id,
+            name=name[:255],
+            start_date=start + timedelta(days=window),
+            end_date=end - timedelta(days=window),
+            matched_count=counts['matched'],
+            suggested_count=counts['suggested'],
+            unmatched_count=counts['unmatched'],
+        )
+        StatementLine.objects.bulk_create([
+            StatementLine(
+                tenant_id=tenant_id,
+                statement=statement,
+                date=line['date'],
+                amount=line['amount'],
+                reference=line['reference'][:100],
+                description=line['description'][:255],
+                status=line['status'],
+                ledger_line_id=line['ledger_line_id'],
+            )
+            for line in lines
+        ], batch_size=STATEMENT_BATCH_SIZE)
+    return statement
+
+def refresh_counts(statement):
+    """Recount matched / suggested / unmatched lines after manual changes"""
+    counts = defaultdict(int, statement.lines.filter(is_deleted=False).values_list('status').annotate(n=Count('id')).order_by())
+    statement.matched_count = counts['matched']
+    statement.suggested_count = counts['suggested']
+    statement.unmatched_count = counts['unmatched']
+    statement.save(update_fields=['matched_count', 'suggested_count', 'unmatched_count', 'updated_at'])
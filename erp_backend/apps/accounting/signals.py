@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.sales.models import Invoice
+from .aging import invalidate_aging_cache
+from .models import Account, Bill, PostingRule
+from .posting_rules import invalidate_account_cache
+
+@receiver([post_save, post_delete], sender=Account)
+@receiver([post_save, post_delete], sender=PostingRule)
+def invalidate_posting_accounts(sender, instance, **kwargs):
+    invalidate_account_cache(instance.tenant_id)
+    # Other requests can re-cache the old rows until this transaction commits
+    transaction.on_commit(lambda: invalidate_account_cache(instance.tenant_id))
+
+@receiver([post_save, post_delete], sender=Invoice)
+@receiver([post_save, post_delete], sender=Bill)
+def invalidate_aging(sender, instance, **kwargs):
+    invalidate_aging_cache(instance.tenant_id)
+    transaction.on_commit(lambda: invalidate_aging_cache(instance.tenant_id))
@@ -0,0 +1,94 @@
+from decimal import Decimal
+from .balances import with_balances
+from .models import Account
+
+# Shown as credit - debit, the way these sections are normally read
+CREDIT_NORMAL = {'liability', 'equity', 'revenue'}
+
+def _rolled_up(accounts):
+    """
+    {account id: balance of the account plus all its sub-accounts of the same type}.
+    Each balance is added to the ancestors listed in the account's path,
+    so the whole chart is rolled up in one pass without walking the tree.
+    The roll-up stops at the first ancestor of another type (or a deleted
+    one): _section shows the account as a root of its own section there, so
+    adding it higher up would count it twice.
+    """
+    types = {acc.id: acc.account_type for acc in accounts}
+    totals = {acc.id: acc.balance for acc in accounts}
+    for acc in accounts:
+        for ancestor_id in reversed(acc.ancestor_ids()):
+            if types.get(ancestor_id) != acc.account_type:
+                break
+            totals[ancestor_id] += acc.balance
+    return totals
+
+def _section(accounts, totals, account_type):
+    """Nested rows for one account type, with the section total"""
+    sign = -1 if account_type in CREDIT_NORMAL else 1
+    nodes = {}
+    roots = []
+    # Ordered by path, so every parent is placed before its children
+    for acc in accounts:
+        if acc.account_type != account_type:
+            continue
+        node = {
+            'id': str(acc.id),
+            'code': acc.code,
+            'name': acc.name,
+            'balance': sign * acc.balance,
+            'total': sign * totals[acc.id],
+            'children': [],
+        }
+        nodes[acc.id] = node
+        parent = nodes.get(acc.parent_id)
+        (parent['children'] if parent else roots).append(node)
+
+    for node in nodes.values():
+        node['children'].sort(key=lambda child: child['code'])
+    roots.sort(key=lambda node: node['code'])
+    return {'accounts': roots, 'total': sum((node['total'] for node in roots), Decimal(0))}
+
+def _load(tenant_id, **filters):
+    # One query: the whole chart with its balances for the range
+    accounts = list(with_balances(
+        Account.objects.filter(tenant_id=tenant_id, is_deleted=False),
+        **filters
+    ).order_by('path'))
+    return accounts, _rolled_up(accounts)
+
+def profit_and_loss(tenant_id, date_from=None, date_to=None, branch=None):
+    """Revenue and expense trees for a period, each account including its sub-accounts"""
+    accounts, totals = _load(tenant_id, date_from=date_from, date_to=date_to, branch=branch)
+    revenue = _section(accounts, totals, 'revenue')
+    expenses = _section(accounts, totals, 'expense')
+    return {
+        'date_from': date_from,
+        'date_to': date_to,
+        'revenue': revenue,
+        'expenses': expenses,
+        'net_income': revenue['total'] - expenses['total'],
+    }
+
+def balance_sheet(tenant_id, as_of=None, branch=None):
+    """
+    Asset, liability and equity trees as of a date. Revenue less expenses
+    to date is reported as current earnings so the sheet balances before
+    the period is closed.
+    """
+    accounts, totals = _load(tenant_id, as_of=as_of, branch=branch)
+    assets = _section(accounts, totals, 'asset')
+    liabilities = _section(accounts, totals, 'liability')
+    equity = _section(accounts, totals, 'equity')
+    earnings = (
+        _section(accounts, totals, 'revenue')['total']
+        - _section(accounts, totals, 'expense')['total']
+    )
+    return {
+        'as_of': as_of,
+        'assets': assets,
+        'liabilities': liabilities,
+        'equity': equity,
+        'current_earnings': earnings,
+        'total_liabilities_and_equity': liabilities['total'] + equity['total'] + earnings,
+    }
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AccountViewSet, JournalEntryViewSet, TaxViewSet, VendorViewSet, BillViewSet, TransactionViewSet, AccountingStatsViewSet
+from .views import AccountViewSet, JournalEntryViewSet, TaxViewSet, VendorViewSet, BillViewSet, TransactionViewSet, AccountingStatsViewSet, GLOutboxViewSet, PostingRuleViewSet, ClosedPeriodViewSet, BankStatementViewSet, StatementLineViewSet
 
 router = DefaultRouter()
 router.register(r'accounts', AccountViewSet)
@@ -10,6 +10,11 @@ router.register(r'taxes', TaxViewSet)
 router.register(r'vendors', VendorViewSet)
 router.register(r'bills', BillViewSet)
 router.register(r'transactions', TransactionViewSet)
+router.register(r'posting-rules', PostingRuleViewSet)
+router.register(r'gl-outbox', GLOutboxViewSet)
+router.register(r'periods', ClosedPeriodViewSet)
+router.register(r'bank-statements', BankStatementViewSet)
+router.register(r'statement-lines', StatementLineViewSet)
 router.register(r'stats', AccountingStatsViewSet, basename='accounting-stats')
 
 urlpatterns = [
@@ -1,16 +1,33 @@
-from apps.core.views import TenantAwareViewSet
-from .models import Account, JournalEntry, LedgerLine, Tax, Vendor, Bill
-from rest_framework import serializers
+import io
+from apps.core.models import get_current_tenant
+from apps.core.pagination import KeysetPagination, LookupPagination
+from apps.core.views import TenantAwareViewSet, TenantFilterMixin
+from .balances import balance_filters, with_balances
+from .models import Account, JournalEntry, LedgerLine, Tax, Vendor, Bill, GLOutbox, PostingRule, ClosedPeriod, BankStatement, StatementLine
+from . import aging, imports, ledger_report, periods, reconciliation, statements
+from .posting_rules import account_id_for_code, posting_accounts
+from rest_framework import serializers, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from django.db.models import Sum
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from apps.tenants.models import Branch
 
 class AccountSerializer(serializers.ModelSerializer):
+    total_debit = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    total_credit = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
     balance = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
     class Meta:
         model = Account
         fields = '__all__'
 
+    def validate_parent(self, parent):
+        if parent and self.instance and (parent.pk == self.instance.pk or self.instance.pk.hex in parent.path.split('/')):
+            raise serializers.ValidationError('An account cannot be moved under itself or one of its sub-accounts')
+        return parent
+
 class TaxSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tax
@@ -34,6 +51,15 @@ class JournalEntrySerializer(serializers.ModelSerializer):
         model = JournalEntry
         fields = '__all__'
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None:
+            # Posted amounts feed the balance snapshots and may sit in a closed period:
+            # to move or change them, delete the entry (which reverses it) and post a new one
+            for name in ('date', 'branch', 'lines'):
+                fields[name].read_only = True
+        return fields
+
     def create(self, validated_data):
         lines_data = validated_data.pop('lines')
         from .logic import create_journal_entry
@@ -52,38 +78,132 @@ class BillSerializer(serializers.ModelSerializer):
         model = Bill
         fields = '__all__'
 
-class AccountViewSet(TenantAwareViewSet):
-    queryset = Account.objects.all()
-    serializer_class = AccountSerializer
+class GLOutboxSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GLOutbox
+        fields = '__all__'
+
+class ClosedPeriodSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ClosedPeriod
+        fields = '__all__'
+
+class BankStatementSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BankStatement
+        fields = '__all__'
+
+class StatementLineSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StatementLine
+        fields = '__all__'
+
+class PostingRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PostingRule
+        fields = '__all__'
+        read_only_fields = ['tenant']
+
+    def validate(self, data):
+        from .posting_rules import DEFAULT_POSTING_RULES
+        document = data.get('document', getattr(self.instance, 'document', None))
+        role = data.get('role', getattr(self.instance, 'role', None))
+        if role not in DEFAULT_POSTING_RULES.get(document, {}):
+            raise serializers.ValidationError({'role': f"Unknown role for {document} postings"})
+        duplicates = PostingRule.objects.filter(
+            tenant_id=get_current_tenant(), document=document, role=role, is_deleted=False
+        )
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError({'role': f"There is already a rule for {document}/{role}, edit that one"})
+        return data
+
+    def create(self, validated_data):
+        # A deleted rule still holds its (tenant, document, role) slot, so it is brought back
+        rule = PostingRule.objects.filter(
+            tenant_id=validated_data['tenant_id'],
+            document=validated_data['document'],
+            role=validated_data['role'],
+            is_deleted=True
+        ).first()
+        if rule is None:
+            return super().create(validated_data)
+        rule.account_code = validated_data['account_code']
+        rule.is_deleted = False
+        rule.save()
+        return rule
+
+class BalanceFilterMixin:
+    """Accounts annotated with balances, filtered by ?as_of, ?date_from, ?date_to and ?branch"""
+    def get_balance_filters(self):
+        try:
+            return balance_filters(self.request.query_params)
+        except ValueError as e:
+            raise ValidationError({'error': str(e)})
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        # Annotate with balance (simplified version)
-        for acc in qs:
-            debits = LedgerLine.objects.filter(account=acc).aggregate(Sum('debit'))['debit__sum'] or 0
-            credits = LedgerLine.objects.filter(account=acc).aggregate(Sum('credit'))['credit__sum'] or 0
-            acc.balance = debits - credits
-        return qs
+        return with_balances(super().get_queryset(), **self.get_balance_filters())
+
+class AccountViewSet(BalanceFilterMixin, TenantAwareViewSet):
+    queryset = Account.objects.all()
+    serializer_class = AccountSerializer
+    pagination_class = LookupPagination
 
     @action(detail=False, methods=['get'])
     def trial_balance(self, request):
-        accounts = Account.objects.filter(tenant=request.tenant_id)
-        data = []
-        for acc in accounts:
-            debit = LedgerLine.objects.filter(account=acc).aggregate(Sum('debit'))['debit__sum'] or 0
-            credit = LedgerLine.objects.filter(account=acc).aggregate(Sum('credit'))['credit__sum'] or 0
-            data.append({
-                'account': acc.name,
-                'code': acc.code,
-                'debit': debit,
-                'credit': credit,
-                'balance': debit - credit
-            })
+        accounts = self.get_queryset().order_by('code')
+        data = [{
+            'account': acc.name,
+            'code': acc.code,
+            'debit': acc.total_debit,
+            'credit': acc.total_credit,
+            'balance': acc.balance
+        } for acc in accounts]
         return Response(data)
 
+    @action(detail=True, methods=['get'])
+    def ledger(self, request, pk=None):
+        """
+        Every ledger line of the account with a running balance, streamed as
+        JSON lines (default) or CSV with ?export=csv.
+        Takes ?date_from, ?date_to (or ?as_of) and ?branch.
+        """
+        filters = self.get_balance_filters()
+        export = request.query_params.get('export', 'jsonl')
+        if export not in ('csv', 'jsonl'):
+            return Response({'error': 'export must be csv or jsonl'}, status=400)
+        return ledger_report.stream_ledger(
+            self.get_object(),
+            date_from=filters.get('date_from'),
+            date_to=filters.get('date_to') or filters.get('as_of'),
+            branch=filters.get('branch'),
+            export=export
+        )
+
+    @action(detail=False, methods=['get'])
+    def profit_and_loss(self, request):
+        filters = self.get_balance_filters()
+        return Response(statements.profit_and_loss(
+            get_current_tenant(),
+            date_from=filters.get('date_from'),
+            date_to=filters.get('date_to') or filters.get('as_of'),
+            branch=filters.get('branch')
+        ))
+
+    @action(detail=False, methods=['get'])
+    def balance_sheet(self, request):
+        filters = self.get_balance_filters()
+        return Response(statements.balance_sheet(
+            get_current_tenant(),
+            as_of=filters.get('as_of') or filters.get('date_to'),
+            branch=filters.get('branch')
+        ))
+
 class TaxViewSet(TenantAwareViewSet):
     queryset = Tax.objects.all()
     serializer_class = TaxSerializer
+    pagination_class = LookupPagination
 
 class VendorViewSet(TenantAwareViewSet):
     queryset = Vendor.objects.all()
@@ -93,18 +213,49 @@ class JournalEntryViewSet(TenantAwareViewSet):
     queryset = JournalEntry.objects.all()
     serializer_class = JournalEntrySerializer
 
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        """
+        Import many entries at once (opening balances, historical ledgers).
+        Send a CSV or JSON lines file as 'file', or a JSON body {"entries": [...]}.
+        ?branch= is used for entries that name no branch.
+        Returns {"created": n, "errors": [{"row": n, "error": "..."}]}.
+        """
+        upload = request.FILES.get('file')
+        try:
+            if upload is not None:
+                stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+                is_csv = upload.name.lower().endswith('.csv') or upload.content_type == 'text/csv'
+                rows = imports.read_csv(stream) if is_csv else imports.read_jsonl(stream)
+            else:
+                entries = request.data.get('entries')
+                if not isinstance(entries, list):
+                    return Response({'error': 'Send a file or a list of entries'}, status=400)
+                rows = enumerate(entries, start=1)
+            result = imports.import_journal_entries(
+                get_current_tenant(), rows, default_branch_id=request.query_params.get('branch')
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response(result, status=201 if result['created'] else 400)
+
 class BillViewSet(TenantAwareViewSet):
     queryset = Bill.objects.all()
     serializer_class = BillSerializer
 
-class TransactionViewSet(TenantAwareViewSet):
+class TransactionViewSet(TenantFilterMixin, viewsets.ReadOnlyModelViewSet):
     """
     Lightweight transactions view backed by LedgerLine for UI compatibility.
+    Read-only: ledger lines are written by posting journal entries, which
+    keeps the balance snapshots and the closed-period lock in step.
     """
-    queryset = LedgerLine.objects.all()
+    # account_name / account_code come from the join, not a query per line
+    queryset = LedgerLine.objects.select_related('account')
     serializer_class = LedgerLineSerializer
+    pagination_class = KeysetPagination
+    page_size = 200
 
-class AccountingStatsViewSet(TenantAwareViewSet):
+class AccountingStatsViewSet(BalanceFilterMixin, TenantAwareViewSet):
     """
     Simple stats endpoint placeholder for dashboards.
     """
@@ -113,23 +264,179 @@ class AccountingStatsViewSet(TenantAwareViewSet):
 
     @action(detail=False, methods=['get'])
     def summary(self, request):
-        accounts = Account.objects.filter(tenant=request.tenant_id)
         totals = {
             'total_assets': 0,
             'total_liabilities': 0,
             'monthly_revenue': 0,
             'monthly_expenses': 0,
         }
-        for acc in accounts:
-            debits = LedgerLine.objects.filter(account=acc).aggregate(Sum('debit'))['debit__sum'] or 0
-            credits = LedgerLine.objects.filter(account=acc).aggregate(Sum('credit'))['credit__sum'] or 0
-            balance = debits - credits
+        for acc in self.get_queryset():
             if acc.account_type == 'asset':
-                totals['total_assets'] += balance
+                totals['total_assets'] += acc.balance
             if acc.account_type == 'liability':
-                totals['total_liabilities'] += balance
+                totals['total_liabilities'] += acc.balance
             if acc.account_type == 'revenue':
-                totals['monthly_revenue'] += credits - debits
+                totals['monthly_revenue'] -= acc.balance
             if acc.account_type == 'expense':
-                totals['monthly_expenses'] += debits - credits
+                totals['monthly_expenses'] += acc.balance
         return Response(totals)
+
+    def _aging(self, report):
+        filters = self.get_balance_filters()
+        try:
+            return Response(aging.aging_report(
+                get_current_tenant(),
+                report,
+                as_of=filters.get('as_of'),
+                by_party=bool(self.request.query_params.get('group')),
+                branch=filters.get('branch')
+            ))
+        except DjangoValidationError as e:
+            return Response({'error': str(e)}, status=400)
+
+    @action(detail=False, methods=['get'], url_path='aged-receivables')
+    def aged_receivables(self, request):
+        """Open invoices by days past due; ?group=customer for a per-customer breakdown"""
+        return self._aging('receivables')
+
+    @action(detail=False, methods=['get'], url_path='aged-payables')
+    def aged_payables(self, request):
+        """Open bills by days past due; ?group=vendor for a per-vendor breakdown"""
+        return self._aging('payables')
+
+class PostingRuleViewSet(TenantAwareViewSet):
+    """Which account each automatic posting uses, overriding the default codes"""
+    queryset = PostingRule.objects.all()
+    serializer_class = PostingRuleSerializer
+    pagination_class = LookupPagination
+    filterset_fields = ['document']
+
+class GLOutboxViewSet(TenantFilterMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Queued GL postings for POS sales. Rows that keep failing end up with
+    status 'failed' and can be put back in the queue with retry.
+    """
+    queryset = GLOutbox.objects.all()
+    serializer_class = GLOutboxSerializer
+    pagination_class = KeysetPagination
+    filterset_fields = ['status', 'source_type', 'branch']
+
+    @action(detail=True, methods=['post'])
+    def retry(self, request, pk=None):
+        item = self.get_object()
+        if item.status == 'posted':
+            return Response({'error': 'Already posted'}, status=400)
+        item.status = 'pending'
+        item.attempts = 0
+        item.next_attempt_at = timezone.now()
+        item.save()
+        return Response(self.get_serializer(item).data)
+
+class ClosedPeriodViewSet(TenantFilterMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Closed months per branch. Closing locks the month against postings and
+    writes its closing balances; with "archive": true its detailed ledger
+    lines also move to the archive, leaving one summary line per account.
+    """
+    queryset = ClosedPeriod.objects.all()
+    serializer_class = ClosedPeriodSerializer
+    pagination_class = KeysetPagination
+    filterset_fields = ['branch', 'is_archived']
+
+    @action(detail=False, methods=['post'])
+    def close(self, request):
+        branch = request.data.get('branch')
+        try:
+            month = parse_date(f"{request.data.get('period', '')}-01")
+        except ValueError:
+            month = None
+        if not branch or month is None:
+            return Response({'error': 'branch and period (YYYY-MM) are required'}, status=400)
+        try:
+            known = Branch.objects.filter(pk=branch, tenant_id=get_current_tenant()).exists()
+        except DjangoValidationError:
+            known = False
+        if not known:
+            return Response({'error': 'Unknown branch'}, status=400)
+        try:
+            closed = periods.close_period(get_current_tenant(), branch, month, archive=bool(request.data.get('archive')))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response(self.get_serializer(closed).data, status=201)
+
+    @action(detail=True, methods=['post'])
+    def reopen(self, request, pk=None):
+        try:
+            periods.reopen_period(self.get_object())
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response(status=204)
+
+class BankStatementViewSet(TenantFilterMixin, viewsets.ReadOnlyModelViewSet):
+    """Imported bank statements with their matched / suggested / unmatched counts"""
+    queryset = BankStatement.objects.all()
+    serializer_class = BankStatementSerializer
+    pagination_class = KeysetPagination
+    filterset_fields = ['account', 'branch']
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_statement(self, request):
+        """
+        Upload a CSV or OFX statement as 'file' and match it against the ledger.
+        Optional: account (code, default the POS cash account), branch, window (days).
+        """
+        tenant_id = get_current_tenant()
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'file is required'}, status=400)
+        try:
+            if request.data.get('account'):
+                account_id = account_id_for_code(tenant_id, request.data['account'])
+                if account_id is None:
+                    return Response({'error': 'Unknown account'}, status=400)
+            else:
+                account_id = posting_accounts(tenant_id, 'sale')['cash']
+            window = int(request.data.get('window', reconciliation.DEFAULT_DATE_WINDOW))
+
+            text = upload.read().decode('utf-8-sig', errors='replace')
+            if upload.name.lower().endswith(('.ofx', '.qfx')) or '<OFX>' in text[:2000].upper():
+                lines = reconciliation.parse_ofx_statement(text)
+            else:
+                lines = reconciliation.parse_csv_statement(io.StringIO(text, newline=''))
+            statement = reconciliation.import_statement(
+                tenant_id, account_id, lines,
+                name=upload.name,
+                branch_id=request.data.get('branch') or None,
+                window=window
+            )
+        except (ValueError, DjangoValidationError) as e:
+            return Response({'error': str(e)}, status=400)
+        return Response(self.get_serializer(statement).data, status=201)
+
+class StatementLineViewSet(TenantFilterMixin, viewsets.ReadOnlyModelViewSet):
+    """Statement lines; suggested matches can be confirmed, wrong ones undone"""
+    queryset = StatementLine.objects.all()
+    serializer_class = StatementLineSerializer
+    pagination_class = KeysetPagination
+    page_size = 500
+    filterset_fields = ['statement', 'status']
+
+    def _set_status(self, line, status, ledger_line_id):
+        line.status = status
+        line.ledger_line_id = ledger_line_id
+        if ledger_line_id is None:
+            line.archived_line_id = None
+        line.save(update_fields=['status', 'ledger_line', 'archived_line', 'updated_at'])
+        reconciliation.refresh_counts(line.statement)
+        return Response(self.get_serializer(line).data)
+
+    @action(detail=True, methods=['post'])
+    def confirm(self, request, pk=None):
+        line = self.get_object()
+        if line.ledger_line_id is None:
+            return Response({'error': 'No ledger line to confirm'}, status=400)
+        return self._set_status(line, 'matched', line.ledger_line_id)
+
+    @action(detail=True, methods=['post'])
+    def unmatch(self, request, pk=None):
+        return self._set_status(self.get_object(), 'unmatched', None)
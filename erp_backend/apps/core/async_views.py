@@ -0,0 +1,40 @@
+import functools
+from asgiref.sync import sync_to_async
+from rest_framework import exceptions
+from rest_framework.views import APIView
+
+def async_api_view(methods):
+    """
+    api_view for async function views. DRF views are sync only, so this runs
+    an APIView's own initial() (content negotiation, authentication,
+    permissions and throttling) in a thread, then awaits the view with the
+    DRF Request. The view returns a DRF Response, which is rendered with the
+    negotiated renderer; errors are handled by the view's exception handler.
+    """
+    allowed = [method.lower() for method in methods]
+
+    def decorator(view):
+        class WrappedAPIView(APIView):
+            http_method_names = allowed + ['options']
+
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            api_view = WrappedAPIView()
+            api_view.args = args
+            api_view.kwargs = kwargs
+            drf_request = api_view.initialize_request(request, *args, **kwargs)
+            api_view.request = drf_request
+            api_view.headers = api_view.default_response_headers
+            try:
+                await sync_to_async(api_view.initial)(drf_request, *args, **kwargs)
+                if request.method.lower() not in allowed:
+                    raise exceptions.MethodNotAllowed(request.method)
+                response = await view(drf_request, *args, **kwargs)
+            except Exception as exc:
+                response = api_view.handle_exception(exc)
+            return api_view.finalize_response(drf_request, response, *args, **kwargs)
+
+        # Like APIView.as_view(): CSRF is enforced by SessionAuthentication
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
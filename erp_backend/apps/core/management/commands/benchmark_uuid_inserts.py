@@ -0,0 +1,58 @@
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from apps.core.models import uuid7
+
+GENERATORS = {'v4': uuid.uuid4, 'v7': uuid7}
+
+class Command(BaseCommand):
+    help = (
+        "Insert rows keyed by uuid4 and by uuid7 into scratch tables with a UUID "
+        "primary key and compare throughput as the index grows. Run against "
+        "PostgreSQL for numbers that mean anything; the tables are dropped afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000_000)
+        parser.add_argument('--batch', type=int, default=10_000, help='Rows per INSERT transaction')
+        parser.add_argument('--report-every', type=int, default=1_000_000, help='Print throughput every N rows')
+
+    def handle(self, *args, **options):
+        field = models.UUIDField()
+        results = {}
+        for name, generate in GENERATORS.items():
+            table = f'bench_uuid_{name}'
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {table}')
+                cursor.execute(f'CREATE TABLE {table} (id uuid PRIMARY KEY, n integer NOT NULL)')
+            try:
+                results[name] = self.run(table, generate, field, options)
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT pg_size_pretty(pg_relation_size(%s))", [f'{table}_pkey'])
+                        self.stdout.write(f"{name}: primary key index size {cursor.fetchone()[0]}")
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+        for name, elapsed in results.items():
+            self.stdout.write(f"{name}: {options['rows']} rows in {elapsed:.1f}s ({options['rows'] / elapsed:.0f} rows/s)")
+        self.stdout.write(self.style.SUCCESS(f"v7 speedup: {results['v4'] / results['v7']:.2f}x"))
+
+    def run(self, table, generate, field, options):
+        rows, batch, report_every = options['rows'], options['batch'], options['report_every']
+        sql = f'INSERT INTO {table} (id, n) VALUES (%s, %s)'
+        started = window_started = time.perf_counter()
+        done = 0
+        while done < rows:
+            size = min(batch, rows - done)
+            params = [(field.get_db_prep_value(generate(), connection), done + i) for i in range(size)]
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, params)
+            previous, done = done, done + size
+            if done // report_every != previous // report_every:
+                now = time.perf_counter()
+                self.stdout.write(f"{table}: {done} rows, last {report_every} at {report_every / (now - window_started):.0f} rows/s")
+                window_started = now
+        return time.perf_counter() - started
@@ -0,0 +1,71 @@
+import re
+import uuid
+from datetime import date
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.core.models import TenantAwareModel
+from apps.inventory.models import Product, BranchStock
+from apps.accounting.models import LedgerLine
+from apps.sales.models import Sale
+from apps.hr.models import Attendance
+
+# PostgreSQL: "Seq Scan on sales_sale"; SQLite: "SCAN sales_sale" (but not
+# "SCAN ... USING INDEX", which walks an index).
+SEQ_SCAN = re.compile(r'Seq Scan on (\w+)|\bSCAN (\w+)(?! USING (?:COVERING )?INDEX)')
+
+def hot_queries():
+    """The lookups the tenant-scoped indexes are meant to cover, as (label, queryset)"""
+    tenant_id, branch_id, product_id, account_id, employee_id = (uuid.uuid4() for _ in range(5))
+    since = timezone.now()
+
+    yield 'BranchStock(tenant, branch, product)', BranchStock.objects.filter(
+        tenant_id=tenant_id, is_deleted=False, branch_id=branch_id, product_id=product_id)
+    yield 'Product.barcode', Product.objects.filter(
+        tenant_id=tenant_id, is_deleted=False, barcode='5000000000000')
+    yield 'LedgerLine(account)', LedgerLine.objects.filter(account_id=account_id, is_deleted=False)
+    yield 'Attendance(employee, date)', Attendance.objects.filter(
+        employee_id=employee_id, date__gte=date.today())
+    yield 'Sale(tenant, branch, created_at)', Sale.objects.filter(
+        tenant_id=tenant_id, is_deleted=False, branch_id=branch_id, created_at__gte=since)
+
+    # TenantFilterMixin + KeysetPagination on every tenant-aware table
+    tables = set(connection.introspection.table_names())
+    for model in apps.get_models():
+        if issubclass(model, TenantAwareModel) and model._meta.db_table in tables:
+            yield f'{model.__name__} list', model.objects.filter(
+                tenant_id=tenant_id, is_deleted=False).order_by('created_at', 'id')[:100]
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the hot tenant-scoped queries and fail if any of them plans a "
+        "sequential scan. Run after migrate; on PostgreSQL sequential scans are "
+        "disabled for the check so small tables still show the index plan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not just the failing ones')
+
+    def handle(self, *args, **options):
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for label, queryset in hot_queries():
+                plan = queryset.explain()
+                scans = [a or b for a, b in SEQ_SCAN.findall(plan)]
+                if scans:
+                    failures.append(label)
+                    self.stdout.write(self.style.ERROR(f"{label}: sequential scan on {', '.join(scans)}"))
+                    self.stdout.write(plan)
+                else:
+                    self.stdout.write(f"{label}: ok")
+                    if options['verbose_plans']:
+                        self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(f"{len(failures)} queries fell back to a sequential scan")
+        self.stdout.write(self.style.SUCCESS('OK: all hot queries use an index'))
@@ -1,4 +1,6 @@
 from django.http import JsonResponse
+from django.utils.functional import SimpleLazyObject
+from apps.tenants.cache import get_cached_tenant
 from apps.tenants.models import Tenant
 
 class ModuleAccessMiddleware:
@@ -27,24 +29,21 @@ class ModuleAccessMiddleware:
         if not tenant_id:
             return self.get_response(request)
         
-        try:
-            tenant = Tenant.objects.get(id=tenant_id)
-            
+        # Served from the per-process tenant cache, no query on a hit
+        tenant = get_cached_tenant(tenant_id)
+        if tenant is not None:
             # Check if module is active for this tenant
             for url_pattern, module_name in self.module_map.items():
                 if request.path.startswith(url_pattern):
-                    active_modules = tenant.active_modules or {}
-                    if not active_modules.get(module_name, False):
+                    if not tenant.active_modules.get(module_name, False):
                         return JsonResponse({
                             'error': f'Module "{module_name}" is not active for your account',
                             'module': module_name,
                             'upgrade_required': True
                         }, status=403)
             
-            # Attach tenant to request for easy access
-            request.tenant = tenant
-            
-        except Tenant.DoesNotExist:
-            pass
+            # The cached fields, and the Tenant model itself, loaded only if a view uses it
+            request.tenant_info = tenant
+            request.tenant = SimpleLazyObject(lambda: Tenant.objects.get(id=tenant.id))
         
         return self.get_response(request)
@@ -1,19 +1,50 @@
+import os
+import time
 import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.db import models
 from django.conf import settings
 from django.http import JsonResponse
-from threading import local
 
-_thread_locals = local()
+# A ContextVar rather than a thread local: each request, asyncio task and
+# worker thread sees its own value, including async views under ASGI.
+_current_tenant = ContextVar('current_tenant', default=None)
 
 def set_current_tenant(tenant_id):
-    _thread_locals.tenant_id = tenant_id
+    """Set the tenant for the current context. Returns a token for reset_current_tenant()."""
+    return _current_tenant.set(tenant_id)
+
+def reset_current_tenant(token):
+    _current_tenant.reset(token)
 
 def get_current_tenant():
-    return getattr(_thread_locals, 'tenant_id', None)
+    return _current_tenant.get()
+
+@contextmanager
+def tenant_context(tenant_id):
+    """Run a block (e.g. a background job) as the given tenant"""
+    token = set_current_tenant(tenant_id)
+    try:
+        yield
+    finally:
+        reset_current_tenant(token)
+
+def uuid7():
+    """Time-ordered UUID (RFC 9562 version 7).
+
+    48 bits of Unix milliseconds followed by 74 random bits. New keys land at
+    the right-hand edge of the primary key index instead of on a random page,
+    and they are ordinary UUIDs, so existing uuid4 ids stay valid alongside them.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value &= ~(0xF000 << 64) & ~(0xC << 60)
+    value |= 0x7000 << 64 | 0x8 << 60
+    return uuid.UUID(int=value)
 
 class TenantAwareModel(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -23,22 +54,44 @@ class TenantAwareModel(models.Model):
 
     class Meta:
         abstract = True
+        # Covers TenantFilterMixin (tenant_id=..., is_deleted=False) with the
+        # keyset pagination order. Subclasses declaring their own Meta must
+        # inherit TenantAwareModel.Meta to keep it.
+        indexes = [
+            models.Index(
+                fields=['tenant', 'created_at', 'id'],
+                condition=models.Q(is_deleted=False),
+                name='%(app_label)s_%(class)s_live'
+            ),
+        ]
 
     def delete(self, **kwargs):
         self.is_deleted = True
         self.save()
 
 class TenantMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
-    def __call__(self, request):
+    def _tenant_id(self, request):
         # In a real app, extract from JWT claims or subdomain
         tenant_id = request.headers.get('X-Tenant-ID')
         if not tenant_id and not request.path.startswith('/admin') and not request.path.startswith('/api/pos/register'):
              # Allow POS registration and admin without tenant header initially or handle accordingly
              pass
-        
-        set_current_tenant(tenant_id)
-        response = self.get_response(request)
-        return response
+        return tenant_id
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with tenant_context(self._tenant_id(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with tenant_context(self._tenant_id(request)):
+            return await self.get_response(request)
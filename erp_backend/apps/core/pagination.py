@@ -0,0 +1,170 @@
+import base64
+import binascii
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Small lookup tables (accounts, taxes, departments...) are usually wanted in one page
+LOOKUP_PAGE_SIZE = 500
+
+# Used when neither the request nor the model orders the list
+DEFAULT_ORDERING = ('-created_at',)
+
+def _cursor_value(value):
+    # Full precision: DjangoJSONEncoder would cut datetimes to milliseconds
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on (ordering fields..., id).
+    Each page is fetched with WHERE (key) > (last key of the previous page)
+    instead of OFFSET, so every page costs the same as the first one.
+    The ordering is the one already on the queryset (e.g. from OrderingFilter),
+    else the model's Meta.ordering, else newest first.
+
+    The response body stays a plain list. Links to the other pages are sent
+    in the Link header (rel="next" / rel="previous").
+    Views can set page_size and max_page_size to change the limits, clients
+    can ask for fewer rows with ?page_size=.
+    """
+    page_size = DEFAULT_PAGE_SIZE
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request, view):
+        default = getattr(view, 'page_size', self.page_size)
+        maximum = getattr(view, 'max_page_size', MAX_PAGE_SIZE)
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return min(default, maximum)
+        return max(1, min(size, maximum))
+
+    def _ordering(self, queryset):
+        """[(field, descending)] ending with the primary key, so the order is total"""
+        model = queryset.model
+        names = queryset.query.order_by or model._meta.ordering or DEFAULT_ORDERING
+        if not all(isinstance(name, str) and '__' not in name for name in names):
+            names = DEFAULT_ORDERING
+
+        ordering = []
+        for name in names:
+            descending = name.startswith('-')
+            field_name = name.lstrip('-')
+            try:
+                field = model._meta.pk if field_name == 'pk' else model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                continue
+            ordering.append((field, descending))
+            if field.primary_key:
+                return ordering
+        ordering.append((model._meta.pk, ordering[-1][1] if ordering else True))
+        return ordering
+
+    def _order_by(self, ordering, reverse):
+        expressions = []
+        for field, descending in ordering:
+            # Nulls go last in list order, so first when reading backwards
+            nulls = {'nulls_first' if reverse else 'nulls_last': True} if field.null else {}
+            if descending != reverse:
+                expressions.append(F(field.attname).desc(**nulls))
+            else:
+                expressions.append(F(field.attname).asc(**nulls))
+        return expressions
+
+    def _after(self, ordering, values, reverse):
+        """Rows strictly after `values` in the order the page is read"""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (field, descending), value in zip(ordering, values):
+            name = field.attname
+            if value is None:
+                after = Q(**{f'{name}__isnull': False}) if reverse else Q(pk__in=[])
+                same = Q(**{f'{name}__isnull': True})
+            else:
+                lookup = 'lt' if descending != reverse else 'gt'
+                after = Q(**{f'{name}__{lookup}': value})
+                if field.null and not reverse:
+                    after |= Q(**{f'{name}__isnull': True})
+                same = Q(**{name: value})
+            condition |= equal & after
+            equal &= same
+        return condition
+
+    def encode_cursor(self, ordering, instance, reverse):
+        payload = {
+            'o': [field.attname for field, descending in ordering],
+            'v': [_cursor_value(getattr(instance, field.attname)) for field, descending in ordering],
+            'r': reverse,
+        }
+        raw = json.dumps(payload, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(raw.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, ordering):
+        """(values, reverse) from the request, or (None, False) for the first page"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if payload['o'] != [field.attname for field, descending in ordering]:
+                raise ValueError('Cursor is for a different ordering')
+            values = [
+                None if value is None else field.to_python(value)
+                for (field, descending), value in zip(ordering, payload['v'])
+            ]
+            return values, bool(payload['r'])
+        except (binascii.Error, ValueError, KeyError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request, view)
+        ordering = self._ordering(queryset)
+        values, reverse = self.decode_cursor(request, ordering)
+
+        queryset = queryset.order_by(*self._order_by(ordering, reverse))
+        if values is not None:
+            queryset = queryset.filter(self._after(ordering, values, reverse))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        self.next_link = self.encode_cursor(ordering, rows[-1], False) if rows and has_next else None
+        self.previous_link = self.encode_cursor(ordering, rows[0], True) if rows and has_previous else None
+        return rows
+
+    def get_paginated_response(self, data):
+        links = []
+        if self.next_link:
+            links.append(f'<{self.next_link}>; rel="next"')
+        if self.previous_link:
+            links.append(f'<{self.previous_link}>; rel="previous"')
+        headers = {'Link': ', '.join(links)} if links else None
+        return Response(data, headers=headers)
+
+    def get_paginated_response_schema(self, schema):
+        return schema
+
+class LookupPagination(KeysetPagination):
+    """KeysetPagination with LOOKUP_PAGE_SIZE rows per page, for small lookup tables"""
+    page_size = LOOKUP_PAGE_SIZE
@@ -0,0 +1,13 @@
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+class QueryPlanTest(TestCase):
+    """The hot tenant-scoped queries are planned on an index, see check_query_plans"""
+
+    def test_hot_queries_do_not_scan_sequentially(self):
+        out = StringIO()
+        try:
+            call_command('check_query_plans', stdout=out)
+        except CommandError as e:
+            self.fail(f"{e}\n{out.getvalue()}")
@@ -1,5 +1,6 @@
 from rest_framework import viewsets
 from .models import get_current_tenant
+from .pagination import KeysetPagination
 
 class TenantFilterMixin:
     def get_queryset(self):
@@ -10,5 +11,7 @@ class TenantFilterMixin:
         return queryset.none() # Return empty if no tenant context
 
 class TenantAwareViewSet(TenantFilterMixin, viewsets.ModelViewSet):
+    pagination_class = KeysetPagination
+
     def perform_create(self, serializer):
         serializer.save(tenant_id=get_current_tenant())
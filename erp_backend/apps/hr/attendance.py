@@ -0,0 +1,91 @@
+"""
+Daily attendance summaries: one AttendanceDay per (employee, date) with the
+hours of that day's completed sessions, first clock-in, last clock-out and
+the status of the first session. Kept current by clock_in / clock_out and
+attendance edits, so payroll and reports read ~30 rows per employee a month
+instead of every punch. backfill_attendance_days rebuilds them from scratch.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Max, Min, OuterRef, Q, Subquery, Sum
+from .models import Attendance, AttendanceDay
+
+STANDARD_DAY_HOURS = Decimal(8)
+HOURS = Decimal('0.01')
+
+# Days summarized per query / upsert when backfilling
+SUMMARY_CHUNK_DAYS = 31
+
+def _day_rows(attendance):
+    """Grouped (tenant, employee, date) totals over an Attendance queryset"""
+    worked = ExpressionWrapper(F('clock_out') - F('clock_in'), output_field=DurationField())
+    first_status = Attendance.objects.filter(
+        employee_id=OuterRef('employee_id'), date=OuterRef('date'), is_deleted=False
+    ).order_by('clock_in').values('status')[:1]
+    return attendance.filter(is_deleted=False).values('tenant_id', 'employee_id', 'date').annotate(
+        worked=Sum(worked, filter=Q(clock_out__isnull=False)),
+        first_in=Min('clock_in'),
+        last_out=Max('clock_out'),
+        sessions=Count('id'),
+        first_status=Subquery(first_status),
+    ).order_by()
+
+def _summary(row):
+    worked = Decimal(str((row['worked'] or timedelta(0)).total_seconds())) / Decimal(3600)
+    return AttendanceDay(
+        tenant_id=row['tenant_id'],
+        employee_id=row['employee_id'],
+        date=row['date'],
+        worked_hours=worked.quantize(HOURS),
+        overtime_hours=max(worked - STANDARD_DAY_HOURS, Decimal(0)).quantize(HOURS),
+        first_in=row['first_in'],
+        last_out=row['last_out'],
+        sessions=row['sessions'],
+        status=row['first_status'] or 'present',
+    )
+
+def _upsert(summaries):
+    AttendanceDay.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['tenant', 'employee', 'date'],
+        update_fields=['worked_hours', 'overtime_hours', 'first_in', 'last_out', 'sessions', 'status', 'is_deleted', 'updated_at'],
+    )
+
+def refresh_attendance_days(tenant_id, keys):
+    """
+    Recompute the summaries of the given (employee id, date) pairs from their
+    attendance rows, in one grouped query and one upsert. Days left without
+    attendance lose their summary.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    employee_ids = {employee_id for employee_id, day in keys}
+    days = {day for employee_id, day in keys}
+    rows = _day_rows(Attendance.objects.filter(tenant_id=tenant_id, employee_id__in=employee_ids, date__in=days))
+    summaries = [_summary(row) for row in rows if (row['employee_id'], row['date']) in keys]
+    _upsert(summaries)
+
+    emptied = keys - {(summary.employee_id, summary.date) for summary in summaries}
+    if emptied:
+        match = Q(pk__in=[])
+        for employee_id, day in emptied:
+            match |= Q(employee_id=employee_id, date=day)
+        AttendanceDay.objects.filter(match, tenant_id=tenant_id).delete()
+
+def rebuild_attendance_days(tenant_id, date_from, date_to):
+    """Rebuild every summary of a tenant between two dates, a month-sized chunk at a time. Returns the days written."""
+    written = 0
+    start = date_from
+    while start <= date_to:
+        end = min(start + timedelta(days=SUMMARY_CHUNK_DAYS - 1), date_to)
+        rows = _day_rows(Attendance.objects.filter(tenant_id=tenant_id, date__range=[start, end]))
+        summaries = [_summary(row) for row in rows.iterator(chunk_size=2000)]
+        with transaction.atomic():
+            AttendanceDay.objects.filter(tenant_id=tenant_id, date__range=[start, end]).delete()
+            AttendanceDay.objects.bulk_create(summaries, batch_size=2000)
+        written += len(summaries)
+        start = end + timedelta(days=1)
+    return written
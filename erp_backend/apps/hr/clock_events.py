@@ -0,0 +1,254 @@
+"""
+Batched clock-event ingestion for kiosks that buffer punches.
+
+A batch is handled in one transaction with a fixed number of queries,
+however many punches it holds:
+1. employees resolved by id or employee number in one query and locked, so
+   concurrent batches for the same people are serialized
+2. repeated taps dropped: a punch less than CLOCK_DEDUP_SECONDS after or
+   before another of the same employee, in this batch or an earlier one, is
+   a duplicate. Taps are compared within their bucket and the neighbouring
+   ones (one query for the stored taps), so a window boundary between two
+   taps does not split them
+3. punches inserted with ON CONFLICT DO NOTHING; the (tenant, employee,
+   bucket) constraint is the backstop for a bucket already taken
+4. the accepted punches paired, in time order, with the employees' open
+   sessions: new Attendance rows bulk-created, closed ones bulk-updated
+5. the touched days' AttendanceDay summaries refreshed together
+
+Each punch gets a result: recorded (with the action taken), duplicate,
+ignored (e.g. a clock-out without an open session, or a punch older than
+the open session) or error.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from apps.core.models import uuid7
+from .attendance import refresh_attendance_days
+from .models import Attendance, ClockEvent, Employee
+
+# Largest batch a kiosk may send at once
+MAX_CLOCK_BATCH = 5000
+
+# An open session older than this is abandoned; the next punch starts a new one
+MAX_SESSION = timedelta(hours=16)
+
+# Punches from a kiosk clock this far ahead of the server are rejected
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+STANDARD_DAY_HOURS = Decimal(8)
+
+def _dedup_seconds():
+    return getattr(settings, 'CLOCK_DEDUP_SECONDS', 60)
+
+def _parse(punch, employees, now):
+    """(employee id, timestamp, kind) for a raw punch; raises ValueError"""
+    if not isinstance(punch, dict):
+        raise ValueError('Expected an object per punch')
+    employee_id = employees.get(str(punch.get('employee') or '').strip())
+    if employee_id is None:
+        raise ValueError(f"Unknown employee '{punch.get('employee')}'")
+    try:
+        timestamp = parse_datetime(str(punch.get('timestamp') or ''))
+    except ValueError:
+        timestamp = None
+    if timestamp is None:
+        raise ValueError(f"Invalid timestamp '{punch.get('timestamp')}'")
+    # Same timezone mode as timezone.now(): aware with USE_TZ, local naive without
+    if settings.USE_TZ and timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+    elif not settings.USE_TZ and timezone.is_aware(timestamp):
+        timestamp = timezone.make_naive(timestamp)
+    if timestamp > now + MAX_CLOCK_SKEW:
+        raise ValueError('Timestamp is in the future')
+    kind = punch.get('kind') or 'auto'
+    if kind not in ('auto', 'in', 'out'):
+        raise ValueError(f"Invalid kind '{kind}'")
+    return employee_id, timestamp, kind
+
+def _resolve_employees(tenant_id, punches):
+    """{employee id or employee number as sent: employee id}, employees locked in id order"""
+    keys = {str(punch.get('employee') or '').strip() for punch in punches if isinstance(punch, dict)}
+    keys.discard('')
+    ids = set()
+    for key in keys:
+        try:
+            ids.add(str(Employee._meta.pk.to_python(key)))
+        except Exception:
+            continue
+    rows = Employee.objects.select_for_update().filter(
+        Q(id__in=ids) | Q(employee_id__in=keys),
+        tenant_id=tenant_id,
+        is_deleted=False,
+    ).order_by('id').values_list('id', 'employee_id')
+    employees = {}
+    for employee_id, number in rows:
+        employees[str(employee_id)] = employee_id
+        employees[number] = employee_id
+    return employees
+
+def _stored_taps(tenant_id, parsed, window):
+    """{(employee id, bucket): timestamp} of stored punches in or next to the buckets of the parsed punches"""
+    if not parsed:
+        return {}
+    buckets = [bucket for employee_id, timestamp, bucket, kind in parsed]
+    return {
+        (employee_id, bucket): timestamp
+        for employee_id, bucket, timestamp in ClockEvent.objects.filter(
+            tenant_id=tenant_id,
+            employee_id__in={employee_id for employee_id, timestamp, bucket, kind in parsed},
+            bucket__range=[min(buckets) - 1, max(buckets) + 1],
+        ).values_list('employee_id', 'bucket', 'timestamp')
+    }
+
+def _is_repeat(taps, employee_id, timestamp, bucket, window):
+    """True if the bucket is taken, or a neighbouring one holds a tap less than `window` seconds away"""
+    if (employee_id, bucket) in taps:
+        return True
+    for neighbour in (bucket - 1, bucket + 1):
+        other = taps.get((employee_id, neighbour))
+        if other is not None and abs((timestamp - other).total_seconds()) < window:
+            return True
+    return False
+
+def _insert_events(tenant_id, events):
+    """Insert ClockEvents, skipping ones that hit the dedup constraint. Returns the ids inserted."""
+    ClockEvent.objects.bulk_create(events, batch_size=1000, ignore_conflicts=True)
+    return set(ClockEvent.objects.filter(
+        tenant_id=tenant_id, id__in=[event.id for event in events]
+    ).values_list('id', flat=True))
+
+def _local_date(timestamp):
+    return timezone.localtime(timestamp).date() if timezone.is_aware(timestamp) else timestamp.date()
+
+def _close(session, timestamp):
+    session.clock_out = timestamp
+    hours = Decimal(str((timestamp - session.clock_in).total_seconds())) / Decimal(3600)
+    session.hours_worked = hours.quantize(Decimal('0.01'))
+    session.overtime_hours = max(hours - STANDARD_DAY_HOURS, Decimal(0)).quantize(Decimal('0.01'))
+
+def _pair(tenant_id, events):
+    """
+    Apply accepted events in time order to the employees' open sessions.
+    Returns {event id: (status, action, attendance, error)}.
+    """
+    oldest = min(event.timestamp for event in events) - MAX_SESSION
+    open_sessions = {}
+    for session in Attendance.objects.filter(
+        tenant_id=tenant_id,
+        employee_id__in={event.employee_id for event in events},
+        clock_out__isnull=True,
+        clock_in__gte=oldest,
+        is_deleted=False,
+    ).order_by('clock_in'):
+        open_sessions[session.employee_id] = session
+
+    created, closed, outcomes, new_ids = [], [], {}, set()
+    for event in sorted(events, key=lambda event: event.timestamp):
+        session = open_sessions.get(event.employee_id)
+        if session is not None and event.timestamp < session.clock_in:
+            # Uploaded late: it cannot pair with the open session, nor replace it
+            outcomes[event.id] = ('ignored', None, session, 'Earlier than the open session')
+            continue
+        if session is not None and event.timestamp - session.clock_in > MAX_SESSION:
+            session = None
+        if session is None:
+            if event.kind == 'out':
+                outcomes[event.id] = ('ignored', None, None, 'Not clocked in')
+                continue
+            session = Attendance(
+                tenant_id=tenant_id,
+                employee_id=event.employee_id,
+                date=_local_date(event.timestamp),
+                clock_in=event.timestamp,
+            )
+            created.append(session)
+            new_ids.add(session.pk)
+            open_sessions[event.employee_id] = session
+            outcomes[event.id] = ('recorded', 'clock_in', session, '')
+        elif event.kind == 'in':
+            outcomes[event.id] = ('ignored', None, session, 'Already clocked in')
+        else:
+            _close(session, event.timestamp)
+            if session.pk not in new_ids:
+                closed.append(session)
+            del open_sessions[event.employee_id]
+            outcomes[event.id] = ('recorded', 'clock_out', session, '')
+
+    Attendance.objects.bulk_create(created, batch_size=1000)
+    Attendance.objects.bulk_update(closed, ['clock_out', 'hours_worked', 'overtime_hours'], batch_size=1000)
+    return outcomes, created + closed
+
+def ingest_clock_events(tenant_id, punches, device=''):
+    """
+    Record a batch of punches [{'employee', 'timestamp', 'kind'?}] and pair
+    them into Attendance. Returns one result per punch, in order:
+    {'index', 'status', 'action'?, 'attendance_id'?, 'error'?}.
+    """
+    if len(punches) > MAX_CLOCK_BATCH:
+        raise ValueError(f'At most {MAX_CLOCK_BATCH} punches per batch')
+    window = _dedup_seconds()
+    now = timezone.now()
+    results = [{'index': index} for index in range(len(punches))]
+
+    with transaction.atomic():
+        employees = _resolve_employees(tenant_id, punches)
+        parsed = {}
+        for index, punch in enumerate(punches):
+            try:
+                employee_id, timestamp, kind = _parse(punch, employees, now)
+            except (TypeError, ValueError) as e:
+                results[index].update(status='error', error=str(e))
+                continue
+            parsed[index] = (employee_id, timestamp, int(timestamp.timestamp()) // window, kind)
+
+        # The employees are locked, so no other batch adds taps for them meanwhile
+        taps = _stored_taps(tenant_id, parsed.values(), window)
+        events, event_index = [], {}
+        for index, (employee_id, timestamp, bucket, kind) in parsed.items():
+            if _is_repeat(taps, employee_id, timestamp, bucket, window):
+                results[index]['status'] = 'duplicate'
+                continue
+            taps[(employee_id, bucket)] = timestamp
+            event = ClockEvent(
+                id=uuid7(),
+                tenant_id=tenant_id,
+                employee_id=employee_id,
+                timestamp=timestamp,
+                bucket=bucket,
+                kind=kind,
+                device=device[:100],
+            )
+            events.append(event)
+            event_index[event.id] = index
+
+        inserted = _insert_events(tenant_id, events) if events else set()
+        accepted = [event for event in events if event.id in inserted]
+        for event in events:
+            if event.id not in inserted:
+                results[event_index[event.id]]['status'] = 'duplicate'
+        if not accepted:
+            return results
+
+        outcomes, sessions = _pair(tenant_id, accepted)
+        linked = []
+        for event in accepted:
+            status, action, session, error = outcomes[event.id]
+            result = results[event_index[event.id]]
+            result['status'] = status
+            if action:
+                result['action'] = action
+            if error:
+                result['error'] = error
+            if session is not None:
+                result['attendance_id'] = session.id
+                if status == 'recorded':
+                    event.attendance = session
+                    linked.append(event)
+        ClockEvent.objects.bulk_update(linked, ['attendance'], batch_size=1000)
+        refresh_attendance_days(tenant_id, {(session.employee_id, session.date) for session in sessions})
+    return results
@@ -1,5 +1,7 @@
 from django.utils import timezone
 from .models import Attendance, Employee, LeaveRequest, PayrollSlip, ShiftAssignment
+from .attendance import refresh_attendance_days
+from .payroll import attendance_totals, compute_pay
 from decimal import Decimal
 from datetime import datetime, timedelta
 
@@ -11,12 +13,14 @@ def clock_in(employee_id):
     if Attendance.objects.filter(employee=employee, date=now.date(), clock_out__isnull=True).exists():
         raise ValueError("Already clocked in")
         
-    return Attendance.objects.create(
+    attendance = Attendance.objects.create(
         tenant=employee.tenant,
         employee=employee,
         date=now.date(),
         clock_in=now
     )
+    refresh_attendance_days(employee.tenant_id, [(employee.id, attendance.date)])
+    return attendance
 
 def clock_out(employee_id):
     employee = Employee.objects.get(id=employee_id)
@@ -40,42 +44,18 @@ def clock_out(employee_id):
         attendance.overtime_hours = hours - 8
     
     attendance.save()
+    refresh_attendance_days(employee.tenant_id, [(employee.id, attendance.date)])
     return attendance
 
 def calculate_payroll(employee, period_start, period_end):
     """Calculate payroll for an employee for a given period"""
-    attendances = Attendance.objects.filter(
-        employee=employee,
-        date__range=[period_start, period_end]
+    days_worked, total_hours, overtime_hours = attendance_totals(
+        employee.tenant_id, [employee.id], period_start, period_end
+    ).get(employee.id, (0, Decimal(0), Decimal(0)))
+    basic_salary, overtime_pay = compute_pay(
+        employee.salary, employee.salary_type, days_worked, total_hours, overtime_hours
     )
     
-    total_hours = Decimal(0)
-    overtime_hours = Decimal(0)
-    days_worked = 0
-    
-    for att in attendances:
-        if att.clock_in and att.clock_out:
-            duration = att.clock_out - att.clock_in
-            hours = Decimal(duration.total_seconds() / 3600)
-            total_hours += hours
-            days_worked += 1
-            
-            if hours > 8:
-                overtime_hours += (hours - 8)
-    
-    # Calculate pay
-    if employee.salary_type == 'monthly':
-        basic_salary = employee.salary
-        hourly_rate = employee.salary / Decimal(160)  # Assuming 160 hours/month
-    elif employee.salary_type == 'hourly':
-        hourly_rate = employee.salary
-        basic_salary = hourly_rate * total_hours
-    else:  # daily
-        basic_salary = employee.salary * days_worked
-        hourly_rate = employee.salary / Decimal(8)
-    
-    overtime_pay = overtime_hours * hourly_rate * Decimal(1.5)  # 1.5x for overtime
-    
     return {
         'employee': employee.user.get_full_name(),
         'employee_id': employee.employee_id,
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils.dateparse import parse_date
+from apps.hr.attendance import rebuild_attendance_days
+from apps.hr.models import Attendance
+from apps.tenants.models import Tenant
+
+class Command(BaseCommand):
+    help = "Rebuild the daily attendance summaries (AttendanceDay) from attendance sessions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Only this tenant; default: every tenant')
+        parser.add_argument('--from', dest='date_from', help='First day (YYYY-MM-DD); default: earliest attendance')
+        parser.add_argument('--to', dest='date_to', help='Last day (YYYY-MM-DD); default: latest attendance')
+
+    def handle(self, *args, **options):
+        bounds = {}
+        for name in ('date_from', 'date_to'):
+            if options[name]:
+                bounds[name] = parse_date(options[name])
+                if bounds[name] is None:
+                    raise CommandError(f"--{name[5:]} must be YYYY-MM-DD")
+
+        tenant_ids = [options['tenant']] if options['tenant'] else Tenant.objects.values_list('id', flat=True)
+        for tenant_id in tenant_ids:
+            span = Attendance.objects.filter(tenant_id=tenant_id, is_deleted=False).aggregate(first=Min('date'), last=Max('date'))
+            date_from = bounds.get('date_from') or span['first']
+            date_to = bounds.get('date_to') or span['last']
+            if date_from is None or date_to is None:
+                continue
+            written = rebuild_attendance_days(tenant_id, date_from, date_to)
+            self.stdout.write(self.style.SUCCESS(f"{tenant_id}: {written} day(s) from {date_from} to {date_to}"))
@@ -0,0 +1,61 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from apps.hr.models import PayrollRun
+from apps.hr.payroll import PAYROLL_CHUNK_SIZE, requeue_run, run_payroll
+from apps.tenants.models import Branch
+
+class Command(BaseCommand):
+    help = (
+        "Run payroll for every active employee of a tenant (or one branch) over a period, "
+        "spreading the work over several processes. --run resumes a failed or stalled run or runs a queued one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant')
+        parser.add_argument('--start', help='Period start (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Period end (YYYY-MM-DD)')
+        parser.add_argument('--branch', help='Branch code; default: the whole tenant')
+        parser.add_argument('--tax-rate', default='0.15')
+        parser.add_argument('--run', help='Id of an existing queued, failed or stalled run')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processes to use')
+        parser.add_argument('--chunk-size', type=int, default=PAYROLL_CHUNK_SIZE, help='Employees per transaction')
+
+    def _create_run(self, options):
+        if not (options['tenant'] and options['start'] and options['end']):
+            raise CommandError('Give --run, or --tenant, --start and --end')
+        start, end = parse_date(options['start']), parse_date(options['end'])
+        if start is None or end is None or end < start:
+            raise CommandError('--start and --end must be dates (YYYY-MM-DD), start first')
+        branch = None
+        if options['branch']:
+            branch = Branch.objects.filter(tenant_id=options['tenant'], code=options['branch']).first()
+            if branch is None:
+                raise CommandError('No such branch')
+        return PayrollRun.objects.create(
+            tenant_id=options['tenant'],
+            branch=branch,
+            period_start=start,
+            period_end=end,
+            tax_rate=options['tax_rate'],
+        )
+
+    def handle(self, *args, **options):
+        if options['run']:
+            run = PayrollRun.objects.filter(id=options['run']).first()
+            if run is None:
+                raise CommandError('No such run')
+            if run.status in ('failed', 'running'):
+                try:
+                    requeue_run(run)
+                except ValueError as e:
+                    raise CommandError(str(e))
+        else:
+            run = self._create_run(options)
+
+        run_payroll(run.id, workers=options['workers'], chunk_size=options['chunk_size'])
+        run.refresh_from_db()
+        message = f"Run {run.id}: {run.status}, {run.processed}/{run.total} slip(s)"
+        if run.status != 'completed':
+            raise CommandError(f"{message}. {run.error}")
+        self.stdout.write(self.style.SUCCESS(message))
@@ -9,7 +9,7 @@ class Department(TenantAwareModel):
     manager = models.ForeignKey('Employee', on_delete=models.SET_NULL, null=True, blank=True, related_name='managed_departments')
     description = models.TextField(blank=True)
     
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         unique_together = ('tenant', 'code')
     
     def __str__(self):
@@ -65,7 +65,7 @@ class Employee(TenantAwareModel):
     annual_leave_balance = models.IntegerField(default=21)  # Days
     sick_leave_balance = models.IntegerField(default=10)
     
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         unique_together = ('tenant', 'employee_id')
     
     def __str__(self):
@@ -92,8 +92,56 @@ class Attendance(TenantAwareModel):
     
     notes = models.TextField(blank=True)
     
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
+        # Several sessions a day are allowed; AttendanceDay holds the daily totals
+        indexes = TenantAwareModel.Meta.indexes + [
+            # Attendance of one employee over a date range
+            models.Index(fields=['employee', 'date'], name='attendance_employee_date'),
+        ]
+
+class AttendanceDay(TenantAwareModel):
+    """
+    Daily attendance totals of an employee, maintained from the Attendance
+    sessions of that day (see apps/hr/attendance.py).
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='attendance_days')
+    date = models.DateField()
+    worked_hours = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    overtime_hours = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    first_in = models.DateTimeField(null=True, blank=True)
+    last_out = models.DateTimeField(null=True, blank=True)
+    sessions = models.IntegerField(default=0)
+    status = models.CharField(max_length=20, choices=Attendance.STATUS_CHOICES, default='present')
+
+    class Meta(TenantAwareModel.Meta):
         unique_together = ('tenant', 'employee', 'date')
+        indexes = TenantAwareModel.Meta.indexes + [
+            # Payroll and reports: one employee over a period
+            models.Index(fields=['employee', 'date'], name='attendanceday_employee_date'),
+        ]
+
+class ClockEvent(TenantAwareModel):
+    """
+    A raw punch from a kiosk. bucket is the punch time in whole dedup
+    windows since the epoch: an employee has at most one punch per bucket,
+    and repeated taps are looked for in a punch's bucket and its neighbours
+    (see apps/hr/clock_events.py).
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='clock_events')
+    timestamp = models.DateTimeField()
+    bucket = models.BigIntegerField()
+
+    KIND_CHOICES = (
+        ('auto', 'Auto'),  # In when the employee has no open session, otherwise out
+        ('in', 'Clock In'),
+        ('out', 'Clock Out'),
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='auto')
+    device = models.CharField(max_length=100, blank=True)
+    attendance = models.ForeignKey(Attendance, on_delete=models.SET_NULL, null=True, blank=True, related_name='clock_events')
+
+    class Meta(TenantAwareModel.Meta):
+        unique_together = ('tenant', 'employee', 'bucket')
 
 class LeaveRequest(TenantAwareModel):
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_requests')
@@ -145,7 +193,7 @@ class ShiftAssignment(TenantAwareModel):
     shift = models.ForeignKey(Shift, on_delete=models.CASCADE)
     date = models.DateField()
     
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         unique_together = ('tenant', 'employee', 'date')
 
 class PerformanceReview(TenantAwareModel):
@@ -182,9 +230,36 @@ class PerformanceReview(TenantAwareModel):
         self.overall_rating = sum(ratings) / len(ratings)
         super().save(*args, **kwargs)
 
+class PayrollRun(TenantAwareModel):
+    """
+    Payroll for every active employee of a tenant (or one branch) over a
+    period, computed in the background. Employees that already have a slip
+    for the period are skipped, so a failed or interrupted run can be resumed.
+    updated_at moves with every chunk written and tells a stalled run apart.
+    """
+    branch = models.ForeignKey('tenants.Branch', on_delete=models.CASCADE, null=True, blank=True, related_name='payroll_runs')
+    period_start = models.DateField()
+    period_end = models.DateField()
+    tax_rate = models.DecimalField(max_digits=5, decimal_places=4, default=0.15)
+
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    total = models.IntegerField(default=0)  # Employees in the run
+    processed = models.IntegerField(default=0)  # Slips written so far
+    error = models.TextField(blank=True)
+    attempts = models.IntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
 class PayrollSlip(TenantAwareModel):
     """Monthly payroll records"""
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='payroll_slips')
+    run = models.ForeignKey(PayrollRun, on_delete=models.SET_NULL, null=True, blank=True, related_name='slips')
     
     period_start = models.DateField()
     period_end = models.DateField()
@@ -221,5 +296,5 @@ class PayrollSlip(TenantAwareModel):
     
     notes = models.TextField(blank=True)
     
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         unique_together = ('tenant', 'employee', 'period_start', 'period_end')
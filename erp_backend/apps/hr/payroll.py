@@ -0,0 +1,228 @@
+"""
+Payroll runs: slips for every active employee of a tenant (or one branch).
+
+Hours, days and overtime come from one grouped query over the period's
+daily attendance summaries, pay is worked out per chunk of employees in
+plain Decimal arithmetic and the slips are written with bulk_create, one
+transaction per chunk together with the run's progress. Large runs started
+from the management command can spread their chunks over a process pool.
+"""
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import repeat
+from multiprocessing import get_context
+from threading import Lock
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from apps.core.models import tenant_context
+from .models import AttendanceDay, Employee, PayrollRun, PayrollSlip
+
+logger = logging.getLogger(__name__)
+
+# Employees priced and written per transaction
+PAYROLL_CHUNK_SIZE = 500
+
+# Employment statuses that get a slip
+PAYROLL_STATUSES = ('active', 'probation')
+
+# A running run that saved no progress for this long is assumed to belong to a dead worker
+PAYROLL_RUN_TIMEOUT = timedelta(minutes=30)
+
+MONTHLY_HOURS = Decimal(160)
+OVERTIME_MULTIPLIER = Decimal('1.5')
+CENTS = Decimal('0.01')
+
+def attendance_totals(tenant_id, employee_ids, period_start, period_end):
+    """
+    {employee id: (days worked, hours worked, overtime hours)} over the
+    period, from one grouped query on the daily summaries (AttendanceDay).
+    Overtime is the time over 8 hours of each day.
+    """
+    rows = AttendanceDay.objects.filter(
+        tenant_id=tenant_id,
+        employee_id__in=employee_ids,
+        date__range=[period_start, period_end],
+        is_deleted=False,
+    ).values('employee_id').annotate(
+        days=Count('id', filter=Q(worked_hours__gt=0)),
+        worked=Sum('worked_hours'),
+        overtime=Sum('overtime_hours'),
+    ).order_by()
+    return {
+        row['employee_id']: (row['days'], row['worked'] or Decimal(0), row['overtime'] or Decimal(0))
+        for row in rows
+    }
+
+def compute_pay(salary, salary_type, days, hours, overtime):
+    """(basic salary, overtime pay) for a monthly, hourly or daily rate"""
+    if salary_type == 'monthly':
+        basic = salary
+        hourly_rate = salary / MONTHLY_HOURS
+    elif salary_type == 'hourly':
+        hourly_rate = salary
+        basic = hourly_rate * hours
+    else:  # daily
+        basic = salary * days
+        hourly_rate = salary / Decimal(8)
+    return basic, overtime * hourly_rate * OVERTIME_MULTIPLIER
+
+def _cents(value):
+    return value.quantize(CENTS, rounding=ROUND_HALF_UP)
+
+def build_slip(run, employee, totals):
+    """Unsaved PayrollSlip for an employee values() row and its attendance totals"""
+    days, hours, overtime = totals.get(employee['id'], (0, Decimal(0), Decimal(0)))
+    basic, overtime_pay = compute_pay(employee['salary'], employee['salary_type'], days, hours, overtime)
+    basic, overtime_pay = _cents(basic), _cents(overtime_pay)
+    gross = basic + overtime_pay
+    tax = _cents(gross * run.tax_rate)
+    return PayrollSlip(
+        tenant_id=run.tenant_id,
+        employee_id=employee['id'],
+        run=run,
+        period_start=run.period_start,
+        period_end=run.period_end,
+        basic_salary=basic,
+        overtime_pay=overtime_pay,
+        tax=tax,
+        gross_salary=gross,
+        net_salary=gross - tax,
+        days_worked=days,
+        hours_worked=_cents(hours),
+        overtime_hours=_cents(overtime),
+        status='processed',
+    )
+
+def _with_slip(run):
+    """Employee ids that already have a slip for the run's period"""
+    return PayrollSlip.objects.filter(
+        tenant_id=run.tenant_id,
+        period_start=run.period_start,
+        period_end=run.period_end,
+        is_deleted=False,
+    ).values('employee_id')
+
+def pending_employee_ids(run):
+    """Employees of the run still without a slip for its period, in id order"""
+    employees = Employee.objects.filter(
+        tenant_id=run.tenant_id,
+        employment_status__in=PAYROLL_STATUSES,
+        is_deleted=False,
+    )
+    if run.branch_id:
+        employees = employees.filter(branch_id=run.branch_id)
+    return list(employees.exclude(id__in=_with_slip(run)).order_by('id').values_list('id', flat=True))
+
+def process_chunk(run, employee_ids):
+    """
+    Write the slips of one chunk of employees and count them on the run.
+    Returns how many. The employees are locked and the ones that got a slip
+    in the meantime (another run of the same period, or a stalled worker
+    that came back) are skipped, so no employee is paid twice.
+    """
+    with transaction.atomic():
+        employees = list(
+            Employee.objects.select_for_update()
+            .filter(id__in=employee_ids)
+            .order_by('id')
+            .values('id', 'salary', 'salary_type')
+        )
+        # Read after the locks are held, in a statement of its own: a subquery
+        # of the locking query would not see slips committed while it waited
+        paid = set(_with_slip(run).filter(employee_id__in=employee_ids).values_list('employee_id', flat=True))
+        employees = [employee for employee in employees if employee['id'] not in paid]
+        totals = attendance_totals(run.tenant_id, [employee['id'] for employee in employees], run.period_start, run.period_end)
+        slips = [build_slip(run, employee, totals) for employee in employees]
+        PayrollSlip.objects.bulk_create(slips)
+        PayrollRun.objects.filter(id=run.id).update(
+            processed=F('processed') + len(slips),
+            updated_at=timezone.now()
+        )
+    return len(slips)
+
+def _process_chunk_in_child(run_id, employee_ids):
+    close_old_connections()
+    run = PayrollRun.objects.get(id=run_id)
+    with tenant_context(run.tenant_id):
+        return process_chunk(run, employee_ids)
+
+def claim_run(run_id):
+    """Move a queued run to running. False if another worker got there first."""
+    now = timezone.now()
+    return PayrollRun.objects.filter(id=run_id, status='queued').update(
+        status='running',
+        started_at=now,
+        updated_at=now,
+        attempts=F('attempts') + 1
+    ) == 1
+
+def run_payroll(run_id, workers=1, chunk_size=PAYROLL_CHUNK_SIZE):
+    """
+    Process a queued run. With workers > 1 the chunks are spread over that
+    many processes (forked, so only from a single-threaded caller such as a
+    management command). Progress is saved with every chunk, which also
+    moves the run's updated_at heartbeat; a failed or stalled run can be
+    queued again and only the employees still without a slip are priced.
+    """
+    if not claim_run(run_id):
+        return
+
+    run = PayrollRun.objects.get(id=run_id)
+    try:
+        with tenant_context(run.tenant_id):
+            pending = pending_employee_ids(run)
+            PayrollRun.objects.filter(id=run_id).update(total=run.processed + len(pending), updated_at=timezone.now())
+            chunks = [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+            if workers > 1 and len(chunks) > 1:
+                # Children open their own connections, never the parent's
+                connections.close_all()
+                with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=get_context('fork')) as pool:
+                    for _ in pool.map(_process_chunk_in_child, repeat(run_id), chunks):
+                        pass
+            else:
+                for chunk in chunks:
+                    process_chunk(run, chunk)
+    except Exception as e:
+        logger.exception('Payroll run %s failed', run_id)
+        PayrollRun.objects.filter(id=run_id).update(status='failed', error=str(e), finished_at=timezone.now())
+        return
+
+    PayrollRun.objects.filter(id=run_id).update(status='completed', error='', finished_at=timezone.now())
+
+def is_stalled(run):
+    """True for a running run whose worker saved no progress within PAYROLL_RUN_TIMEOUT"""
+    return run.status == 'running' and run.updated_at < timezone.now() - PAYROLL_RUN_TIMEOUT
+
+def requeue_run(run):
+    """Queue a failed or stalled run again; it picks up where it stopped"""
+    if run.status == 'failed':
+        requeued = PayrollRun.objects.filter(id=run.id, status='failed')
+    elif is_stalled(run):
+        requeued = PayrollRun.objects.filter(
+            id=run.id, status='running', updated_at__lt=timezone.now() - PAYROLL_RUN_TIMEOUT
+        )
+    else:
+        raise ValueError(f"Only failed or stalled runs can be resumed, this one is {run.status}")
+    if not requeued.update(status='queued', error=''):
+        raise ValueError('The run changed meanwhile, reload it')
+
+_executor = None
+_executor_lock = Lock()
+
+def _run_in_worker(run_id):
+    close_old_connections()
+    try:
+        run_payroll(run_id)
+    finally:
+        close_old_connections()
+
+def enqueue_payroll_run(run_id):
+    """Run a queued run in a background thread once the current transaction commits"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='payroll')
+    transaction.on_commit(lambda: _executor.submit(_run_in_worker, run_id))
@@ -2,8 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     EmployeeViewSet, DepartmentViewSet, PositionViewSet,
-    AttendanceViewSet, LeaveRequestViewSet, ShiftViewSet,
-    ShiftAssignmentViewSet, PerformanceReviewViewSet, PayrollSlipViewSet
+    AttendanceViewSet, AttendanceDayViewSet, ClockEventViewSet, LeaveRequestViewSet, ShiftViewSet,
+    ShiftAssignmentViewSet, PerformanceReviewViewSet, PayrollRunViewSet, PayrollSlipViewSet
 )
 
 router = DefaultRouter()
@@ -11,10 +11,13 @@ router.register(r'employees', EmployeeViewSet)
 router.register(r'departments', DepartmentViewSet)
 router.register(r'positions', PositionViewSet)
 router.register(r'attendance', AttendanceViewSet)
+router.register(r'attendance-days', AttendanceDayViewSet)
+router.register(r'clock-events', ClockEventViewSet)
 router.register(r'leave-requests', LeaveRequestViewSet)
 router.register(r'shifts', ShiftViewSet)
 router.register(r'shift-assignments', ShiftAssignmentViewSet)
 router.register(r'performance-reviews', PerformanceReviewViewSet)
+router.register(r'payroll-runs', PayrollRunViewSet)
 router.register(r'payroll-slips', PayrollSlipViewSet)
 
 urlpatterns = [
@@ -1,10 +1,17 @@
-from apps.core.views import TenantAwareViewSet
-from .models import Employee, Attendance, LeaveRequest, Department, Position, Shift, ShiftAssignment, PerformanceReview, PayrollSlip
-from rest_framework import serializers, status
+from apps.core.models import get_current_tenant
+from apps.core.pagination import KeysetPagination, LookupPagination
+from apps.core.views import TenantAwareViewSet, TenantFilterMixin
+from .models import Employee, Attendance, AttendanceDay, ClockEvent, LeaveRequest, Department, Position, Shift, ShiftAssignment, PerformanceReview, PayrollRun, PayrollSlip
+from rest_framework import serializers, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from .attendance import refresh_attendance_days
+from .clock_events import ingest_clock_events
+from .payroll import enqueue_payroll_run, requeue_run
 from .logic import clock_in, clock_out, calculate_payroll, generate_payroll_slip, approve_leave_request, assign_shift, get_employee_schedule
 from datetime import datetime
+from django.utils.dateparse import parse_date
 
 # Serializers
 class DepartmentSerializer(serializers.ModelSerializer):
@@ -34,6 +41,16 @@ class AttendanceSerializer(serializers.ModelSerializer):
         model = Attendance
         fields = '__all__'
 
+class AttendanceDaySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AttendanceDay
+        fields = '__all__'
+
+class ClockEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ClockEvent
+        fields = '__all__'
+
 class LeaveRequestSerializer(serializers.ModelSerializer):
     employee_name = serializers.ReadOnlyField(source='employee.user.get_full_name')
     approved_by_name = serializers.ReadOnlyField(source='approved_by.get_full_name')
@@ -60,6 +77,17 @@ class PerformanceReviewSerializer(serializers.ModelSerializer):
         model = PerformanceReview
         fields = '__all__'
 
+class PayrollRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PayrollRun
+        fields = '__all__'
+        read_only_fields = ['tenant', 'status', 'total', 'processed', 'error', 'attempts', 'started_at', 'finished_at']
+
+    def validate(self, data):
+        if data['period_end'] < data['period_start']:
+            raise serializers.ValidationError({'period_end': 'Must not be before period_start'})
+        return data
+
 class PayrollSlipSerializer(serializers.ModelSerializer):
     employee_name = serializers.ReadOnlyField(source='employee.user.get_full_name')
     class Meta:
@@ -70,10 +98,12 @@ class PayrollSlipSerializer(serializers.ModelSerializer):
 class DepartmentViewSet(TenantAwareViewSet):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
+    pagination_class = LookupPagination
 
 class PositionViewSet(TenantAwareViewSet):
     queryset = Position.objects.all()
     serializer_class = PositionSerializer
+    pagination_class = LookupPagination
 
 class EmployeeViewSet(TenantAwareViewSet):
     queryset = Employee.objects.all()
@@ -145,6 +175,75 @@ class AttendanceViewSet(TenantAwareViewSet):
     queryset = Attendance.objects.all()
     serializer_class = AttendanceSerializer
     filterset_fields = ['employee', 'date', 'status']
+    page_size = 200
+
+    def _refresh_days(self, attendance, previous=None):
+        keys = {(attendance.employee_id, attendance.date)}
+        if previous:
+            keys.add(previous)
+        refresh_attendance_days(attendance.tenant_id, keys)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self._refresh_days(serializer.instance)
+
+    def perform_update(self, serializer):
+        previous = (serializer.instance.employee_id, serializer.instance.date)
+        super().perform_update(serializer)
+        self._refresh_days(serializer.instance, previous)
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        self._refresh_days(instance)
+
+class AttendanceDayViewSet(TenantFilterMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Daily attendance totals per employee, maintained from the attendance
+    sessions. Filter with ?employee, ?status, ?date_from and ?date_to.
+    """
+    queryset = AttendanceDay.objects.all()
+    serializer_class = AttendanceDaySerializer
+    pagination_class = KeysetPagination
+    filterset_fields = ['employee', 'date', 'status']
+    page_size = 200
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for name, lookup in (('date_from', 'date__gte'), ('date_to', 'date__lte')):
+            raw = self.request.query_params.get(name)
+            if raw:
+                try:
+                    day = parse_date(raw)
+                except ValueError:
+                    day = None
+                if day is None:
+                    raise ValidationError({'error': f'{name} must be a date (YYYY-MM-DD)'})
+                queryset = queryset.filter(**{lookup: day})
+        return queryset
+
+class ClockEventViewSet(TenantFilterMixin, viewsets.ReadOnlyModelViewSet):
+    """Raw kiosk punches and the attendance session each one opened or closed"""
+    queryset = ClockEvent.objects.all()
+    serializer_class = ClockEventSerializer
+    pagination_class = KeysetPagination
+    filterset_fields = ['employee', 'device', 'kind']
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Punches buffered by a kiosk:
+        {"device": "...", "punches": [{"employee": "<id or employee number>",
+        "timestamp": "<ISO 8601>", "kind": "auto|in|out"}, ...]}
+        Returns {"results": [...]}, one per punch in the order sent.
+        """
+        punches = request.data.get('punches')
+        if not isinstance(punches, list):
+            return Response({'error': 'punches must be a list'}, status=400)
+        try:
+            results = ingest_clock_events(get_current_tenant(), punches, device=str(request.data.get('device') or ''))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response({'results': results})
 
 class LeaveRequestViewSet(TenantAwareViewSet):
     queryset = LeaveRequest.objects.all()
@@ -186,6 +285,7 @@ class LeaveRequestViewSet(TenantAwareViewSet):
 class ShiftViewSet(TenantAwareViewSet):
     queryset = Shift.objects.all()
     serializer_class = ShiftSerializer
+    pagination_class = LookupPagination
 
 class ShiftAssignmentViewSet(TenantAwareViewSet):
     queryset = ShiftAssignment.objects.all()
@@ -210,3 +310,29 @@ class PayrollSlipViewSet(TenantAwareViewSet):
         slip.payment_method = request.data.get('payment_method', 'bank_transfer')
         slip.save()
         return Response(PayrollSlipSerializer(slip).data)
+
+class PayrollRunViewSet(TenantAwareViewSet):
+    """
+    Payroll for the whole tenant, or one branch, over a period. Creating a
+    run queues it for a background worker; poll it for status and progress
+    (processed / total). Large runs are better started with `manage.py run_payroll`.
+    """
+    queryset = PayrollRun.objects.all()
+    serializer_class = PayrollRunSerializer
+    filterset_fields = ['status', 'branch']
+    http_method_names = ['get', 'post', 'head', 'options']
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        enqueue_payroll_run(serializer.instance.id)
+
+    @action(detail=True, methods=['post'])
+    def resume(self, request, pk=None):
+        run = self.get_object()
+        try:
+            requeue_run(run)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        enqueue_payroll_run(run.id)
+        run.refresh_from_db()
+        return Response(PayrollRunSerializer(run).data)
@@ -0,0 +1,75 @@
+import threading
+import time
+import uuid
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import connection
+from apps.tenants.models import Tenant, Branch
+from apps.inventory.models import Product, BranchStock
+from apps.inventory.stock import apply_stock_deltas
+
+class Command(BaseCommand):
+    help = (
+        "Hammer one BranchStock row from many threads and check that no update is lost. "
+        "Creates a throwaway tenant and deletes it afterwards. Run against PostgreSQL; "
+        "SQLite serialises writers and will report 'database is locked'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=50)
+        parser.add_argument('--iterations', type=int, default=100, help='Decrements per writer')
+        parser.add_argument('--naive', action='store_true', help='Use read-modify-save() instead of the stock service, for comparison')
+
+    def handle(self, *args, **options):
+        writers = options['writers']
+        iterations = options['iterations']
+        start_qty = Decimal(writers * iterations * 2)
+
+        tenant = Tenant.objects.create(name='Stock benchmark', subdomain=f'stock-bench-{uuid.uuid4().hex[:8]}')
+        try:
+            branch = Branch.objects.create(tenant=tenant, name='Bench', code='BENCH', address='', phone='')
+            product = Product.objects.create(tenant=tenant, name='Bench item', sku='BENCH', price=1, cost_price=1)
+            stock = BranchStock.objects.create(tenant=tenant, branch=branch, product=product, quantity=start_qty)
+
+            errors = []
+            barrier = threading.Barrier(writers)
+
+            def writer():
+                try:
+                    barrier.wait()
+                    for _ in range(iterations):
+                        if options['naive']:
+                            row = BranchStock.objects.get(id=stock.id)
+                            row.quantity -= 1
+                            row.save()
+                        else:
+                            apply_stock_deltas(tenant.id, {(branch.id, product.id): -1})
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    connection.close()
+
+            threads = [threading.Thread(target=writer) for _ in range(writers)]
+            started = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - started
+
+            stock.refresh_from_db()
+            expected = start_qty - writers * iterations
+            lost = stock.quantity - expected
+            updates = writers * iterations
+
+            self.stdout.write(f"writers={writers} updates={updates} elapsed={elapsed:.2f}s ({updates / elapsed:.0f} updates/s)")
+            self.stdout.write(f"expected quantity={expected} actual={stock.quantity} lost updates={lost}")
+            for e in errors[:5]:
+                self.stderr.write(f"writer error: {e}")
+
+            if lost or errors:
+                self.stdout.write(self.style.ERROR('FAILED'))
+            else:
+                self.stdout.write(self.style.SUCCESS('OK: no lost updates'))
+        finally:
+            tenant.delete()
@@ -22,8 +22,14 @@ class Product(TenantAwareModel):
     batch_number = models.CharField(max_length=100, blank=True) # Manufacturing/Pharmacy
     service_duration = models.IntegerField(null=True, blank=True) # Service Industry (minutes)
     
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         unique_together = ('tenant', 'sku')
+        indexes = TenantAwareModel.Meta.indexes + [
+            # Barcode scans at the till
+            models.Index(fields=['tenant', 'barcode'], condition=models.Q(is_deleted=False), name='product_barcode_live'),
+            # Catalog delta sync (updated_at > cursor)
+            models.Index(fields=['tenant', 'updated_at'], name='product_tenant_updated'),
+        ]
 
     def __str__(self):
         return self.name
@@ -34,8 +40,13 @@ class BranchStock(TenantAwareModel):
     quantity = models.DecimalField(max_digits=12, decimal_places=3, default=0)
     reorder_point = models.DecimalField(max_digits=12, decimal_places=3, default=10)
     
-    class Meta:
+    class Meta(TenantAwareModel.Meta):
         unique_together = ('branch', 'product')
+        indexes = TenantAwareModel.Meta.indexes + [
+            models.Index(fields=['tenant', 'branch', 'product'], condition=models.Q(is_deleted=False), name='branchstock_lookup_live'),
+            # Catalog delta sync for one branch
+            models.Index(fields=['branch', 'updated_at'], name='branchstock_branch_updated'),
+        ]
 
 class StockTransfer(TenantAwareModel):
     STATUS_CHOICES = (
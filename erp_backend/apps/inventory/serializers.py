@@ -18,3 +18,38 @@ class BranchStockSerializer(TenantAwareSerializer):
     class Meta:
         model = BranchStock
         fields = '__all__'
+        # Changed only through the adjust action and stock transfers, see apps.inventory.stock
+        read_only_fields = ['quantity']
+
+class TransferItemSerializer(serializers.ModelSerializer):
+    product_name = serializers.ReadOnlyField(source='product.name')
+    class Meta:
+        model = TransferItem
+        fields = ['id', 'product', 'product_name', 'quantity']
+
+    def validate_quantity(self, quantity):
+        if quantity <= 0:
+            raise serializers.ValidationError('Quantity must be positive')
+        return quantity
+
+class StockTransferSerializer(TenantAwareSerializer):
+    items = TransferItemSerializer(many=True)
+    class Meta:
+        model = StockTransfer
+        fields = '__all__'
+        # Moves stock only through the complete action
+        read_only_fields = ['status']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None:
+            fields['items'].read_only = True
+        return fields
+
+    def create(self, validated_data):
+        items = validated_data.pop('items')
+        transfer = super().create(validated_data)
+        TransferItem.objects.bulk_create([
+            TransferItem(tenant_id=transfer.tenant_id, transfer=transfer, **item) for item in items
+        ])
+        return transfer
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent after a stock mutation commits.
+# kwargs: tenant_id, branch_ids (set of branch ids whose stock changed)
+stock_changed = Signal()
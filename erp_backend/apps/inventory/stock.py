@@ -0,0 +1,126 @@
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import BranchStock, StockTransfer
+from .signals import stock_changed
+
+# Transfers whose stock has not moved yet
+OPEN_TRANSFER_STATUSES = ('pending', 'shipped')
+
+class InsufficientStock(ValueError):
+    pass
+
+def _lock_order(key):
+    branch_id, product_id = key
+    return (str(branch_id), str(product_id))
+
+def _create_stock_row(tenant_id, branch_id, product_id, quantity):
+    """Insert a missing BranchStock row; False if another writer created it first"""
+    try:
+        with transaction.atomic():
+            BranchStock.objects.create(
+                tenant_id=tenant_id,
+                branch_id=branch_id,
+                product_id=product_id,
+                quantity=quantity
+            )
+        return True
+    except IntegrityError:
+        return False
+
+def apply_stock_deltas(tenant_id, deltas, allow_negative=True, create_missing=False):
+    """
+    Central entry point for every BranchStock quantity change.
+
+    deltas: {(branch_id, product_id): change}, negative to take stock out.
+
+    Each change is a single `UPDATE ... SET quantity = quantity + change`, so
+    concurrent writers never overwrite each other and only quantity and
+    updated_at are written. Rows are updated in a fixed (branch, product)
+    order so two transactions touching the same rows cannot deadlock.
+
+    allow_negative: when False, a change that would take the quantity below
+        zero (or hits a missing row) raises InsufficientStock and the whole
+        call is rolled back. The check is part of the UPDATE itself.
+    create_missing: create the BranchStock row for incoming stock when the
+        branch does not stock the product yet. Otherwise missing rows are
+        skipped, as POS sales always have been.
+    """
+    deltas = {key: Decimal(str(change)) for key, change in deltas.items() if change}
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        now = timezone.now()
+        for branch_id, product_id in sorted(deltas, key=_lock_order):
+            change = deltas[(branch_id, product_id)]
+            rows = BranchStock.objects.filter(
+                tenant_id=tenant_id,
+                branch_id=branch_id,
+                product_id=product_id,
+                is_deleted=False
+            )
+            if change < 0 and not allow_negative:
+                rows = rows.filter(quantity__gte=-change)
+
+            if rows.update(quantity=F('quantity') + change, updated_at=now):
+                continue
+            if create_missing and change > 0:
+                if _create_stock_row(tenant_id, branch_id, product_id, change):
+                    continue
+                # Lost the race to create it, the row exists now
+                rows.update(quantity=F('quantity') + change, updated_at=now)
+                continue
+            if not allow_negative:
+                raise InsufficientStock(f"Insufficient stock for product {product_id} at branch {branch_id}")
+
+        branch_ids = {branch_id for branch_id, product_id in deltas}
+        transaction.on_commit(
+            lambda: stock_changed.send(sender=BranchStock, tenant_id=tenant_id, branch_ids=branch_ids)
+        )
+
+def deduct_sale_items(tenant_id, branch_id, items):
+    """
+    Take sold quantities out of a branch.
+    items: iterable of (product_id, quantity). Quantities of the same product
+    are summed so each row is updated once.
+    """
+    deltas = {}
+    for product_id, quantity in items:
+        key = (branch_id, product_id)
+        deltas[key] = deltas.get(key, Decimal(0)) - Decimal(str(quantity))
+    apply_stock_deltas(tenant_id, deltas)
+
+def adjust_stock(tenant_id, branch_id, product_id, change):
+    """Manual stock adjustment (count corrections, write-offs, receipts)"""
+    apply_stock_deltas(
+        tenant_id,
+        {(branch_id, product_id): change},
+        allow_negative=False,
+        create_missing=True
+    )
+
+def complete_transfer(transfer):
+    """
+    Move a transfer's items from the source to the destination branch.
+    Raises ValueError unless the transfer is pending or shipped, and
+    InsufficientStock if the source branch is short.
+    """
+    with transaction.atomic():
+        # Locked, so a transfer completed twice at once moves its stock only once
+        transfer = StockTransfer.objects.select_for_update().get(pk=transfer.pk)
+        if transfer.status not in OPEN_TRANSFER_STATUSES:
+            raise ValueError(f"Transfer is {transfer.status}, only pending or shipped transfers can be completed")
+
+        deltas = {}
+        for item in transfer.items.filter(is_deleted=False):
+            out_key = (transfer.source_branch_id, item.product_id)
+            in_key = (transfer.destination_branch_id, item.product_id)
+            deltas[out_key] = deltas.get(out_key, Decimal(0)) - item.quantity
+            deltas[in_key] = deltas.get(in_key, Decimal(0)) + item.quantity
+
+        apply_stock_deltas(transfer.tenant_id, deltas, allow_negative=False, create_missing=True)
+        transfer.status = 'completed'
+        transfer.save(update_fields=['status', 'updated_at'])
+    return transfer
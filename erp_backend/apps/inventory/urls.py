@@ -1,11 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CategoryViewSet, ProductViewSet, BranchStockViewSet
+from .views import CategoryViewSet, ProductViewSet, BranchStockViewSet, StockTransferViewSet
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet)
 router.register(r'products', ProductViewSet)
 router.register(r'stock', BranchStockViewSet)
+router.register(r'transfers', StockTransferViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,10 +1,16 @@
+from decimal import Decimal, InvalidOperation
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from apps.core.pagination import LookupPagination
 from apps.core.views import TenantAwareViewSet
-from .models import Category, Product, BranchStock
-from .serializers import CategorySerializer, ProductSerializer, BranchStockSerializer
+from .models import Category, Product, BranchStock, StockTransfer
+from .serializers import CategorySerializer, ProductSerializer, BranchStockSerializer, StockTransferSerializer
+from .stock import InsufficientStock, adjust_stock, complete_transfer
 
 class CategoryViewSet(TenantAwareViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    pagination_class = LookupPagination
 
 class ProductViewSet(TenantAwareViewSet):
     queryset = Product.objects.all()
@@ -14,3 +20,37 @@ class BranchStockViewSet(TenantAwareViewSet):
     queryset = BranchStock.objects.all()
     serializer_class = BranchStockSerializer
     filterset_fields = ['branch']
+
+    @action(detail=True, methods=['post'])
+    def adjust(self, request, pk=None):
+        """Add (positive) or remove (negative) stock without overwriting concurrent changes"""
+        stock = self.get_object()
+        try:
+            change = Decimal(str(request.data['change']))
+        except (KeyError, InvalidOperation):
+            return Response({'error': 'A numeric change is required'}, status=400)
+        if not change.is_finite() or not change:
+            return Response({'error': 'The change must be a non-zero number'}, status=400)
+
+        try:
+            adjust_stock(stock.tenant_id, stock.branch_id, stock.product_id, change)
+        except InsufficientStock as e:
+            return Response({'error': str(e)}, status=400)
+
+        stock.refresh_from_db()
+        return Response(BranchStockSerializer(stock).data)
+
+class StockTransferViewSet(TenantAwareViewSet):
+    """Transfers between branches; stock moves when one is completed"""
+    queryset = StockTransfer.objects.prefetch_related('items__product')
+    serializer_class = StockTransferSerializer
+    filterset_fields = ['status', 'source_branch', 'destination_branch']
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """Take the items out of the source branch and into the destination branch"""
+        try:
+            transfer = complete_transfer(self.get_object())
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response(self.get_serializer(transfer).data)
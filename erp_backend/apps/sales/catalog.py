@@ -0,0 +1,188 @@
+import base64
+import binascii
+import json
+from datetime import timedelta
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, DecimalField, F, FilteredRelation, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from apps.inventory.models import Product
+
+# Rows fetched per round-trip when streaming the catalog
+CATALOG_CHUNK_SIZE = 2000
+
+# Cursors are moved back by this much so rows written by transactions that
+# were still in flight when the cursor was issued are picked up next time.
+# Re-sending a product is harmless, terminals upsert by id.
+CURSOR_OVERLAP = timedelta(seconds=5)
+
+CATALOG_FIELDS = (
+    'id', 'sku', 'name', 'description', 'cost_price', 'price',
+    'barcode', 'created_at', 'updated_at',
+)
+
+def encode_cursor(moment):
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode()
+
+def decode_cursor(cursor):
+    """Turn a cursor issued by new_cursor() back into a datetime"""
+    try:
+        moment = parse_datetime(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        moment = None
+    if moment is None:
+        raise ValueError('Invalid catalog cursor')
+    return moment
+
+def cursor_start():
+    """Point in time a sync starting now can safely resume from"""
+    return timezone.now() - CURSOR_OVERLAP
+
+def new_cursor():
+    """Cursor for a sync that starts now"""
+    return encode_cursor(cursor_start())
+
+def _catalog_values(products, branch_id, *extra, **extra_expressions):
+    """
+    LEFT JOIN products to this branch's BranchStock row and to their category.
+    Soft-deleted stock rows are still joined (so their changes are visible to
+    delta syncs) but report no stock.
+    """
+    zero = Value(0, output_field=DecimalField(max_digits=12, decimal_places=3))
+    if branch_id:
+        products = products.annotate(
+            branch_row=FilteredRelation('branch_stock', condition=Q(branch_stock__branch_id=branch_id)),
+            stock_quantity=Coalesce(
+                Case(When(branch_row__is_deleted=False, then=F('branch_row__quantity'))),
+                zero,
+            ),
+        )
+    else:
+        products = products.annotate(stock_quantity=zero)
+
+    return products.values(
+        *CATALOG_FIELDS,
+        'stock_quantity',
+        *extra,
+        category_name=F('category__name'),
+        **extra_expressions,
+    ).order_by('sku')
+
+def catalog_queryset(tenant_id, branch_id=None):
+    """
+    Whole POS catalog for a branch as a single query, so the cost does not
+    grow with the number of products.
+    """
+    products = Product.objects.filter(tenant_id=tenant_id, is_deleted=False)
+    return _catalog_values(products, branch_id)
+
+def catalog_delta_queryset(tenant_id, branch_id, since):
+    """
+    Products whose own row, category or branch stock row changed after `since`.
+    Soft-deleted products are included so they can be sent as tombstones.
+    """
+    changed = Q(updated_at__gt=since) | Q(category__updated_at__gt=since)
+    products = Product.objects.filter(tenant_id=tenant_id)
+    if branch_id:
+        # The FilteredRelation alias only exists once annotated
+        qs = _catalog_values(products, branch_id, 'is_deleted')
+        return qs.filter(changed | Q(branch_row__updated_at__gt=since))
+    return _catalog_values(products.filter(changed), branch_id, 'is_deleted')
+
+def serialize_catalog_row(row):
+    """Shape a catalog row into the POS product format"""
+    stock_qty = float(row['stock_quantity'] or 0)
+    return {
+        'id': row['id'],
+        'uuid': str(row['id']),
+        'sku': row['sku'],
+        'name': row['name'],
+        'description': row['description'],
+        'cost_price': float(row['cost_price']),
+        'selling_price': float(row['price']),
+        'category': row['category_name'] or '',
+        'stock_quantity': stock_qty,
+        'barcodes': [row['barcode']] if row['barcode'] else [],
+        'available_at_branch': stock_qty > 0,
+        'created_at': row['created_at'].isoformat(),
+        'updated_at': row['updated_at'].isoformat()
+    }
+
+def _dumps(value):
+    return json.dumps(value, cls=DjangoJSONEncoder)
+
+def iter_catalog_json(rows):
+    """Encode catalog rows as a JSON array, one product at a time"""
+    yield '['
+    first = True
+    for row in rows:
+        if not first:
+            yield ','
+        first = False
+        yield _dumps(serialize_catalog_row(row))
+    yield ']'
+
+def iter_catalog_delta_json(rows, cursor):
+    """
+    Encode a delta sync:
+    {"cursor": ..., "products": [changed products], "deleted": [product ids]}
+    """
+    yield '{"cursor": %s, "products": [' % _dumps(cursor)
+    deleted = []
+    first = True
+    for row in rows:
+        if row['is_deleted']:
+            deleted.append(str(row['id']))
+            continue
+        if not first:
+            yield ','
+        first = False
+        yield _dumps(serialize_catalog_row(row))
+    yield '], "deleted": %s}' % _dumps(deleted)
+
+async def _aiter_chunks(chunks):
+    """
+    Async iterator over a sync one, pulling CATALOG_CHUNK_SIZE pieces per
+    thread hop. The hops run on the thread that ran the view, which owns the
+    database cursor the rows come from.
+    """
+    next_batch = sync_to_async(lambda: list(islice(chunks, CATALOG_CHUNK_SIZE)), thread_sensitive=True)
+    while True:
+        batch = await next_batch()
+        if not batch:
+            return
+        yield ''.join(batch)
+
+def _streaming_response(chunks, cursor, asynchronous):
+    """
+    Under ASGI Django reads a sync iterator completely into memory before
+    sending it, so an ASGI request (asynchronous=True) gets an async one.
+    WSGI servers need the sync iterator.
+    """
+    if asynchronous:
+        chunks = _aiter_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type='application/json')
+    response['X-Catalog-Cursor'] = cursor
+    return response
+
+def stream_catalog(tenant_id, branch_id=None, asynchronous=False):
+    """
+    Streaming response for the branch catalog.
+    Rows are read in chunks from the database and written out as they are
+    encoded, so the full product list is never held in memory.
+    The X-Catalog-Cursor header is the `since` value for the next delta sync.
+    """
+    cursor = new_cursor()
+    rows = catalog_queryset(tenant_id, branch_id).iterator(chunk_size=CATALOG_CHUNK_SIZE)
+    return _streaming_response(iter_catalog_json(rows), cursor, asynchronous)
+
+def stream_catalog_delta(tenant_id, branch_id, since, asynchronous=False):
+    """Streaming response with only the catalog changes after the `since` cursor"""
+    cursor = new_cursor()
+    rows = catalog_delta_queryset(tenant_id, branch_id, decode_cursor(since))
+    rows = rows.iterator(chunk_size=CATALOG_CHUNK_SIZE)
+    return _streaming_response(iter_catalog_delta_json(rows, cursor), cursor, asynchronous)
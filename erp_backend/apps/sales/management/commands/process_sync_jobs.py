@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.sales.sync_jobs import process_queued_jobs
+
+class Command(BaseCommand):
+    help = "Process queued POS sync jobs, including ones left behind by a restarted web worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new jobs')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            count = process_queued_jobs()
+            if count:
+                self.stdout.write(f"Processed {count} sync job(s)")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -47,6 +47,12 @@ class Invoice(TenantAwareModel):
     )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
 
+    class Meta(TenantAwareModel.Meta):
+        indexes = TenantAwareModel.Meta.indexes + [
+            # Aged receivables: invoices still owed, by due date
+            models.Index(fields=['tenant', 'due_date'], condition=models.Q(is_deleted=False, status__in=['sent', 'overdue']), name='invoice_open_due'),
+        ]
+
 class InvoiceItem(TenantAwareModel):
     invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey('inventory.Product', on_delete=models.CASCADE)
@@ -123,6 +129,12 @@ class Sale(TenantAwareModel):
     )
     payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS, default='paid')
 
+    class Meta(TenantAwareModel.Meta):
+        indexes = TenantAwareModel.Meta.indexes + [
+            # Branch sales lists and daily reports
+            models.Index(fields=['tenant', 'branch', 'created_at'], condition=models.Q(is_deleted=False), name='sale_branch_created_live'),
+        ]
+
 class SaleItem(TenantAwareModel):
     sale = models.ForeignKey(Sale, on_delete=models.CASCADE, related_name='sale_items')
     product = models.ForeignKey('inventory.Product', on_delete=models.CASCADE)
@@ -143,3 +155,50 @@ class POSDevice(TenantAwareModel):
     token = models.CharField(max_length=255, unique=True)
     last_sync = models.DateTimeField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
+
+class CatalogSnapshot(TenantAwareModel):
+    """
+    Prebuilt, gzip-compressed POS catalog for one branch.
+    `etag` is the SHA-256 of the uncompressed JSON, so identical catalogs share
+    an ETag; `version` only moves when the content changes. Product, Category
+    and BranchStock changes flag the snapshot as stale and the next request
+    applies the changes since `cursor` on top of the previous payload.
+    """
+    branch = models.ForeignKey('tenants.Branch', on_delete=models.CASCADE, related_name='catalog_snapshots')
+    version = models.PositiveIntegerField(default=0)
+    etag = models.CharField(max_length=64, blank=True)
+    payload = models.BinaryField(null=True, blank=True)
+    product_count = models.IntegerField(default=0)
+    cursor = models.DateTimeField(null=True, blank=True)
+    is_stale = models.BooleanField(default=True)
+
+    class Meta(TenantAwareModel.Meta):
+        unique_together = ('tenant', 'branch')
+
+class SyncJob(TenantAwareModel):
+    """
+    A pos/sync/ upload, stored as received and processed in the background.
+    The table doubles as the work queue: workers claim a job by moving it
+    from queued to running.
+    """
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    payload = models.JSONField(default=list)  # Raw sales as sent by the terminal
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    results = models.JSONField(default=list)  # Per-sale outcomes, see pos_sync.sync_sales_batch
+    error = models.TextField(blank=True)
+    attempts = models.IntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta(TenantAwareModel.Meta):
+        indexes = TenantAwareModel.Meta.indexes + [
+            # Worker queue scans (queued jobs, stalled running jobs)
+            models.Index(fields=['status', 'created_at'], name='syncjob_status_created'),
+        ]
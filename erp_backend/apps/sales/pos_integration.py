@@ -1,61 +1,78 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from apps.inventory.models import Product, BranchStock
+from apps.inventory.models import BranchStock
 from apps.users.models import User
 from apps.hr.models import ShiftAssignment, Employee
+from apps.tenants.cache import get_cached_tenant
+from apps.core.async_views import async_api_view
+from .catalog import encode_cursor, stream_catalog, stream_catalog_delta
+from .snapshots import get_catalog_snapshot
 from datetime import datetime, date
+import gzip
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse
 
 @api_view(['GET'])
 def pos_get_products(request):
     """
     Get products for POS from CENTRALIZED inventory
-    Returns products with stock levels for the specified branch
+    Returns products with stock levels for the specified branch.
+    With ?since=<cursor> only products changed after the cursor are returned,
+    plus the ids of deleted products, and a new cursor for the next sync.
+    Served under ASGI, the catalog is streamed with an async iterator.
     """
     tenant_id = request.headers.get('X-Tenant-ID')
     branch_id = request.query_params.get('branch_id')
+    since = request.query_params.get('since')
+    asynchronous = isinstance(request._request, ASGIRequest)
     
     if not branch_id:
         return Response({'error': 'branch_id is required'}, status=400)
     
-    # Get products from centralized inventory
-    products = Product.objects.filter(tenant_id=tenant_id, is_deleted=False)
-    
-    result = []
-    for product in products:
-        # Get stock for THIS specific branch
-        stock_qty = 0
+    if since:
         try:
-            stock = BranchStock.objects.get(
-                tenant_id=tenant_id,
-                branch_id=branch_id,
-                product=product
-            )
-            stock_qty = float(stock.quantity)
-        except BranchStock.DoesNotExist:
-            # Product exists centrally but not stocked at this branch
-            stock_qty = 0
-        
-        result.append({
-            'id': product.id,
-            'uuid': str(product.id),
-            'sku': product.sku,
-            'name': product.name,
-            'description': product.description,
-            'cost_price': float(product.cost_price),
-            'selling_price': float(product.price),
-            'category': product.category.name if product.category else '',
-            'stock_quantity': stock_qty,
-            'barcodes': [product.barcode] if product.barcode else [],
-            'available_at_branch': stock_qty > 0,
-            'created_at': product.created_at.isoformat(),
-            'updated_at': product.updated_at.isoformat()
-        })
+            return stream_catalog_delta(tenant_id, branch_id, since, asynchronous=asynchronous)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
     
-    return Response(result)
+    # Get products from centralized inventory, stocked for THIS branch
+    return stream_catalog(tenant_id, branch_id, asynchronous=asynchronous)
 
 @api_view(['GET'])
-def pos_get_staff(request):
+def pos_get_catalog_snapshot(request):
+    """
+    Prebuilt, gzip-compressed catalog for a branch (same format as pos/products/).
+    Supports If-None-Match: terminals that already hold the current version get
+    a 304 without the catalog being rebuilt or re-sent.
+    """
+    tenant_id = request.headers.get('X-Tenant-ID')
+    branch_id = request.query_params.get('branch_id')
+    
+    if not branch_id:
+        return Response({'error': 'branch_id is required'}, status=400)
+    
+    snapshot = get_catalog_snapshot(tenant_id, branch_id)
+    etag = f'"{snapshot.etag}"'
+    
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponse(status=304)
+    elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = HttpResponse(bytes(snapshot.payload), content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(gzip.decompress(bytes(snapshot.payload)), content_type='application/json')
+    
+    response['ETag'] = etag
+    response['Vary'] = 'Accept-Encoding'
+    response['X-Catalog-Version'] = str(snapshot.version)
+    # Resume with delta syncs (pos/products/?since=) from the snapshot
+    response['X-Catalog-Cursor'] = encode_cursor(snapshot.cursor)
+    return response
+
+@async_api_view(['GET'])
+async def pos_get_staff(request):
     """
     Get staff for POS with HR shift integration
     Only returns staff scheduled for current shift if HR module is active
@@ -64,8 +81,9 @@ def pos_get_staff(request):
     branch_id = request.query_params.get('branch_id')
     
     # Check if HR module is active
-    from apps.tenants.models import Tenant
-    tenant = Tenant.objects.get(id=tenant_id)
+    tenant = await sync_to_async(get_cached_tenant)(tenant_id)
+    if tenant is None:
+        return Response({'error': 'Tenant not found'}, status=404)
     hr_module_active = tenant.active_modules.get('hr', False)
     
     # Base query: all active users in this branch
@@ -74,10 +92,26 @@ def pos_get_staff(request):
     if branch_id:
         staff = staff.filter(branches__id=branch_id)
     
-    result = []
     today = date.today()
+    employee_users = set()
+    shifts = {}
+    if hr_module_active:
+        # Employee profiles and today's shifts for the whole staff list, one query each
+        employee_users = {
+            user_id async for user_id in Employee.objects.filter(
+                tenant_id=tenant_id, user__in=staff
+            ).values_list('user_id', flat=True)
+        }
+        async for assignment in ShiftAssignment.objects.filter(
+            employee__tenant_id=tenant_id,
+            employee__user__in=staff,
+            date=today
+        ).select_related('shift', 'employee'):
+            shifts[assignment.employee.user_id] = assignment.shift
     
-    for user in staff:
+    result = []
+    
+    async for user in staff:
         staff_data = {
             'id': user.id,
             'uuid': str(user.id),
@@ -90,31 +124,19 @@ def pos_get_staff(request):
             'shift_info': None
         }
         
-        # If HR module is active, check shift schedule
-        if hr_module_active:
-            try:
-                employee = Employee.objects.get(user=user, tenant_id=tenant_id)
-                
-                # Check if employee has a shift assignment for today
-                shift_assignment = ShiftAssignment.objects.filter(
-                    employee=employee,
-                    date=today
-                ).select_related('shift').first()
-                
-                if shift_assignment:
-                    staff_data['on_shift'] = True
-                    staff_data['shift_info'] = {
-                        'shift_name': shift_assignment.shift.name,
-                        'start_time': shift_assignment.shift.start_time.strftime('%H:%M'),
-                        'end_time': shift_assignment.shift.end_time.strftime('%H:%M'),
-                    }
-                else:
-                    # No shift assigned for today
-                    staff_data['on_shift'] = False
-                    
-            except Employee.DoesNotExist:
-                # User exists but no employee profile
-                pass
+        # If HR module is active, check shift schedule.
+        # Users without an employee profile stay on shift.
+        if hr_module_active and user.id in employee_users:
+            shift = shifts.get(user.id)
+            if shift:
+                staff_data['shift_info'] = {
+                    'shift_name': shift.name,
+                    'start_time': shift.start_time.strftime('%H:%M'),
+                    'end_time': shift.end_time.strftime('%H:%M'),
+                }
+            else:
+                # No shift assigned for today
+                staff_data['on_shift'] = False
         
         result.append(staff_data)
     
@@ -138,10 +160,10 @@ def request_stock_transfer(request):
     try:
         transfer = StockTransfer.objects.create(
             tenant_id=tenant_id,
-            from_branch_id=data['from_branch_id'],
-            to_branch_id=data['to_branch_id'],
+            source_branch_id=data['from_branch_id'],
+            destination_branch_id=data['to_branch_id'],
             status='pending',
-            notes=data.get('notes', 'POS stock request')
+            remarks=data.get('notes', 'POS stock request')
         )
         
         # Add items
@@ -163,8 +185,8 @@ def request_stock_transfer(request):
     except Exception as e:
         return Response({'error': str(e)}, status=400)
 
-@api_view(['GET'])
-def check_stock_availability(request):
+@async_api_view(['GET'])
+async def check_stock_availability(request):
     """
     Check stock availability across all branches
     Helps POS know where to request transfer from
@@ -182,7 +204,7 @@ def check_stock_availability(request):
     ).select_related('branch')
     
     result = []
-    for stock in stock_levels:
+    async for stock in stock_levels:
         result.append({
             'branch_id': str(stock.branch.id),
             'branch_name': stock.branch.name,
@@ -0,0 +1,149 @@
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from django.db import IntegrityError, transaction
+from apps.inventory.models import Product
+from apps.inventory.stock import apply_stock_deltas
+from apps.tenants.models import Branch
+from apps.accounting.logic import enqueue_sale_postings
+from apps.accounting.outbox import schedule_gl_posting
+from .models import Sale, SaleItem
+
+# Rows per INSERT statement for bulk_create
+BULK_BATCH_SIZE = 500
+
+def _decimal(value, field):
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError(f'Invalid {field}: {value!r}')
+
+def _parse_sale(sale_dt):
+    """Validate one synced sale and normalise its amounts to Decimal"""
+    if not sale_dt.get('pos_transaction_id'):
+        raise ValueError('pos_transaction_id is required')
+    if not sale_dt.get('branch_id'):
+        raise ValueError('branch_id is required')
+
+    total = _decimal(sale_dt.get('total'), 'total')
+    tax = _decimal(sale_dt.get('tax_total', 0), 'tax_total')
+    items = []
+    for item_dt in sale_dt.get('items', []):
+        if not item_dt.get('product_id'):
+            raise ValueError('product_id is required for every item')
+        quantity = _decimal(item_dt.get('quantity'), 'quantity')
+        price = _decimal(item_dt.get('price'), 'price')
+        items.append({
+            'product_id': str(item_dt['product_id']),
+            'quantity': quantity,
+            'unit_price': price,
+            'line_total': quantity * price,
+        })
+
+    return {
+        'pos_transaction_id': str(sale_dt['pos_transaction_id']),
+        'receipt_number': str(sale_dt.get('receipt_number') or sale_dt['pos_transaction_id']),
+        'branch_id': str(sale_dt['branch_id']),
+        'total': total,
+        'tax': tax,
+        'subtotal': _decimal(sale_dt['subtotal'], 'subtotal') if 'subtotal' in sale_dt else total - tax,
+        'items': items,
+    }
+
+def _write_batch(tenant_id, sales_data):
+    """
+    Resolve idempotency and validity for the whole batch with a handful of
+    queries, then insert all new sales and items and apply stock in bulk.
+    Returns (results, created sales).
+    """
+    results = [None] * len(sales_data)
+    parsed = {}
+    for index, sale_dt in enumerate(sales_data):
+        try:
+            parsed[index] = _parse_sale(sale_dt)
+        except ValueError as e:
+            results[index] = {'pos_transaction_id': sale_dt.get('pos_transaction_id'), 'status': 'failed', 'error': str(e)}
+
+    pos_ids = {p['pos_transaction_id'] for p in parsed.values()}
+    receipts = {p['receipt_number'] for p in parsed.values()}
+    branch_ids = {p['branch_id'] for p in parsed.values()}
+    product_ids = {i['product_id'] for p in parsed.values() for i in p['items']}
+
+    existing = dict(Sale.objects.filter(pos_transaction_id__in=pos_ids).values_list('pos_transaction_id', 'id'))
+    used_receipts = set(Sale.objects.filter(receipt_number__in=receipts).values_list('receipt_number', flat=True))
+    valid_branches = {str(pk) for pk in Branch.objects.filter(tenant_id=tenant_id, id__in=branch_ids).values_list('id', flat=True)}
+    valid_products = {str(pk) for pk in Product.objects.filter(tenant_id=tenant_id, id__in=product_ids).values_list('id', flat=True)}
+
+    sales, items = [], []
+    deltas = defaultdict(Decimal)
+    for index, p in parsed.items():
+        pos_id = p['pos_transaction_id']
+        if pos_id in existing:
+            results[index] = {'pos_transaction_id': pos_id, 'status': 'duplicate', 'sale_id': str(existing[pos_id])}
+            continue
+        error = None
+        if p['receipt_number'] in used_receipts:
+            error = f"Receipt number {p['receipt_number']} already used"
+        elif p['branch_id'] not in valid_branches:
+            error = f"Unknown branch {p['branch_id']}"
+        else:
+            unknown = [i['product_id'] for i in p['items'] if i['product_id'] not in valid_products]
+            if unknown:
+                error = f"Unknown product {unknown[0]}"
+        if error:
+            results[index] = {'pos_transaction_id': pos_id, 'status': 'failed', 'error': error}
+            continue
+
+        sale = Sale(
+            tenant_id=tenant_id,
+            branch_id=p['branch_id'],
+            receipt_number=p['receipt_number'],
+            subtotal=p['subtotal'],
+            tax_amount=p['tax'],
+            total_amount=p['total'],
+            paid_amount=p['total'],
+            pos_transaction_id=pos_id,
+            payment_status='paid'
+        )
+        sales.append(sale)
+        for item in p['items']:
+            items.append(SaleItem(
+                tenant_id=tenant_id,
+                sale=sale,
+                product_id=item['product_id'],
+                quantity=item['quantity'],
+                unit_price=item['unit_price'],
+                line_total=item['line_total']
+            ))
+            deltas[(p['branch_id'], item['product_id'])] += item['quantity']
+
+        # Later copies of the same sale in this batch are duplicates of this one
+        existing[pos_id] = sale.id
+        used_receipts.add(p['receipt_number'])
+        results[index] = {'pos_transaction_id': pos_id, 'status': 'created', 'sale_id': str(sale.id)}
+
+    Sale.objects.bulk_create(sales, batch_size=BULK_BATCH_SIZE)
+    SaleItem.objects.bulk_create(items, batch_size=BULK_BATCH_SIZE)
+    apply_stock_deltas(tenant_id, {key: -quantity for key, quantity in deltas.items()})
+    # GL postings commit or roll back together with the sales
+    enqueue_sale_postings(sales)
+    if sales:
+        transaction.on_commit(lambda: schedule_gl_posting(tenant_id))
+
+    return results, sales
+
+def sync_sales_batch(tenant_id, sales_data):
+    """
+    Ingest a batch of offline POS sales.
+    Returns one result per submitted sale, in order:
+    {'pos_transaction_id', 'status': 'created' | 'duplicate' | 'failed', 'sale_id' or 'error'}
+    """
+    try:
+        with transaction.atomic():
+            results, sales = _write_batch(tenant_id, sales_data)
+    except IntegrityError:
+        # Another terminal synced some of these sales concurrently.
+        # Re-running resolves them as duplicates.
+        with transaction.atomic():
+            results, sales = _write_batch(tenant_id, sales_data)
+
+    return results
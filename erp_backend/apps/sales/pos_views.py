@@ -2,10 +2,8 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from .models import POSDevice, Sale, SaleItem
-from apps.inventory.models import BranchStock
-from django.db import transaction
-from apps.accounting.logic import post_sale_to_gl
+from .models import POSDevice, SyncJob
+from .sync_jobs import enqueue_sync_job
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -39,42 +37,46 @@ def register_pos(request):
 
 @api_view(['POST'])
 def sync_sales(request):
+    """
+    Queue a batch of offline POS sales for processing.
+    Returns 202 with a job id straight away; poll pos/sync/<job_id>/ for progress
+    and for each sale's outcome (created, duplicate or failed).
+    """
     sales_data = request.data.get('sales', [])
-    tenant_id = request.tenant_id # From middleware
+    tenant_id = request.headers.get('X-Tenant-ID')
     
-    with transaction.atomic():
-        for sale_dt in sales_data:
-            pos_id = sale_dt.get('pos_transaction_id')
-            if Sale.objects.filter(pos_transaction_id=pos_id).exists():
-                continue # Idempotency
-            
-            sale = Sale.objects.create(
-                tenant_id=tenant_id,
-                branch_id=sale_dt['branch_id'],
-                total_amount=sale_dt['total'],
-                tax_amount=sale_dt['tax_total'],
-                pos_transaction_id=pos_id,
-                payment_status='paid'
-            )
-            
-            for item_dt in sale_dt.get('items', []):
-                SaleItem.objects.create(
-                    sale=sale,
-                    product_id=item_dt['product_id'],
-                    quantity=item_dt['quantity'],
-                    unit_price=item_dt['price'],
-                    line_total=float(item_dt['quantity']) * float(item_dt['price'])
-                )
-                
-                # Update inventory
-                stock = BranchStock.objects.get(branch_id=sale_dt['branch_id'], product_id=item_dt['product_id'])
-                stock.quantity -= item_dt['quantity']
-                stock.save()
-            
-            # Post to General Ledger
-            try:
-                post_sale_to_gl(sale)
-            except Exception as e:
-                print(f"GL Posting failed for synced sale: {str(e)}")
-                
-    return Response({'status': 'sync_completed'})
+    if not isinstance(sales_data, list):
+        return Response({'error': 'sales must be a list'}, status=400)
+    
+    job = enqueue_sync_job(tenant_id, sales_data)
+    
+    return Response({
+        'job_id': str(job.id),
+        'status': job.status,
+        'total': job.total,
+    }, status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+def sync_job_status(request, job_id):
+    """Progress and per-sale outcomes of a queued sync"""
+    tenant_id = request.headers.get('X-Tenant-ID')
+    
+    try:
+        job = SyncJob.objects.get(id=job_id, tenant_id=tenant_id)
+    except SyncJob.DoesNotExist:
+        return Response({'error': 'Sync job not found'}, status=404)
+    
+    results = job.results or []
+    return Response({
+        'job_id': str(job.id),
+        'status': job.status,
+        'total': job.total,
+        'processed': job.processed,
+        'created': sum(1 for r in results if r['status'] == 'created'),
+        'duplicates': sum(1 for r in results if r['status'] == 'duplicate'),
+        'failed': sum(1 for r in results if r['status'] == 'failed'),
+        'results': results,
+        'error': job.error,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    })
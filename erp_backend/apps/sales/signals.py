@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.inventory.models import BranchStock, Category, Product
+from apps.inventory.signals import stock_changed
+from .snapshots import mark_catalog_stale
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_tenant_catalogs(sender, instance, **kwargs):
+    # Product and category rows are shared by every branch of the tenant
+    mark_catalog_stale(instance.tenant_id)
+
+@receiver([post_save, post_delete], sender=BranchStock)
+def invalidate_branch_catalog(sender, instance, **kwargs):
+    mark_catalog_stale(instance.tenant_id, instance.branch_id)
+
+@receiver(stock_changed)
+def invalidate_stock_catalogs(sender, tenant_id, branch_ids, **kwargs):
+    # Quantity updates from apps.inventory.stock bypass save() and post_save
+    for branch_id in branch_ids:
+        mark_catalog_stale(tenant_id, branch_id)
@@ -0,0 +1,74 @@
+import gzip
+import hashlib
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from .catalog import CATALOG_CHUNK_SIZE, catalog_delta_queryset, catalog_queryset, cursor_start, serialize_catalog_row
+from .models import CatalogSnapshot
+
+def mark_catalog_stale(tenant_id, branch_id=None):
+    """Flag a tenant's snapshots (or one branch's) for rebuild on next request"""
+    snapshots = CatalogSnapshot.objects.filter(tenant_id=tenant_id, is_stale=False)
+    if branch_id:
+        snapshots = snapshots.filter(branch_id=branch_id)
+    snapshots.update(is_stale=True)
+
+def _load_products(snapshot):
+    """Previous payload as {product uuid: product}"""
+    products = json.loads(gzip.decompress(bytes(snapshot.payload)))
+    return {p['uuid']: p for p in products}
+
+def _collect_products(snapshot):
+    """
+    Catalog content for a rebuild. A snapshot that was built before only has
+    the changes since its cursor applied; a new one reads the whole catalog.
+    """
+    if snapshot.payload is None or snapshot.cursor is None:
+        rows = catalog_queryset(snapshot.tenant_id, snapshot.branch_id)
+        return {str(row['id']): serialize_catalog_row(row) for row in rows.iterator(chunk_size=CATALOG_CHUNK_SIZE)}
+
+    products = _load_products(snapshot)
+    rows = catalog_delta_queryset(snapshot.tenant_id, snapshot.branch_id, snapshot.cursor)
+    for row in rows.iterator(chunk_size=CATALOG_CHUNK_SIZE):
+        if row['is_deleted']:
+            products.pop(str(row['id']), None)
+        else:
+            products[str(row['id'])] = serialize_catalog_row(row)
+    return products
+
+def rebuild_snapshot(snapshot):
+    """Bring a (locked) snapshot up to date with the live catalog"""
+    cursor = cursor_start()
+    products = sorted(_collect_products(snapshot).values(), key=lambda p: p['sku'])
+
+    raw = json.dumps(products, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+    etag = hashlib.sha256(raw).hexdigest()
+    if etag != snapshot.etag or snapshot.payload is None:
+        # mtime=0 keeps the compressed bytes identical for identical content
+        snapshot.payload = gzip.compress(raw, mtime=0)
+        snapshot.etag = etag
+        snapshot.version += 1
+        snapshot.product_count = len(products)
+    snapshot.cursor = cursor
+    snapshot.is_stale = False
+    snapshot.save()
+    return snapshot
+
+def get_catalog_snapshot(tenant_id, branch_id):
+    """
+    Current snapshot for a branch, rebuilding it first if it is stale.
+    Only one request rebuilds: the others wait on the row lock and then find
+    the snapshot already fresh.
+    """
+    snapshot = CatalogSnapshot.objects.filter(tenant_id=tenant_id, branch_id=branch_id).first()
+    if snapshot and not snapshot.is_stale:
+        return snapshot
+
+    with transaction.atomic():
+        snapshot, created = CatalogSnapshot.objects.select_for_update().get_or_create(
+            tenant_id=tenant_id,
+            branch_id=branch_id
+        )
+        if snapshot.is_stale:
+            rebuild_snapshot(snapshot)
+    return snapshot
@@ -0,0 +1,108 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from threading import Lock
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from apps.core.models import tenant_context
+from .models import SyncJob
+from .pos_sync import sync_sales_batch
+
+logger = logging.getLogger(__name__)
+
+# Sales processed (and progress saved) per step of a job
+SYNC_JOB_CHUNK_SIZE = 200
+
+# A running job that saved no progress for this long is assumed to belong to a dead worker
+SYNC_JOB_TIMEOUT = timedelta(minutes=30)
+
+_executor = None
+_executor_lock = Lock()
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'POS_SYNC_WORKERS', 4),
+                thread_name_prefix='pos-sync'
+            )
+        return _executor
+
+def _submit(job_id):
+    _get_executor().submit(_run_in_worker, job_id)
+
+def enqueue_sync_job(tenant_id, sales_data):
+    """Persist an uploaded batch and hand it to the worker pool once committed"""
+    job = SyncJob.objects.create(
+        tenant_id=tenant_id,
+        payload=sales_data,
+        total=len(sales_data)
+    )
+    transaction.on_commit(lambda: _submit(job.id))
+    return job
+
+def claim_job(job_id):
+    """Move a queued job to running. False if another worker got there first."""
+    now = timezone.now()
+    return SyncJob.objects.filter(id=job_id, status='queued').update(
+        status='running',
+        started_at=now,
+        updated_at=now,
+        attempts=F('attempts') + 1
+    ) == 1
+
+def run_sync_job(job_id):
+    """
+    Process a claimed job in chunks, saving progress after each one.
+    Re-running a job from the start is safe: sales that were already written
+    come back as duplicates.
+    """
+    if not claim_job(job_id):
+        return
+
+    job = SyncJob.objects.get(id=job_id)
+    results = []
+    try:
+        with tenant_context(job.tenant_id):
+            for start in range(0, len(job.payload), SYNC_JOB_CHUNK_SIZE):
+                results.extend(sync_sales_batch(job.tenant_id, job.payload[start:start + SYNC_JOB_CHUNK_SIZE]))
+                SyncJob.objects.filter(id=job_id).update(
+                    processed=len(results),
+                    results=results,
+                    updated_at=timezone.now()
+                )
+    except Exception as e:
+        logger.exception('POS sync job %s failed', job_id)
+        SyncJob.objects.filter(id=job_id).update(status='failed', error=str(e), finished_at=timezone.now())
+        return
+
+    SyncJob.objects.filter(id=job_id).update(status='completed', finished_at=timezone.now())
+
+def _run_in_worker(job_id):
+    close_old_connections()
+    try:
+        run_sync_job(job_id)
+    finally:
+        close_old_connections()
+
+def requeue_stalled_jobs():
+    """
+    Put jobs abandoned by a dead worker back in the queue. updated_at is the
+    heartbeat: it moves with every chunk, so long jobs still making progress
+    are left alone.
+    """
+    return SyncJob.objects.filter(
+        status='running',
+        updated_at__lt=timezone.now() - SYNC_JOB_TIMEOUT
+    ).update(status='queued')
+
+def process_queued_jobs():
+    """Run every queued job in the current thread. Returns how many were run."""
+    requeue_stalled_jobs()
+    job_ids = list(SyncJob.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True))
+    for job_id in job_ids:
+        run_sync_job(job_id)
+    return len(job_ids)
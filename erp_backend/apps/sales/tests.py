@@ -0,0 +1,50 @@
+from decimal import Decimal
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.inventory.models import BranchStock, Category, Product
+from apps.tenants.models import Branch, Tenant
+from apps.users.models import User
+
+class PosProductsQueryCountTest(TestCase):
+    """pos/products/ reads the whole catalog in one query, however many products there are"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Shop', subdomain='shop')
+        self.branch = Branch.objects.create(tenant=self.tenant, name='Main', code='MAIN')
+        self.category = Category.objects.create(tenant=self.tenant, name='General')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='cashier', tenant=self.tenant))
+
+    def _add_products(self, count):
+        products = Product.objects.bulk_create([
+            Product(
+                tenant=self.tenant,
+                name=f'Product {n}',
+                sku=f'SKU-{n:05d}',
+                category=self.category,
+                price=Decimal('10.00'),
+                cost_price=Decimal('6.00'),
+            )
+            for n in range(Product.objects.count(), Product.objects.count() + count)
+        ])
+        BranchStock.objects.bulk_create([
+            BranchStock(tenant=self.tenant, branch=self.branch, product=product, quantity=5)
+            for product in products
+        ])
+
+    def _get_catalog(self, expected_products):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                '/api/v1/sales/pos/products/',
+                {'branch_id': str(self.branch.id)},
+                HTTP_X_TENANT_ID=str(self.tenant.id),
+            )
+            body = b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body.count(b'"sku"'), expected_products)
+
+    def test_query_count_does_not_grow_with_catalog(self):
+        self._add_products(5)
+        self._get_catalog(5)
+        self._add_products(195)
+        self._get_catalog(200)
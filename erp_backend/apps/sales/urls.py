@@ -2,8 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import SaleViewSet, CustomerViewSet, QuotationViewSet, InvoiceViewSet, CRMLogViewSet
 from .views import pos_create_sale
-from .pos_views import register_pos, sync_sales
-from .pos_integration import pos_get_products, pos_get_staff, request_stock_transfer, check_stock_availability
+from .pos_views import register_pos, sync_sales, sync_job_status
+from .pos_integration import pos_get_products, pos_get_catalog_snapshot, pos_get_staff, request_stock_transfer, check_stock_availability
 
 router = DefaultRouter()
 router.register(r'sales', SaleViewSet)
@@ -18,8 +18,10 @@ urlpatterns = [
     # POS-specific endpoints (with centralized inventory)
     path('pos/register/', register_pos),
     path('pos/sync/', sync_sales),
+    path('pos/sync/<uuid:job_id>/', sync_job_status),
     path('pos/create-sale/', pos_create_sale),
     path('pos/products/', pos_get_products),  # Centralized inventory
+    path('pos/catalog/', pos_get_catalog_snapshot),  # Cached catalog snapshot
     path('pos/staff/', pos_get_staff),  # HR shift integration
     path('pos/request-transfer/', request_stock_transfer),  # Multi-site
     path('pos/check-stock/', check_stock_availability),  # Multi-site
@@ -1,13 +1,17 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, action
 from rest_framework.response import Response
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
 from django.utils import timezone
 from apps.core.views import TenantAwareViewSet
 from .models import Sale, Customer, POSDevice, Quotation, Invoice, CRMLog
 from .serializers import SaleSerializer, CustomerSerializer, QuotationSerializer, InvoiceSerializer, CRMLogSerializer
-from apps.inventory.models import Product, BranchStock
+from apps.inventory.stock import deduct_sale_items
 from apps.users.models import User
-from apps.accounting.logic import post_sale_to_gl
+from apps.accounting.logic import enqueue_sale_postings
+from apps.accounting.outbox import schedule_gl_posting
+from .catalog import stream_catalog
 
 class CustomerViewSet(TenantAwareViewSet):
     queryset = Customer.objects.all()
@@ -68,6 +72,9 @@ class SaleViewSet(TenantAwareViewSet):
     queryset = Sale.objects.all()
     serializer_class = SaleSerializer
     filterset_fields = ['branch', 'customer', 'payment_status', 'status']
+    # Rows carry their line items, keep pages small
+    page_size = 50
+    max_page_size = 500
 
 # POS-specific endpoints
 @api_view(['POST'])
@@ -77,44 +84,36 @@ def pos_create_sale(request):
         tenant_id = request.headers.get('X-Tenant-ID')
         data = request.data
         
-        # Create sale
-        sale = Sale.objects.create(
-            tenant_id=tenant_id,
-            branch_id=data.get('branch_id'),
-            receipt_number=data.get('receipt_number'),
-            subtotal=data.get('subtotal', 0),
-            discount_amount=data.get('discount_amount', 0),
-            tax_amount=data.get('tax_amount', 0),
-            total_amount=data.get('total_amount'),
-            paid_amount=data.get('paid_amount', 0),
-            change_amount=data.get('change_amount', 0),
-            payment_method=data.get('payment_method', 'cash'),
-            staff_id_id=data.get('staff_id'),
-            staff_name=data.get('staff_name', ''),
-            items=data.get('items', []),
-            status=data.get('status', 'completed'),
-            sync_status='synced'
-        )
-        
-        # Update stock levels
-        for item in data.get('items', []):
-            try:
-                stock = BranchStock.objects.get(
-                    tenant_id=tenant_id,
-                    branch_id=data.get('branch_id'),
-                    product_id=item.get('product_id')
-                )
-                stock.quantity -= item.get('quantity', 0)
-                stock.save()
-            except BranchStock.DoesNotExist:
-                pass
-        
-        # Post to General Ledger
-        try:
-            post_sale_to_gl(sale)
-        except Exception as e:
-            # We log but don't fail the sale if GL posting fails
-            print(f"GL Posting failed: {str(e)}")
+        with transaction.atomic():
+            # Create sale
+            sale = Sale.objects.create(
+                tenant_id=tenant_id,
+                branch_id=data.get('branch_id'),
+                receipt_number=data.get('receipt_number'),
+                subtotal=data.get('subtotal', 0),
+                discount_amount=data.get('discount_amount', 0),
+                tax_amount=data.get('tax_amount', 0),
+                total_amount=data.get('total_amount'),
+                paid_amount=data.get('paid_amount', 0),
+                change_amount=data.get('change_amount', 0),
+                payment_method=data.get('payment_method', 'cash'),
+                staff_id_id=data.get('staff_id'),
+                staff_name=data.get('staff_name', ''),
+                items=data.get('items', []),
+                status=data.get('status', 'completed'),
+                sync_status='synced'
+            )
+            
+            # Update stock levels
+            deduct_sale_items(
+                tenant_id,
+                data.get('branch_id'),
+                [(item.get('product_id'), item.get('quantity', 0)) for item in data.get('items', [])]
+            )
+
+            # Queue the GL posting with the sale; it is posted in the background
+            enqueue_sale_postings([sale])
+            transaction.on_commit(lambda: schedule_gl_posting(tenant_id))
         
         return Response({
             'id': sale.id,
@@ -132,39 +131,7 @@ def pos_get_products(request):
     tenant_id = request.headers.get('X-Tenant-ID')
     branch_id = request.query_params.get('branch_id')
     
-    products = Product.objects.filter(tenant_id=tenant_id, is_deleted=False)
-    
-    result = []
-    for product in products:
-        # Get stock for this branch
-        stock_qty = 0
-        if branch_id:
-            try:
-                stock = BranchStock.objects.get(
-                    tenant_id=tenant_id,
-                    branch_id=branch_id,
-                    product=product
-                )
-                stock_qty = float(stock.quantity)
-            except BranchStock.DoesNotExist:
-                pass
-        
-        result.append({
-            'id': product.id,
-            'uuid': str(product.id),
-            'sku': product.sku,
-            'name': product.name,
-            'description': product.description,
-            'cost_price': float(product.cost_price),
-            'selling_price': float(product.price),
-            'category': product.category.name if product.category else '',
-            'stock_quantity': stock_qty,
-            'barcodes': [product.barcode] if product.barcode else [],
-            'created_at': product.created_at.isoformat(),
-            'updated_at': product.updated_at.isoformat()
-        })
-    
-    return Response(result)
+    return stream_catalog(tenant_id, branch_id, asynchronous=isinstance(request._request, ASGIRequest))
 
 @api_view(['GET'])
 def pos_get_staff(request):
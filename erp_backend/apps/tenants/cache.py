@@ -0,0 +1,108 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# The tenant fields request handling needs, kept per process
+CachedTenant = namedtuple('CachedTenant', ['id', 'active_modules', 'subscription_tier', 'is_active'])
+
+_cache = OrderedDict()  # str(tenant id) -> (expires at, CachedTenant), least recently used first
+_lock = threading.Lock()
+_seen_stamp = None
+
+def _max_size():
+    return getattr(settings, 'TENANT_CACHE_SIZE', 1024)
+
+def _ttl():
+    return getattr(settings, 'TENANT_CACHE_TTL', 60)
+
+def _version_file():
+    return getattr(settings, 'TENANT_CACHE_VERSION_FILE', None)
+
+def _read_stamp():
+    path = _version_file()
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns)
+
+def _bump_version():
+    """Tell other worker processes on this host that some tenant changed"""
+    path = _version_file()
+    if not path:
+        return
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(tmp, 'w') as f:
+            f.write(str(time.time_ns()))
+        # A new inode every time, so the stamp changes even within one mtime tick
+        os.replace(tmp, path)
+    except OSError:
+        # The change is saved; other processes catch up within TENANT_CACHE_TTL
+        logger.exception('Could not bump the tenant cache version file %s', path)
+
+def _check_version():
+    """Drop everything if another process bumped the version file"""
+    global _seen_stamp
+    stamp = _read_stamp()
+    if stamp != _seen_stamp:
+        with _lock:
+            _cache.clear()
+            _seen_stamp = stamp
+
+def _load(tenant_id):
+    from .models import Tenant
+    try:
+        row = Tenant.objects.filter(id=tenant_id).values_list(
+            'id', 'active_modules', 'subscription_tier', 'is_active'
+        ).first()
+    except (ValidationError, ValueError):
+        # Not a UUID
+        return None
+    if row is None:
+        return None
+    tenant_id, active_modules, tier, is_active = row
+    return CachedTenant(tenant_id, active_modules or {}, tier, is_active)
+
+def get_cached_tenant(tenant_id):
+    """
+    CachedTenant for an id, or None if there is no such tenant.
+    Entries live for TENANT_CACHE_TTL seconds, at most TENANT_CACHE_SIZE
+    tenants are kept, and all of them are dropped when the version file
+    changes. A hit costs one stat() call and no queries.
+    """
+    if not tenant_id:
+        return None
+    key = str(tenant_id)
+    _check_version()
+
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(key)
+        if entry and entry[0] > now:
+            _cache.move_to_end(key)
+            return entry[1]
+
+    tenant = _load(tenant_id)
+    if tenant is None:
+        return None
+    with _lock:
+        _cache[key] = (now + _ttl(), tenant)
+        _cache.move_to_end(key)
+        while len(_cache) > _max_size():
+            _cache.popitem(last=False)
+    return tenant
+
+def invalidate_tenant(tenant_id):
+    """Forget a tenant here and in the other worker processes"""
+    with _lock:
+        _cache.pop(str(tenant_id), None)
+    _bump_version()
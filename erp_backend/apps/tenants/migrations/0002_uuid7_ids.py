@@ -0,0 +1,24 @@
+# Generated manually
+
+import apps.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tenant',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='branch',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -1,8 +1,8 @@
-import uuid
 from django.db import models
+from apps.core.models import uuid7
 
 class Tenant(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     name = models.CharField(max_length=255)
     subdomain = models.SlugField(unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -42,7 +42,7 @@ class Tenant(models.Model):
         return self.name
 
 class Branch(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='branches')
     parent_branch = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='sub_branches')
     name = models.CharField(max_length=255)
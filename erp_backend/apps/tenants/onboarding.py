@@ -6,6 +6,7 @@ from apps.tenants.models import Tenant, Branch
 from apps.users.models import User
 from apps.accounting.templates import setup_industry_coa
 import uuid
+from django.db import transaction
 
 from django.utils.text import slugify
 import random
@@ -155,14 +156,17 @@ def update_tenant_modules(request):
     tenant_id = request.headers.get('X-Tenant-ID')
     
     try:
-        tenant = Tenant.objects.get(id=tenant_id)
-        new_modules = request.data.get('modules', {})
-        
-        # Merge with existing
-        active_modules = tenant.active_modules or {}
-        active_modules.update(new_modules)
-        tenant.active_modules = active_modules
-        tenant.save()
+        with transaction.atomic():
+            # Lock the row so concurrent updates merge instead of overwriting each other
+            tenant = Tenant.objects.select_for_update().get(id=tenant_id)
+            new_modules = request.data.get('modules', {})
+            
+            # Merge with existing
+            active_modules = tenant.active_modules or {}
+            active_modules.update(new_modules)
+            tenant.active_modules = active_modules
+            # Saving drops the tenant from every process's tenant cache (apps.tenants.signals)
+            tenant.save(update_fields=['active_modules'])
         
         return Response({
             'success': True,
@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import invalidate_tenant
+from .models import Tenant
+
+@receiver([post_save, post_delete], sender=Tenant)
+def invalidate_cached_tenant(sender, instance, **kwargs):
+    invalidate_tenant(instance.id)
+    # Other requests can re-cache the old row until this transaction commits
+    transaction.on_commit(lambda: invalidate_tenant(instance.id))
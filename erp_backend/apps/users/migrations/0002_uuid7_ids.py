@@ -0,0 +1,19 @@
+# Generated manually
+
+import apps.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='id',
+            field=models.UUIDField(default=apps.core.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
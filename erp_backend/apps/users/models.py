@@ -2,9 +2,11 @@ import uuid
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils import timezone
+from apps.core.models import uuid7
+from apps.tenants.cache import get_cached_tenant
 
 class User(AbstractUser):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     ROLE_CHOICES = (
         ('super_admin', 'Super Admin'),
@@ -110,10 +112,11 @@ class User(AbstractUser):
     def get_accessible_modules(self):
         """Get list of modules this user can access"""
         # Check tenant's active modules
-        if not self.tenant:
+        tenant = get_cached_tenant(self.tenant_id)
+        if tenant is None:
             return []
         
-        active_modules = self.tenant.active_modules or {}
+        active_modules = tenant.active_modules
         accessible = []
         
         for module, is_active in active_modules.items():
@@ -5,3 +5,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# The overdue sweeper runs in web processes only, not in management commands or tests
+from apps.accounting.overdue import start_overdue_sweeper  # noqa: E402
+start_overdue_sweeper()
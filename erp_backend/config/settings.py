@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 
@@ -96,3 +97,48 @@ MEDIA_URL = 'media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 CORS_ALLOW_ALL_ORIGINS = True # Change for production
+
+# Shared by the worker processes: Redis when REDIS_URL is set, otherwise
+# files in the temp dir (one host)
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(tempfile.gettempdir(), 'erp_backend_cache'),
+        }
+    }
+
+# Background threads processing POS sync uploads (per web worker process)
+POS_SYNC_WORKERS = int(os.environ.get('POS_SYNC_WORKERS', 4))
+
+# Seconds a process keeps a tenant's account codes and posting rules cached
+ACCOUNT_CACHE_TTL = int(os.environ.get('ACCOUNT_CACHE_TTL', 300))
+
+# Seconds a tenant's aged receivables / payables stay cached
+# (dropped earlier whenever one of the tenant's invoices or bills is saved)
+AGING_CACHE_TTL = int(os.environ.get('AGING_CACHE_TTL', 300))
+
+# Seconds between overdue sweeps run in a background thread of each web process.
+# 0 = off; run `manage.py sweep_overdue` from cron instead.
+OVERDUE_SWEEP_INTERVAL = int(os.environ.get('OVERDUE_SWEEP_INTERVAL', 0))
+
+# Repeated kiosk taps by one employee within this many seconds count as one punch
+CLOCK_DEDUP_SECONDS = int(os.environ.get('CLOCK_DEDUP_SECONDS', 60))
+
+# Per-process tenant cache used by middleware and permission checks.
+# Touching the version file makes every worker process on the host drop its cache.
+TENANT_CACHE_SIZE = int(os.environ.get('TENANT_CACHE_SIZE', 1024))
+TENANT_CACHE_TTL = int(os.environ.get('TENANT_CACHE_TTL', 60))
+TENANT_CACHE_VERSION_FILE = os.environ.get(
+    'TENANT_CACHE_VERSION_FILE', os.path.join(tempfile.gettempdir(), 'erp_backend_tenant_cache_version')
+)
+
+# Response headers browser clients need to read (pagination links, catalog sync)
+CORS_EXPOSE_HEADERS = ['Link', 'ETag', 'X-Catalog-Cursor', 'X-Catalog-Version']
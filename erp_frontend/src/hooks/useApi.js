@@ -553,16 +553,7 @@ export const useAccountingActions = () => {
         }
     }, []);
 
-    const createTransaction = useCallback(async (data) => {
-        try {
-            const response = await api.post('/accounting/transactions/', data);
-            return response.data;
-        } catch (err) {
-            throw err;
-        }
-    }, []);
-
-    return { createAccount, createJournalEntry, createTransaction };
+    return { createAccount, createJournalEntry };
 };
 
 export const usePOS = () => {
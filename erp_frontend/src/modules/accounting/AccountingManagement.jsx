@@ -4,7 +4,7 @@ import { useAccounting, useAccountingActions } from '../../hooks/useApi';
 
 const AccountingManagement = ({ industry = 'retail' }) => {
     const { accounts, journalEntries, transactions, loading, error, stats } = useAccounting();
-    const { createAccount, createJournalEntry, createTransaction } = useAccountingActions();
+    const { createAccount, createJournalEntry } = useAccountingActions();
     const [activeTab, setActiveTab] = useState('accounts');
     const [searchTerm, setSearchTerm] = useState('');
     const [showAddForm, setShowAddForm] = useState(false);